@@ -0,0 +1,591 @@
+"""NumPy 컬럼 기반 인메모리 통계 엔진 (선택 기능)
+
+ANALYTICS_ENGINE=numpy 환경변수로 켜면 거래내역 / 카드 거래내역을 프로세스 메모리에
+사전 인코딩(dictionary encoding)된 NumPy 컬럼으로 보관하고, 통계 라우터의 group by / 필터 조회를
+SQL 대신 벡터 연산으로 계산한다. 꺼져 있거나 NumPy 가 없으면 기존 SQL 경로를 그대로 사용한다.
+
+데이터 세대(cache.bump_generation)가 바뀌면 마지막으로 읽은 id 이후의 행만 추가로 읽는다.
+기존 행을 수정/삭제하는 쪽은 invalidate(model, ids) 를 호출하여 다음 조회 때 그 행만 다시 읽게 하고,
+가맹점 분류 결과를 바꾸는 쪽(매핑 적용 / 재분류)은 invalidate_merchants() 를 호출하여
+분류 결과가 바뀐 가맹점의 행만 다시 읽게 한다.
+
+통계 계산(AnalyticsEngine)은 한 시점의 컬럼을 담고 만든 뒤에는 바뀌지 않는다. EngineLoader 가
+기존 엔진의 컬럼 사본에 새 행을 더해 새 엔진을 만들고 참조 한 번으로 교체하므로, 조회는 잠금 없이
+get_engine() 이 돌려준 엔진을 끝까지 일관되게 읽는다.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+import bisect
+import logging
+import math
+import os
+import threading
+
+from . import cache, models
+from .enums import TransactionCategory
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy 가 없으면 엔진 비활성화
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# 엔진 사용 여부 (numpy: 사용, 그 외: SQL)
+ANALYTICS_ENGINE = os.environ.get("ANALYTICS_ENGINE", "sql")
+
+# 증분 적재 시 한 번에 읽을 행 수
+LOAD_BATCH_SIZE = 50000
+
+# 수정된 행을 다시 읽을 때 IN 절 하나에 넣을 id 수 (SQLite 바인딩 변수 한도 이내)
+RELOAD_CHUNK_SIZE = 500
+
+# 카드 지출 집계 배열의 최대 칸 수 (넘으면 조회 때마다 카드 거래 행을 묶어 집계)
+GROUP_TABLE_LIMIT = 1 << 22
+
+# 카드 지출 집계 배열의 축 순서
+CARD_CUBE_AXES = ("year_month", "card_holder", "payment_type", "category")
+
+
+class MonthlyTotals(NamedTuple):
+    year_month: str
+    total_income: float
+    total_expense: float  # 음수
+    transaction_count: int
+    start_balance: float
+    end_balance: float
+
+
+class CategoryTotals(NamedTuple):
+    category: str  # 미지정: 빈 문자열
+    total_amount: float  # 음수
+    transaction_count: int
+
+
+class Dictionary:
+    """문자열 값 <-> 정수 코드 사전 (코드는 처음 나온 순서대로 부여)"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def encode(self, values: Iterable[Optional[str]]) -> "np.ndarray":
+        codes = self._codes
+        encoded = []
+        for value in values:
+            value = value or ""
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(self.values)
+                self.values.append(value)
+            encoded.append(code)
+        return np.array(encoded, dtype=np.int32)
+
+    def copy(self) -> "Dictionary":
+        dictionary = Dictionary()
+        dictionary.values = list(self.values)
+        dictionary._codes = dict(self._codes)
+        return dictionary
+
+    def code(self, value: Optional[str]) -> int:
+        """값의 코드 (없는 값이면 -1)"""
+        return self._codes.get(value or "", -1)
+
+    def order(self) -> Tuple["np.ndarray", List[str]]:
+        """코드 -> 문자열 정렬 순위, 정렬된 값 목록"""
+        sorted_codes = np.argsort(np.array(self.values, dtype=str), kind="stable")
+        ranks = np.empty(len(self.values), dtype=np.int64)
+        ranks[sorted_codes] = np.arange(len(self.values))
+        return ranks, [self.values[code] for code in sorted_codes.tolist()]
+
+
+class ColumnTable:
+    """한 테이블의 컬럼 배열 (문자열 컬럼은 사전 인코딩)"""
+
+    def __init__(self, model, encoded: Sequence[str], numeric: Sequence[str]):
+        self.model = model
+        self.encoded = tuple(encoded)
+        self.numeric = tuple(numeric)
+        self.clear()
+
+    def clear(self) -> None:
+        self.last_id = 0
+        self.dictionaries = {name: Dictionary() for name in self.encoded}
+        self.columns = {"id": np.empty(0, dtype=np.int64)}
+        self.columns.update({name: np.empty(0, dtype=np.int32) for name in self.encoded})
+        self.columns.update({name: np.empty(0, dtype=np.float64) for name in self.numeric})
+
+    def copy(self) -> "ColumnTable":
+        """같은 컬럼 배열을 가리키는 사본 (사본의 행을 추가 / 교체 / 삭제해도 원본 배열과 사전은 그대로)"""
+        table = ColumnTable(self.model, self.encoded, self.numeric)
+        table.last_id = self.last_id
+        table.dictionaries = {name: dictionary.copy() for name, dictionary in self.dictionaries.items()}
+        table.columns = dict(self.columns)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def _query(self, db: Session):
+        model = self.model
+        return db.query(*(getattr(model, name) for name in ("id",) + self.encoded + self.numeric))
+
+    def _encode_rows(self, rows) -> Dict[str, "np.ndarray"]:
+        values = list(zip(*rows))
+        new_columns = {"id": np.array(values[0], dtype=np.int64)}
+        for index, name in enumerate(self.encoded, start=1):
+            new_columns[name] = self.dictionaries[name].encode(values[index])
+        for index, name in enumerate(self.numeric, start=1 + len(self.encoded)):
+            new_columns[name] = np.array([v or 0.0 for v in values[index]], dtype=np.float64)
+        return new_columns
+
+    def load_new_rows(self, db: Session) -> int:
+        """last_id 이후의 행을 읽어 컬럼 끝에 추가, 추가된 행 수 반환"""
+        model = self.model
+        added = 0
+        while True:
+            rows = self._query(db)\
+                .filter(model.id > self.last_id)\
+                .order_by(model.id)\
+                .limit(LOAD_BATCH_SIZE)\
+                .all()
+            if not rows:
+                return added
+
+            new_columns = self._encode_rows(rows)
+            for name, column in new_columns.items():
+                self.columns[name] = np.concatenate((self.columns[name], column))
+            self.last_id = int(new_columns["id"][-1])
+            added += len(rows)
+
+    def reload_rows(self, db: Session, ids: Iterable[int], merchant_ids: Sequence[int]) -> Tuple[int, int]:
+        """이미 읽은 행 중 ids 행과 merchant_ids 가맹점의 행을 다시 읽어 값 교체, 없어진 행은 삭제
+
+        Returns:
+            (다시 읽은 행 수, 삭제된 행 수)
+        """
+        model = self.model
+        ids = sorted(set(ids))
+        rows = {}
+        for column, keys in ((model.id, ids), (model.merchant_id, list(merchant_ids))):
+            for start in range(0, len(keys), RELOAD_CHUNK_SIZE):
+                for row in self._query(db).filter(
+                    column.in_(keys[start:start + RELOAD_CHUNK_SIZE]), model.id <= self.last_id
+                ):
+                    rows[row[0]] = row
+
+        # id 컬럼은 id 순으로 읽어 붙이므로 정렬되어 있음
+        if rows:
+            new_columns = self._encode_rows([rows[row_id] for row_id in sorted(rows)])
+            positions = np.searchsorted(self.columns["id"], new_columns["id"])
+            loaded = positions < len(self)
+            loaded[loaded] = self.columns["id"][positions[loaded]] == new_columns["id"][loaded]
+            for name, values in new_columns.items():
+                column = self.columns[name].copy()  # 이전 엔진이 읽는 배열은 바꾸지 않음
+                column[positions[loaded]] = values[loaded]
+                self.columns[name] = column
+
+        deleted = np.isin(self.columns["id"], np.array([row_id for row_id in ids if row_id not in rows], dtype=np.int64))
+        deleted_count = int(deleted.sum())
+        if deleted_count:
+            for name, column in self.columns.items():
+                self.columns[name] = column[~deleted]
+            # 가장 큰 id 가 삭제되면 SQLite 가 같은 id 를 다시 쓰므로 남은 행의 마지막 id 부터 다시 읽음
+            self.last_id = int(self.columns["id"][-1]) if len(self) else 0
+        return len(rows), deleted_count
+
+    def build_ranks(self) -> None:
+        """문자열 컬럼별 정렬된 값 목록과 코드 -> 정렬 순위 (적재 후 호출)"""
+        self._ranks, self.sorted_values = {}, {}
+        for name in self.encoded:
+            self._ranks[name], self.sorted_values[name] = self.dictionaries[name].order()
+        self._ranked = {}
+
+    def ranked(self, name: str) -> "np.ndarray":
+        """행별 값의 정렬 순위"""
+        if name not in self._ranked:
+            self._ranked[name] = self._ranks[name][self.columns[name]]
+        return self._ranked[name]
+
+    def rank_range(self, name: str, low: str, high: str) -> Tuple[int, int]:
+        """low <= 값 <= high 인 값들의 정렬 순위 구간 [시작, 끝)"""
+        values = self.sorted_values[name]
+        return bisect.bisect_left(values, low), bisect.bisect_right(values, high)
+
+
+class AnalyticsEngine:
+    """한 시점의 거래내역 / 카드 거래내역 컬럼과 통계 계산 (만든 뒤에는 바뀌지 않음)"""
+
+    def __init__(self, transactions: ColumnTable, card_transactions: ColumnTable):
+        self.transactions = transactions
+        self.card_transactions = card_transactions
+        for table in (transactions, card_transactions):
+            table.build_ranks()
+        self._build_time_order()
+        self._build_card_cube()
+
+    def _build_time_order(self) -> None:
+        # 년월, 거래 일시, id 순 정렬 - 같은 년월의 거래가 연속 구간이 되어 월별 합계를 정렬 없이 계산
+        table = self.transactions
+        month_ranks = table.ranked("year_month")
+        order = np.lexsort((table.columns["id"], table.ranked("transaction_date"), month_ranks))
+        amount = table.columns["amount"][order]
+        self._time_order = order
+        self._time_months = month_ranks[order]
+        self._time_amount = amount
+        self._time_balance = table.columns["balance"][order]
+        self._time_category = table.columns["category"][order]
+        # 수입 / 지출 누적 합계 - 구간 합계를 두 값의 차로 계산
+        self._income_cumsum = np.concatenate(([0.0], np.cumsum(np.where(amount > 0, amount, 0.0))))
+        self._expense_cumsum = np.concatenate(([0.0], np.cumsum(np.where(amount < 0, amount, 0.0))))
+        # (년월 순위, 계좌 유형) 별 거래 수
+        type_count = max(len(table.dictionaries["account_type"].values), 1)
+        self._month_type_counts = np.bincount(
+            month_ranks * type_count + table.columns["account_type"],
+            minlength=len(table.sorted_values["year_month"]) * type_count
+        ).reshape(-1, type_count)
+
+    def _month_slice(self, year_month: str) -> slice:
+        """정렬 순서에서 해당 년월 거래의 구간"""
+        start, end = np.searchsorted(self._time_months, self.transactions.rank_range("year_month", year_month, year_month))
+        return slice(int(start), int(end))
+
+    # --- 거래내역 ---
+
+    def monthly_totals(self, from_month: str, to_month: str, account_type: Optional[str] = None) -> List[MonthlyTotals]:
+        """기간 내 거래가 있는 월별 수입/지출 합계, 거래 수, 월초/월말 잔액"""
+        table = self.transactions
+        low, high = table.rank_range("year_month", from_month, to_month)
+
+        if account_type is None:
+            # 년월 순위별 구간 경계 [starts, ends) - 거래가 있는 월만
+            bounds = np.searchsorted(self._time_months, np.arange(low, high + 1))
+            month_ranks = np.arange(low, high)
+            starts, ends = bounds[:-1], bounds[1:]
+            present = ends > starts
+            month_ranks, starts, ends = month_ranks[present], starts[present], ends[present]
+            income = self._income_cumsum[ends] - self._income_cumsum[starts]
+            expense = self._expense_cumsum[ends] - self._expense_cumsum[starts]
+            amount, balance = self._time_amount, self._time_balance
+        else:
+            start, end = np.searchsorted(self._time_months, (low, high))
+            rows = np.arange(start, end)
+            rows = rows[
+                table.columns["account_type"][self._time_order[rows]]
+                == table.dictionaries["account_type"].code(account_type)
+            ]
+            if len(rows) == 0:
+                return []
+            months = self._time_months[rows]
+            amount, balance = self._time_amount[rows], self._time_balance[rows]
+            starts = np.flatnonzero(np.concatenate(([True], months[1:] != months[:-1])))
+            ends = np.concatenate((starts[1:], [len(rows)]))
+            month_ranks = months[starts]
+            income = np.add.reduceat(np.where(amount > 0, amount, 0.0), starts)
+            expense = np.add.reduceat(np.where(amount < 0, amount, 0.0), starts)
+
+        start_balances = balance[starts] - amount[starts]
+        end_balances = balance[ends - 1]
+        counts = ends - starts
+        year_months = table.sorted_values["year_month"]
+        return [
+            MonthlyTotals(
+                year_month=year_months[month],
+                total_income=float(income[i]),
+                total_expense=float(expense[i]),
+                transaction_count=int(counts[i]),
+                start_balance=float(start_balances[i]),
+                end_balance=float(end_balances[i])
+            )
+            for i, month in enumerate(month_ranks.tolist())
+        ]
+
+    def category_expenses(self, year_month: str, account_type: Optional[str] = None) -> List[CategoryTotals]:
+        """해당 월 카테고리별 지출 합계 / 건수 (지출이 있는 카테고리만)"""
+        table = self.transactions
+        month = self._month_slice(year_month)
+        amount = self._time_amount[month]
+        mask = amount < 0
+        if account_type is not None:
+            mask &= (
+                table.columns["account_type"][self._time_order[month]]
+                == table.dictionaries["account_type"].code(account_type)
+            )
+        categories = self._time_category[month][mask]
+        size = len(table.dictionaries["category"].values)
+        counts = np.bincount(categories, minlength=size)
+        totals = np.bincount(categories, weights=amount[mask], minlength=size)
+
+        names = table.dictionaries["category"].values
+        return [
+            CategoryTotals(category=names[code], total_amount=float(totals[code]), transaction_count=int(counts[code]))
+            for code in np.flatnonzero(counts).tolist()
+        ]
+
+    def available_months(self, account_type: Optional[str] = None) -> List[str]:
+        """거래가 있는 년월 (최신순)"""
+        table = self.transactions
+        if account_type is None:
+            counts = self._month_type_counts.sum(axis=1)
+        else:
+            code = table.dictionaries["account_type"].code(account_type)
+            if code < 0:
+                return []
+            counts = self._month_type_counts[:, code]
+        year_months = table.sorted_values["year_month"]
+        return [year_months[rank] for rank in np.flatnonzero(counts)[::-1].tolist()]
+
+    # --- 카드 거래내역 ---
+
+    def _build_card_cube(self) -> None:
+        # (년월, 사용자, 결제 유형, 카테고리) 정렬 순위별 합계 / 건수 배열 - 가능한 칸 수가 많으면 만들지 않음
+        table = self.card_transactions
+        shape = tuple(len(table.sorted_values[name]) for name in CARD_CUBE_AXES)
+        self._card_cube = None
+        if math.prod(shape) > GROUP_TABLE_LIMIT:
+            return
+        keys = np.zeros(len(table), dtype=np.int64)
+        for name, size in zip(CARD_CUBE_AXES, shape):
+            keys = keys * size + table.ranked(name)
+        size = math.prod(shape)
+        self._card_cube = (
+            np.bincount(keys, minlength=size).reshape(shape),
+            np.bincount(keys, weights=table.columns["amount"], minlength=size).reshape(shape),
+        )
+
+    def _card_selection(self, year_month, from_month, to_month, card_holder, payment_type, category) -> Dict[str, "np.ndarray"]:
+        """필터 조건을 만족하는 기준 컬럼 값의 정렬 순위 (컬럼별)"""
+        table = self.card_transactions
+        values = table.sorted_values
+        selection = {name: np.arange(len(values[name])) for name in CARD_CUBE_AXES}
+
+        low, high = table.rank_range("year_month", from_month or "", to_month or "\uffff")
+        if year_month is not None:
+            month_low, month_high = table.rank_range("year_month", year_month, year_month)
+            low, high = max(low, month_low), min(high, month_high)
+        selection["year_month"] = selection["year_month"][low:high]
+        for name, value in (("card_holder", card_holder), ("payment_type", payment_type)):
+            if value is not None:
+                selection[name] = np.arange(*table.rank_range(name, value, value))
+        if category:
+            # 미분류 거래는 빈 문자열로 인코딩됨
+            wanted = {category, ""} if category == TransactionCategory.UNCATEGORIZED.value else {category}
+            selection["category"] = np.array(
+                [rank for rank, value in enumerate(values["category"]) if value in wanted], dtype=np.int64
+            )
+        return selection
+
+    def card_groups(
+        self,
+        dimensions: Sequence[str],
+        year_month: Optional[str] = None,
+        from_month: Optional[str] = None,
+        to_month: Optional[str] = None,
+        card_holder: Optional[str] = None,
+        payment_type: Optional[str] = None,
+        category: Optional[str] = None
+    ) -> List[dict]:
+        """카드 거래를 dimensions 기준으로 묶은 합계 / 건수 / 비율 (기준 컬럼 값 순)"""
+        table = self.card_transactions
+        selection = self._card_selection(year_month, from_month, to_month, card_holder, payment_type, category)
+        if any(len(ranks) == 0 for ranks in selection.values()):
+            return []
+
+        if self._card_cube is not None:
+            ranks, counts, totals = self._card_cube_groups(dimensions, selection)
+        else:
+            ranks, counts, totals = self._card_row_groups(dimensions, selection)
+        if len(counts) == 0:
+            return []
+
+        absolute = np.abs(totals).sum()
+        percentages = np.abs(totals) * 100.0 / absolute if absolute > 0 else np.zeros(len(totals))
+        values = {
+            name: [table.sorted_values[name][rank] for rank in name_ranks.tolist()]
+            for name, name_ranks in zip(dimensions, ranks)
+        }
+        return [
+            {
+                **{name: values[name][i] for name in dimensions},
+                "total_amount": float(totals[i]),
+                "transaction_count": int(counts[i]),
+                "percentage": float(percentages[i])
+            }
+            for i in range(len(counts))
+        ]
+
+    def _card_cube_groups(self, dimensions: Sequence[str], selection: Dict[str, "np.ndarray"]):
+        """집계 배열에서 선택된 칸을 잘라 기준이 아닌 축을 합침 - (기준별 정렬 순위, 건수, 합계)"""
+        counts, totals = (cube[np.ix_(*selection.values())] for cube in self._card_cube)
+        summed = tuple(axis for axis, name in enumerate(CARD_CUBE_AXES) if name not in dimensions)
+        remaining = [name for name in CARD_CUBE_AXES if name in dimensions]
+        order = [remaining.index(name) for name in dimensions]
+        counts = counts.sum(axis=summed).transpose(order)
+        totals = totals.sum(axis=summed).transpose(order)
+
+        cells = np.flatnonzero(counts)  # 행 우선 순서 = 기준 컬럼 값 순서
+        positions = np.unravel_index(cells, counts.shape)
+        ranks = [selection[name][position] for name, position in zip(dimensions, positions)]
+        return ranks, counts.reshape(-1)[cells], totals.reshape(-1)[cells]
+
+    def _card_row_groups(self, dimensions: Sequence[str], selection: Dict[str, "np.ndarray"]):
+        """집계 배열이 없을 때 - 선택된 행을 기준 컬럼 정렬 순위로 묶음 - (기준별 정렬 순위, 건수, 합계)"""
+        table = self.card_transactions
+        mask = np.ones(len(table), dtype=bool)
+        for name in CARD_CUBE_AXES:
+            if len(selection[name]) < len(table.sorted_values[name]):
+                mask &= np.isin(table.ranked(name), selection[name])
+        amount = table.columns["amount"][mask]
+        if len(amount) == 0:
+            return [], np.empty(0), np.empty(0)
+        if not dimensions:
+            return [], np.array([len(amount)]), np.array([amount.sum()])
+
+        stacked = np.stack([table.ranked(name)[mask] for name in dimensions], axis=1)
+        groups, inverse = np.unique(stacked, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        return list(groups.T), np.bincount(inverse), np.bincount(inverse, weights=amount)
+
+
+class EngineLoader:
+    """데이터베이스에서 컬럼을 읽어 엔진을 만들고, 데이터 세대가 바뀌면 새 엔진으로 교체"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current: Optional[Tuple[int, AnalyticsEngine]] = None  # (데이터 세대, 엔진) - 함께 교체
+        # 다음 sync 때 다시 읽을 행 (invalidate 는 sync 가 진행 중이어도 기다리지 않음)
+        self._pending_lock = threading.Lock()
+        self._changed_ids: Dict[str, Set[int]] = {}
+        self._merchants_changed = False
+        self._merchant_categories: Dict[int, Optional[str]] = {}  # 마지막으로 읽은 가맹점 분류 결과
+
+    def invalidate(self, model, ids: Iterable[int]) -> None:
+        """기존 행이 수정/삭제된 경우 - 다음 조회 때 해당 행만 다시 읽음"""
+        with self._pending_lock:
+            self._changed_ids.setdefault(model.__tablename__, set()).update(ids)
+
+    def invalidate_merchants(self) -> None:
+        """가맹점 분류 결과가 바뀐 경우 - 다음 조회 때 분류 결과가 바뀐 가맹점의 행만 다시 읽음"""
+        with self._pending_lock:
+            self._merchants_changed = True
+
+    def _fresh(self, generation: int) -> Optional[AnalyticsEngine]:
+        current = self._current
+        if current is not None and current[0] == generation and not self._changed_ids and not self._merchants_changed:
+            return current[1]
+        return None
+
+    def _take_pending(self) -> Tuple[Dict[str, Set[int]], bool]:
+        with self._pending_lock:
+            pending = (self._changed_ids, self._merchants_changed)
+            self._changed_ids, self._merchants_changed = {}, False
+        return pending
+
+    def _restore_pending(self, changed_ids: Dict[str, Set[int]], merchants_changed: bool) -> None:
+        with self._pending_lock:
+            for name, ids in changed_ids.items():
+                self._changed_ids.setdefault(name, set()).update(ids)
+            self._merchants_changed |= merchants_changed
+
+    def _changed_merchants(self, db: Session) -> List[int]:
+        """마지막으로 읽은 뒤 분류 결과가 바뀐 가맹점 id (가맹점은 거래보다 훨씬 적으므로 전체를 비교)"""
+        merchants = models.Merchant.__table__
+        categories = dict(db.execute(select(merchants.c.id, merchants.c.category)).all())
+        changed = [
+            merchant_id for merchant_id, category in categories.items()
+            if self._merchant_categories.get(merchant_id) != category
+        ]
+        self._merchant_categories = categories
+        return changed
+
+    def sync(self, db: Session) -> AnalyticsEngine:
+        """데이터 세대가 바뀌었으면 수정된 행을 다시 읽고 새 행을 추가로 읽은 새 엔진으로 교체"""
+        generation = cache.current_generation()
+        engine = self._fresh(generation)
+        if engine is not None:
+            return engine
+
+        with self._lock:
+            engine = self._fresh(generation)
+            if engine is not None:
+                return engine
+            changed_ids, merchants_changed = self._take_pending()
+            try:
+                engine = self._build(db, changed_ids, merchants_changed)
+            except Exception:
+                self._restore_pending(changed_ids, merchants_changed)
+                raise
+            self._current = (generation, engine)
+            return engine
+
+    def _build(self, db: Session, changed_ids: Dict[str, Set[int]], merchants_changed: bool) -> AnalyticsEngine:
+        if self._current is None:
+            # 가맹점 분류 결과를 거래보다 먼저 읽음 - 그 사이 바뀐 분류 결과는 다음 비교 때 바뀐 것으로 잡힘
+            self._changed_merchants(db)
+            tables = _new_tables()
+        else:
+            previous = self._current[1]
+            tables = (previous.transactions.copy(), previous.card_transactions.copy())
+            merchant_ids = self._changed_merchants(db) if merchants_changed else []
+            for table in tables:
+                ids = changed_ids.get(table.model.__tablename__, ())
+                if ids or merchant_ids:
+                    reloaded, deleted = table.reload_rows(db, ids, merchant_ids)
+                    logger.info(
+                        f"Analytics engine reloaded {reloaded} rows and removed {deleted} rows "
+                        f"from {table.model.__tablename__}"
+                    )
+        for table in tables:
+            added = table.load_new_rows(db)
+            if added:
+                logger.info(f"Analytics engine loaded {added} rows from {table.model.__tablename__}")
+        return AnalyticsEngine(*tables)
+
+
+def _new_tables() -> Tuple[ColumnTable, ColumnTable]:
+    """(거래내역, 카드 거래내역) 빈 컬럼 저장소"""
+    return (
+        ColumnTable(
+            models.Transaction,
+            encoded=("year_month", "category", "account_type", "account_number", "transaction_date"),
+            numeric=("amount", "balance")
+        ),
+        ColumnTable(
+            models.CardTransaction,
+            encoded=("year_month", "card_holder", "payment_type", "category"),
+            numeric=("amount",)
+        ),
+    )
+
+
+_loader: Optional[EngineLoader] = None
+_loader_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return ANALYTICS_ENGINE == "numpy" and np is not None
+
+
+def get_engine(db: Session) -> Optional[AnalyticsEngine]:
+    """엔진이 켜져 있으면 최신 상태로 맞춘 엔진, 아니면 None (SQL 경로 사용)"""
+    global _loader
+    if not enabled():
+        return None
+    if _loader is None:
+        with _loader_lock:
+            if _loader is None:
+                _loader = EngineLoader()
+    return _loader.sync(db)
+
+
+def invalidate(model, ids: Iterable[int]) -> None:
+    """기존 거래의 수정/삭제 후 호출 - 엔진이 있으면 다음 조회 때 해당 거래만 다시 읽음"""
+    if _loader is not None:
+        _loader.invalidate(model, ids)
+
+
+def invalidate_merchants() -> None:
+    """가맹점 분류 결과 변경 후 호출 - 엔진이 있으면 다음 조회 때 분류 결과가 바뀐 가맹점의 거래만 다시 읽음"""
+    if _loader is not None:
+        _loader.invalidate_merchants()
@@ -0,0 +1,80 @@
+"""거래 일괄 수정 (카테고리 / 메모)
+
+id 목록 또는 조회 필터로 선택한 거래를 UPDATE 한 번으로 수정하고, 수정된 거래가 있는 월의
+집계를 같은 트랜잭션에서 한 번만 갱신한 뒤 commit 한다. (거래마다 SELECT / commit 하지 않음)
+메모에 적힌 카테고리도 자동 분류 거래의 카테고리를 바꾸므로 메모만 수정해도 집계를 갱신한다.
+"""
+from pydantic import BaseModel
+from sqlalchemy import and_, case, update
+from sqlalchemy.orm import Session
+from enum import Enum
+from typing import Callable, Iterable, List, Optional
+import logging
+
+from . import analytics, categorizer, models
+from .enums import CategorySource
+
+logger = logging.getLogger(__name__)
+
+# 한 번에 id 로 지정할 수 있는 최대 거래 수 (SQLite 바인딩 변수 한도 이내)
+MAX_BULK_IDS = 10000
+
+
+def build_conditions(
+    model,
+    ids: Optional[List[int]],
+    filters: Optional[BaseModel],
+    unmatched_category: Optional[str] = None
+) -> List:
+    """id 목록과 조회 필터(값이 있는 필드만, 필드명 = 컬럼명)를 UPDATE 조건으로 변환
+
+    카테고리 필터는 models.category_condition 으로 변환한다 (unmatched_category: 매핑에 없는 거래의 카테고리).
+    """
+    conditions = []
+    if ids is not None:
+        conditions.append(model.id.in_(ids))
+    if filters is not None:
+        for name, value in filters.dict(exclude_none=True).items():
+            if not value:
+                continue
+            value = value.value if isinstance(value, Enum) else value
+            if name == "category":
+                conditions.append(models.category_condition(model, value, unmatched_category))
+            else:
+                conditions.append(getattr(model, name) == value)
+    return conditions
+
+
+def update_rows(
+    db: Session,
+    model,
+    conditions: List,
+    category: Optional[str],
+    memo: Optional[str],
+    refresh: Callable[[Session, Iterable[str]], None]
+) -> int:
+    """conditions 를 만족하는 거래의 카테고리(직접 지정) / 메모 수정, 수정된 거래 수 반환"""
+    table = model.__table__
+    values = {}
+    if category is not None:
+        values.update(category=category, category_source=CategorySource.MANUAL.value)
+    if memo is not None:
+        values["memo"] = memo
+        if category is None:
+            # 직접 지정하지 않은 거래는 새 메모에 적힌 카테고리를 저장
+            values["category"] = case(
+                (table.c.category_source == CategorySource.MANUAL.value, table.c.category),
+                else_=categorizer.memo_category(memo)
+            )
+
+    touched = db.execute(
+        update(table).where(and_(*conditions)).values(**values).returning(table.c.id, table.c.year_month)
+    ).all()
+    if touched:
+        refresh(db, {year_month for _, year_month in touched})
+    db.commit()
+
+    if touched:
+        analytics.invalidate(model, [row_id for row_id, _ in touched])
+    logger.info(f"Bulk updated {len(touched)} rows in {table.name}")
+    return len(touched)
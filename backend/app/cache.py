@@ -0,0 +1,178 @@
+"""통계 응답 캐시
+
+데이터가 바뀔 때마다 올라가는 세대(generation) 번호를 키에 포함하여
+통계 GET 응답을 메모리(LRU)에 보관하고, ETag 로 조건부 요청(304)을 처리한다.
+API 의 쓰기 요청이 성공하거나 적재 작업이 끝나면 세대가 올라가 이전 응답은 더 이상 쓰이지 않는다.
+작업 프로세스(재분류 등)가 도중에 commit 한 변경도 PRAGMA data_version 으로 감지하여 세대를 올린다.
+"""
+from collections import OrderedDict
+from fastapi import Request
+from starlette.responses import Response
+import hashlib
+import os
+import sqlite3
+import threading
+import uuid
+
+from .database import DATABASE_PATH
+
+# 캐시할 경로 (prefix)
+CACHED_PATH_PREFIXES = (
+    "/api/statistics",
+    "/api/dashboard",
+    "/api/card-transactions/statistics",
+    "/api/ledger",
+    "/api/search",
+)
+# 보관할 최대 응답 수
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 256))
+
+_READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# 서버가 다시 시작되면 이전 ETag 는 맞지 않도록 구분값 포함
+_epoch = uuid.uuid4().hex[:8]
+_generation = 0
+_lock = threading.Lock()
+
+# 데이터베이스 변경 감지용 읽기 전용 연결 - 이 연결 밖에서 commit 이 있을 때마다 data_version 이 바뀜
+_watch_connection: "sqlite3.Connection" = None
+_data_version = None
+
+
+class ResponseCache:
+    """최대 개수가 정해진 LRU 응답 캐시"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0  # ETag 일치로 304 응답한 횟수
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, entry: tuple) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+
+
+def bump_generation() -> None:
+    """데이터 변경 후 호출 - 이후 요청은 새로 계산"""
+    global _generation
+    with _lock:
+        _generation += 1
+
+
+def _check_database() -> None:
+    """다른 연결(작업 프로세스 포함)이 commit 했으면 세대 증가"""
+    global _watch_connection, _data_version, _generation
+    with _lock:
+        if _watch_connection is None:
+            if not os.path.exists(DATABASE_PATH):  # 다른 데이터베이스를 쓰는 스크립트 (벤치마크 등)
+                return
+            _watch_connection = sqlite3.connect(f"file:{DATABASE_PATH}?mode=ro", uri=True, check_same_thread=False)
+        data_version = _watch_connection.execute("PRAGMA data_version").fetchone()[0]
+        if _data_version is not None and data_version != _data_version:
+            _generation += 1
+        _data_version = data_version
+
+
+def current_generation() -> int:
+    """현재 데이터 세대"""
+    _check_database()
+    return _generation
+
+
+def stats() -> dict:
+    """캐시 적중/실패 횟수 등"""
+    return {**_cache.stats(), "generation": _generation}
+
+
+def _is_cached_path(path: str) -> bool:
+    return path.startswith(CACHED_PATH_PREFIXES)
+
+
+def _etag(generation: int, key: tuple) -> str:
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+    return f'"{_epoch}-{generation}-{digest}"'
+
+
+async def cache_middleware(request: Request, call_next):
+    """통계 GET 응답 캐시 / ETag 처리, 쓰기 요청 성공 시 세대 증가"""
+    path = request.url.path
+
+    if request.method not in _READ_METHODS:
+        response = await call_next(request)
+        if path.startswith("/api/") and response.status_code < 400:
+            bump_generation()
+        return response
+
+    if request.method != "GET" or not _is_cached_path(path):
+        return await call_next(request)
+
+    generation = current_generation()
+    key = (path, tuple(sorted(request.query_params.multi_items())))
+    etag = _etag(generation, key)
+
+    # 같은 세대에서 받은 응답이면 본문 없이 304
+    if request.headers.get("if-none-match") == etag:
+        _cache.record_not_modified()
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    cached = _cache.get((generation,) + key)
+    if cached is not None:
+        body, content_type = cached
+        return Response(
+            content=body,
+            headers={
+                "Content-Type": content_type,
+                "ETag": etag,
+                "Cache-Control": "no-cache",
+                "X-Cache": "HIT"
+            }
+        )
+
+    response = await call_next(request)
+    if response.status_code != 200:
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    # 계산 중에 데이터가 바뀌었으면 이전 세대 키로 저장되어 다시 쓰이지 않음
+    _cache.put((generation,) + key, (body, response.headers.get("content-type")))
+
+    headers = dict(response.headers)
+    headers.pop("content-length", None)
+    headers.update({"ETag": etag, "Cache-Control": "no-cache", "X-Cache": "MISS"})
+    return Response(content=body, headers=headers)
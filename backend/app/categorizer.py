@@ -0,0 +1,161 @@
+"""카테고리 자동 분류용 키워드 매처
+
+CategoryMapping 키워드와 TransactionCategory 메모 토큰을 Aho-Corasick 오토마톤으로
+컴파일하여 프로세스 전체에서 공유한다. 매핑이 생성/수정/삭제될 때만 다시 만든다.
+"""
+from collections import deque
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Optional, Tuple
+import logging
+import threading
+
+from . import models
+from .enums import TransactionCategory
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordMatcher:
+    """Aho-Corasick 오토마톤 기반 다중 키워드 매처
+
+    여러 키워드가 함께 포함된 경우 먼저 등록된 키워드의 값을 반환한다.
+    (기존의 순차 `keyword in text` 검사와 같은 결과)
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, str]]):
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        # 각 상태에서 매칭되는 키워드 중 가장 앞선 순번 (fail 경로 포함)
+        self._best: List[Optional[int]] = [None]
+        self._values: List[str] = []
+
+        for priority, (keyword, value) in enumerate(patterns):
+            self._values.append(value)
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                state = next_state
+            if self._best[state] is None:
+                self._best[state] = priority
+
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._best[next_state] = self._min_priority(
+                    self._best[next_state], self._best[self._fail[next_state]]
+                )
+
+    @staticmethod
+    def _min_priority(a: Optional[int], b: Optional[int]) -> Optional[int]:
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return min(a, b)
+
+    def match(self, text: Optional[str]) -> Optional[str]:
+        """text 에 포함된 키워드 중 가장 먼저 등록된 키워드의 값"""
+        if not self._values:
+            return None
+
+        goto, fail, best_of = self._goto, self._fail, self._best
+        best = best_of[0]  # 빈 키워드는 모든 문자열에 포함됨
+        if text:
+            state = 0
+            for char in text:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                priority = best_of[state]
+                if priority is not None and (best is None or priority < best):
+                    best = priority
+                    if best == 0:
+                        break
+
+        return self._values[best] if best is not None else None
+
+
+# 메모의 카테고리 토큰 (매핑과 관계없으므로 프로세스 전체에서 하나만 생성)
+MEMO_MATCHER = KeywordMatcher(
+    (category.value, category.value)
+    for category in TransactionCategory
+    if category != TransactionCategory.UNCATEGORIZED
+)
+
+
+def memo_category(memo: Optional[str]) -> Optional[str]:
+    """메모에 적힌 카테고리 (여러 개면 먼저 정의된 카테고리, 없으면 None)"""
+    return MEMO_MATCHER.match(memo) if memo else None
+
+
+class CategoryMatcher:
+    """메모의 카테고리 토큰과 거래처 키워드 매핑을 함께 검사하는 분류기"""
+
+    def __init__(self, mappings: Iterable[Tuple[str, str]]):
+        self.memo_matcher = MEMO_MATCHER
+        self.keyword_matcher = KeywordMatcher(mappings)
+
+    def categorize(self, description: Optional[str], memo: Optional[str]) -> Optional[str]:
+        """카테고리를 찾지 못하면 None"""
+        # 1. 메모에 카테고리가 명시되어 있는지 확인
+        if memo:
+            category = self.memo_matcher.match(memo)
+            if category:
+                return category
+
+        # 2. 매핑 테이블의 키워드 검색
+        return self.keyword_matcher.match(description)
+
+
+_matcher: Optional[CategoryMatcher] = None
+_matcher_version = 0
+_matcher_lock = threading.Lock()
+
+
+def build_matcher(db: Session) -> CategoryMatcher:
+    """현재 매핑 테이블로 분류기 생성 (등록 순서 유지)"""
+    mappings = db.query(
+        models.CategoryMapping.keyword,
+        models.CategoryMapping.category
+    ).order_by(models.CategoryMapping.id).all()
+    return CategoryMatcher((m.keyword, m.category) for m in mappings)
+
+
+def get_matcher(db: Session) -> CategoryMatcher:
+    """프로세스 공용 분류기 (없으면 매핑 테이블에서 생성)"""
+    global _matcher
+    matcher = _matcher
+    if matcher is not None:
+        return matcher
+
+    version = _matcher_version
+    matcher = build_matcher(db)
+    with _matcher_lock:
+        # 생성 중에 매핑이 바뀌었다면 캐시하지 않음
+        if version == _matcher_version:
+            _matcher = matcher
+            logger.info("Category matcher rebuilt")
+    return matcher
+
+
+def invalidate_matcher() -> None:
+    """매핑 변경 후 호출 - 다음 분류 시 분류기를 다시 생성"""
+    global _matcher, _matcher_version
+    with _matcher_lock:
+        _matcher = None
+        _matcher_version += 1
@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 import os
 
 # SQLite 데이터베이스 파일 경로
@@ -13,18 +15,88 @@ os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
 # SQLite 연결
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# 연결 시 적용할 PRAGMA 프로필 (SQLITE_PROFILE 환경변수로 선택)
+# - performance: WAL 로 읽기와 쓰기가 서로 막지 않고, 커밋마다 fsync 하지 않음
+# - default: SQLite 기본 설정 (rollback journal, synchronous=FULL)
+SQLITE_PROFILES = {
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,  # 256MB
+        "cache_size": -65536,  # 64MB (음수: KB 단위)
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,  # ms
+    },
+    "default": {
+        "busy_timeout": 5000,
+    },
+}
+SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "performance")
+
+# 개별 PRAGMA 는 SQLITE_<이름> 환경변수로 덮어쓸 수 있음 (예: SQLITE_MMAP_SIZE=0)
+SQLITE_PRAGMAS = {
+    name: os.environ.get(f"SQLITE_{name.upper()}", value)
+    for name, value in SQLITE_PROFILES[SQLITE_PROFILE].items()
+}
+
+# GET 요청용 읽기 전용 연결 수
+READ_POOL_SIZE = int(os.environ.get("SQLITE_READ_POOL_SIZE", 8))
+
+# 데이터베이스 파일 단위로 유지되는 설정 - 읽기 전용 연결에서는 변경할 수 없음
+_WRITER_ONLY_PRAGMAS = {"journal_mode"}
+
+
+def _pragma_listener(pragmas: dict):
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return set_pragmas
+
+
+def create_write_engine(database_path: str, pragmas: dict = SQLITE_PRAGMAS):
+    """쓰기용 엔진
+
+    SQLite 는 동시에 한 트랜잭션만 쓸 수 있으므로 쓰기 대기는 busy_timeout 으로 처리한다.
+    (연결 수를 1 로 제한하면 세션을 오래 잡고 있는 요청이 다른 요청을 막음)
+    """
+    write_engine = create_engine(
+        f"sqlite:///{database_path}",
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool
+    )
+    event.listen(write_engine, "connect", _pragma_listener(pragmas))
+    return write_engine
+
+
+def create_read_engine(database_path: str, pragmas: dict = SQLITE_PRAGMAS, pool_size: int = READ_POOL_SIZE):
+    """읽기 전용 엔진 (mode=ro) - WAL 모드에서는 쓰기 중에도 마지막 커밋 기준으로 읽음"""
+    read_engine = create_engine(
+        f"sqlite:///file:{database_path}?mode=ro&uri=true",
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=0
+    )
+    read_pragmas = {name: value for name, value in pragmas.items() if name not in _WRITER_ONLY_PRAGMAS}
+    event.listen(read_engine, "connect", _pragma_listener(read_pragmas))
+    return read_engine
+
+
+engine = create_write_engine(DATABASE_PATH)
+read_engine = create_read_engine(DATABASE_PATH)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
 
-# DB 세션 의존성
-def get_db():
-    db = SessionLocal()
+# DB 세션 의존성 (GET 요청은 읽기 전용 연결, 그 외는 쓰기 연결)
+def get_db(request: Request):
+    session_factory = ReadSessionLocal if request.method in ("GET", "HEAD") else SessionLocal
+    db = session_factory()
     try:
         yield db
     finally:
@@ -16,3 +16,37 @@ class TransactionCategory(str, Enum):
     CULTURE = "문화생활비"
     DDUI = "뚜이"  # Special category, as requested
     UNCATEGORIZED = "미분류"
+
+
+class CategorySource(str, Enum):
+    """거래 카테고리가 정해진 방식"""
+    AUTO = "auto"  # 매핑 규칙 / 메모로 자동 분류
+    MANUAL = "manual"  # 사용자가 직접 지정 (재분류 대상에서 제외)
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"  # 새 작업으로 대체됨 (재분류 작업)
+
+
+class SeriesResolution(str, Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"  # 월요일 ~ 일요일
+    MONTHLY = "monthly"
+
+
+class CardCubeDimension(str, Enum):
+    """카드 지출 집계를 나눌 수 있는 기준"""
+    YEAR_MONTH = "year_month"
+    CARD_HOLDER = "card_holder"
+    PAYMENT_TYPE = "payment_type"
+    CATEGORY = "category"
+
+
+class LedgerSource(str, Enum):
+    """통합 지출 내역의 출처"""
+    BANK = "bank"  # 은행 거래내역 (transactions)
+    CARD = "card"  # 카드 거래내역 (card_transactions)
@@ -0,0 +1,478 @@
+"""거래내역 일괄 적재 (bulk import)
+
+업로드된 거래를 한 건씩 조회/저장하는 대신, 영향을 받는 월의 기존 중복 체크 키를
+한 번의 쿼리로 읽어 메모리에서 신규 거래만 걸러낸 뒤 multi-row INSERT 로 저장한다.
+적요는 가맹점 사전의 merchant_id 로 바꿔 중복 체크 키에 쓴다. 카테고리는 거래마다 분류하지 않고
+가맹점을 처음 등록할 때 한 번만 분류한다 (거래에는 메모에 적힌 카테고리만 저장하고 그 외에는 조회 시 가맹점 분류 결과로 결정).
+"""
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+from . import categorizer, models, rollups, schemas, search
+from .merchants import MerchantDictionary
+from .enums import CategorySource
+
+logger = logging.getLogger(__name__)
+
+# 중복 체크 키 (같은 날짜, 금액, 거래처)
+TRANSACTION_DEDUP_COLUMNS = ("transaction_date", "amount", "merchant_id")
+# 중복 체크 키 (같은 카드소유자, 결제유형, 날짜, 금액, 가맹점)
+CARD_TRANSACTION_DEDUP_COLUMNS = ("card_holder", "payment_type", "transaction_date", "amount", "merchant_id")
+
+# 진행 상황 콜백 (파싱된 거래 수, 저장된 거래 수)
+ProgressCallback = Callable[[int, int], None]
+# 컬럼 단위 배치 (필드명 -> 값 목록)
+ColumnBatch = Dict[str, list]
+
+# 적재 구간의 마지막 거래 기준으로 이 기간 안의 거래는 항상 전체 중복 체크
+WATERMARK_OVERLAP_DAYS = {"transactions": 3, "card_transactions": 31}
+# 할부 내역은 매달 원래 결제일로 다시 나오므로 적재 구간을 두지 않음
+WATERMARK_EXCLUDED_PAYMENT_TYPES = {"할부"}
+
+
+def load_existing_keys(
+    db: Session,
+    model,
+    columns: Tuple[str, ...],
+    year_months: Iterable[str],
+    *filters
+) -> Set[tuple]:
+    """주어진 월들에 이미 저장된 거래의 중복 체크 키를 한 번의 쿼리로 조회"""
+    year_months = sorted(set(year_months))
+    if not year_months:
+        return set()
+
+    query = db.query(*[getattr(model, column) for column in columns]).filter(
+        model.year_month.in_(year_months),
+        *filters
+    )
+    return {tuple(row) for row in query}
+
+
+class ExistingKeys:
+    """월 단위로 기존 중복 체크 키를 한 번씩만 조회해 두는 집합"""
+
+    def __init__(self, db: Session, model, columns: Tuple[str, ...], *filters):
+        self.db = db
+        self.model = model
+        self.columns = columns
+        self.filters = filters
+        self.loaded_months: Set[str] = set()
+        self.keys: Set[tuple] = set()
+
+    def load(self, year_months: Iterable[str]) -> None:
+        """아직 조회하지 않은 월의 키만 추가로 조회"""
+        missing = set(year_months) - self.loaded_months
+        if missing:
+            self.keys |= load_existing_keys(self.db, self.model, self.columns, missing, *self.filters)
+            self.loaded_months |= missing
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.keys
+
+
+def batch_rows(batch: ColumnBatch) -> List[dict]:
+    """컬럼 배치를 행(dict) 목록으로 변환"""
+    names = list(batch)
+    return [dict(zip(names, values)) for values in zip(*batch.values())]
+
+
+def _transaction_watermark_scope(account_type: str) -> Callable[[dict], Optional[Tuple[str, str]]]:
+    # 계좌번호가 없는 내보내기 파일도 있으므로 계좌 유형까지 구간을 나눔 (payment_type 컬럼에 저장)
+    def scope_of(row: dict) -> Optional[Tuple[str, str]]:
+        return (row.get("account_number") or "", account_type)
+    return scope_of
+
+
+def _card_transaction_watermark_scope(row: dict) -> Optional[Tuple[str, str]]:
+    if row["payment_type"] in WATERMARK_EXCLUDED_PAYMENT_TYPES:
+        return None
+    return (row["card_holder"], row["payment_type"])
+
+
+def _window_start(high_date: str, overlap_days: int) -> Optional[str]:
+    """high-water mark 에서 overlap_days 만큼 이전 날짜 ("YYYY.MM.DD")"""
+    try:
+        high = datetime.strptime(high_date[:10], "%Y.%m.%d")
+    except ValueError:
+        return None
+    return (high - timedelta(days=overlap_days)).strftime("%Y.%m.%d")
+
+
+class Watermarks:
+    """계좌(번호/유형, 카드는 소유자/결제 유형)별 적재 완료 구간
+
+    같은 계좌의 내보내기 파일은 기간이 끊기지 않으므로, 이미 적재된 구간 안에서
+    마지막 거래보다 overlap_days 이상 이전인 거래는 중복 조회 없이 중복으로 처리한다.
+    구간은 새 파일의 기간이 기존 구간과 겹칠 때만 넓어진다.
+
+    이미 적재된 구간 안에 빠진 거래가 있으면 (예: 같은 기간을 일부 거래만 골라 만든 파일을 먼저 올린 경우)
+    그 거래는 다시 올려도 overlap 기간 밖이면 중복으로 처리되어 저장되지 않는다.
+    """
+
+    def __init__(self, db: Session, import_kind: str, account_type: str = ""):
+        self.db = db
+        self.import_kind = import_kind
+        self.scope_of = (
+            _transaction_watermark_scope(account_type) if import_kind == "transactions"
+            else _card_transaction_watermark_scope
+        )
+        overlap_days = WATERMARK_OVERLAP_DAYS[import_kind]
+
+        watermarks = db.query(models.ImportWatermark).filter(
+            models.ImportWatermark.import_kind == import_kind
+        ).all()
+        self.ranges = {(w.scope, w.payment_type): (w.low_date, w.high_date) for w in watermarks}
+        # 이번 적재 동안 건너뛸 구간 (적재 시작 시점 기준)
+        self.skip_ranges = {}
+        for key, (low_date, high_date) in self.ranges.items():
+            window_start = _window_start(high_date, overlap_days)
+            if window_start:
+                self.skip_ranges[key] = (low_date, window_start)
+        self.current: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self.changed: Set[Tuple[str, str]] = set()
+
+    def filter_uncovered(self, rows: List[dict]) -> List[dict]:
+        """적재 구간 밖(또는 overlap 기간 안)의 거래만 반환하고, 파일의 기간을 기록"""
+        uncovered = []
+        for row in rows:
+            key = self.scope_of(row)
+            if key is None:
+                uncovered.append(row)
+                continue
+
+            transaction_date = row["transaction_date"]
+            low_date, high_date = self.current.get(key, (transaction_date, transaction_date))
+            self.current[key] = (min(low_date, transaction_date), max(high_date, transaction_date))
+
+            skip_range = self.skip_ranges.get(key)
+            if skip_range and skip_range[0] <= transaction_date < skip_range[1]:
+                continue
+            uncovered.append(row)
+        return uncovered
+
+    def finish_file(self) -> None:
+        """파일 하나의 기간을 적재 구간에 반영"""
+        for key, (low_date, high_date) in self.current.items():
+            existing = self.ranges.get(key)
+            if existing is None or high_date < existing[0]:
+                # 처음 적재되었거나 기존 구간보다 이전 파일이면 기존 구간 유지
+                if existing is not None:
+                    continue
+                self.ranges[key] = (low_date, high_date)
+            elif low_date > existing[1]:
+                # 기존 구간과 떨어진 최신 파일 - 사이의 기간은 보장할 수 없으므로 새 구간으로 교체
+                self.ranges[key] = (low_date, high_date)
+            else:
+                self.ranges[key] = (min(low_date, existing[0]), max(high_date, existing[1]))
+            self.changed.add(key)
+        self.current = {}
+
+    def save(self) -> None:
+        """변경된 적재 구간 저장 (commit 은 호출한 쪽에서)"""
+        for scope, payment_type in self.changed:
+            low_date, high_date = self.ranges[(scope, payment_type)]
+            watermark = self.db.query(models.ImportWatermark).filter(
+                models.ImportWatermark.import_kind == self.import_kind,
+                models.ImportWatermark.scope == scope,
+                models.ImportWatermark.payment_type == payment_type
+            ).first()
+            if watermark is None:
+                self.db.add(models.ImportWatermark(
+                    import_kind=self.import_kind,
+                    scope=scope,
+                    payment_type=payment_type,
+                    low_date=low_date,
+                    high_date=high_date
+                ))
+            else:
+                watermark.low_date = low_date
+                watermark.high_date = high_date
+        self.changed = set()
+
+
+def forget_watermark(db: Session, import_kind: str, scope: str, payment_type: str = "") -> None:
+    """거래 삭제 시 해당 계좌/카드의 적재 구간 삭제 (다음 업로드는 전체 중복 체크)
+
+    거래내역은 scope=계좌번호, payment_type=계좌 유형
+    """
+    db.query(models.ImportWatermark).filter(
+        models.ImportWatermark.import_kind == import_kind,
+        models.ImportWatermark.scope == scope,
+        models.ImportWatermark.payment_type == payment_type
+    ).delete(synchronize_session=False)
+
+
+class CrossFileKeys:
+    """여러 파일을 함께 적재할 때 파일 간 중복 판별
+
+    같은 키의 거래가 한 파일 안에 여러 건 있으면 모두 유효한 거래로 보고,
+    다른 파일에서 다시 나온 같은 키의 거래는 이미 받은 건수만큼 중복으로 본다.
+    (누적 내보내기 파일이 서로 겹치는 경우)
+    """
+
+    def __init__(self):
+        self.accepted: Dict[tuple, int] = {}
+        self.current: Dict[tuple, int] = {}
+
+    def start_file(self) -> None:
+        self.current = {}
+
+    def is_duplicate(self, key: tuple) -> bool:
+        count = self.current.get(key, 0) + 1
+        self.current[key] = count
+        return count <= self.accepted.get(key, 0)
+
+    def finish_file(self) -> None:
+        for key, count in self.current.items():
+            if count > self.accepted.get(key, 0):
+                self.accepted[key] = count
+        self.current = {}
+
+
+def _split_new_rows(
+    rows: List[dict],
+    columns: Tuple[str, ...],
+    existing_keys,
+    cross_file_keys: Optional[CrossFileKeys] = None
+):
+    """기존 키와 겹치지 않는 신규 거래와 중복 건수를 반환
+
+    파일 내부에서 키가 같은 거래(같은 날 같은 가맹점의 동일 금액 결제 등)는
+    기존 동작과 동일하게 모두 신규로 취급한다.
+    """
+    new_rows = []
+    duplicate_records = 0
+    for row in rows:
+        key = tuple(row[column] for column in columns)
+        is_duplicate = key in existing_keys
+        if cross_file_keys is not None:
+            # 파일 간 중복 건수는 DB 에 있는 거래도 포함하여 셈
+            is_duplicate = cross_file_keys.is_duplicate(key) or is_duplicate
+        if is_duplicate:
+            duplicate_records += 1
+            continue
+        new_rows.append(row)
+    return new_rows, duplicate_records
+
+
+def bulk_insert(db: Session, model, rows: List[dict]) -> None:
+    """multi-row INSERT (executemany) 로 저장, 전문 검색 색인은 저장 후 한 번에 갱신"""
+    if rows:
+        with search.deferred_index(db, model):
+            db.execute(model.__table__.insert(), rows)
+
+
+def _import_chunks(
+    db: Session,
+    model,
+    columns: Tuple[str, ...],
+    chunks: Iterable[List[dict]],
+    existing_keys: ExistingKeys,
+    prepare: Callable[[dict], None],
+    watermarks: Watermarks,
+    merchants: MerchantDictionary,
+    progress: Optional[ProgressCallback] = None,
+    cross_file_keys: Optional[CrossFileKeys] = None,
+    touched_months: Optional[Set[str]] = None
+) -> schemas.UploadResponse:
+    """chunk 단위로 중복 제거 후 저장 (commit 은 호출한 쪽에서)
+
+    touched_months 가 주어지면 새로 저장된 거래의 년월을 추가한다 (통계 집계 갱신용).
+    """
+    total_records = 0
+    new_records = 0
+    duplicate_records = 0
+
+    for rows in chunks:
+        # 이미 적재된 구간의 거래는 중복 조회 전에 제외
+        candidates = watermarks.filter_uncovered(rows)
+        merchants.resolve(row["description"] for row in candidates)
+        for row in candidates:
+            row["merchant_id"] = merchants[row["description"]]
+        existing_keys.load(row["year_month"] for row in candidates)
+        new_rows, duplicates = _split_new_rows(candidates, columns, existing_keys, cross_file_keys)
+        duplicates += len(rows) - len(candidates)
+
+        for row in new_rows:
+            prepare(row)
+
+        bulk_insert(db, model, new_rows)
+        if touched_months is not None:
+            touched_months.update(row["year_month"] for row in new_rows)
+        total_records += len(rows)
+        new_records += len(new_rows)
+        duplicate_records += duplicates
+        if progress:
+            progress(total_records, new_records)
+
+    watermarks.finish_file()
+    return schemas.UploadResponse(
+        message="업로드 완료",
+        total_records=total_records,
+        new_records=new_records,
+        duplicate_records=duplicate_records
+    )
+
+
+def _transaction_preparer(account_type: str) -> Callable[[dict], None]:
+    def prepare(trans_data: dict) -> None:
+        # 메모에 적힌 카테고리만 저장 (매핑 분류 결과는 조회 시 가맹점으로 결정)
+        trans_data["category"] = categorizer.memo_category(trans_data.get("memo"))
+        trans_data["category_source"] = CategorySource.AUTO.value
+        trans_data["account_type"] = account_type
+    return prepare
+
+
+def _card_transaction_preparer() -> Callable[[dict], None]:
+    def prepare(trans_data: dict) -> None:
+        # 카테고리는 저장하지 않음 (메모가 없으므로 조회 시 가맹점 분류 결과로 결정)
+        trans_data["category_source"] = CategorySource.AUTO.value
+        trans_data["memo"] = None  # 기본값
+    return prepare
+
+
+def import_transactions(
+    db: Session,
+    batches: Iterable[ColumnBatch],
+    account_type: str,
+    progress: Optional[ProgressCallback] = None,
+    before_commit: Optional[Callable[[schemas.UploadResponse], None]] = None
+) -> schemas.UploadResponse:
+    """토스뱅크 거래내역 일괄 적재 (컬럼 배치 단위)
+
+    before_commit 은 저장 후 commit 전에 결과로 호출된다 (적재 기록 등을 같은 트랜잭션에 저장).
+    """
+    watermarks = Watermarks(db, "transactions", account_type)
+    touched_months: Set[str] = set()
+    result = _import_chunks(
+        db,
+        models.Transaction,
+        TRANSACTION_DEDUP_COLUMNS,
+        (batch_rows(batch) for batch in batches),
+        ExistingKeys(db, models.Transaction, TRANSACTION_DEDUP_COLUMNS),
+        _transaction_preparer(account_type),
+        watermarks,
+        MerchantDictionary(db),
+        progress,
+        touched_months=touched_months
+    )
+    watermarks.save()
+    rollups.refresh(db, touched_months)
+    if before_commit:
+        before_commit(result)
+    db.commit()
+    logger.info(f"Imported {result.new_records} transactions ({result.duplicate_records} duplicates skipped)")
+    return result
+
+
+def import_card_transactions(
+    db: Session,
+    chunks: Iterable[List[dict]],
+    card_holder: str,
+    progress: Optional[ProgressCallback] = None,
+    before_commit: Optional[Callable[[schemas.UploadResponse], None]] = None
+) -> schemas.UploadResponse:
+    """카드 거래내역 일괄 적재 (파서가 넘겨주는 chunk 단위로 순차 처리)
+
+    before_commit 은 저장 후 commit 전에 결과로 호출된다 (적재 기록 등을 같은 트랜잭션에 저장).
+    """
+    watermarks = Watermarks(db, "card_transactions")
+    touched_months: Set[str] = set()
+    result = _import_chunks(
+        db,
+        models.CardTransaction,
+        CARD_TRANSACTION_DEDUP_COLUMNS,
+        chunks,
+        ExistingKeys(
+            db,
+            models.CardTransaction,
+            CARD_TRANSACTION_DEDUP_COLUMNS,
+            models.CardTransaction.card_holder == card_holder
+        ),
+        _card_transaction_preparer(),
+        watermarks,
+        MerchantDictionary(db),
+        progress,
+        touched_months=touched_months
+    )
+    watermarks.save()
+    rollups.refresh_card_cube(db, touched_months)
+    if before_commit:
+        before_commit(result)
+    db.commit()
+    logger.info(f"Imported {result.new_records} card transactions ({result.duplicate_records} duplicates skipped)")
+    return result
+
+
+def import_files(
+    db: Session,
+    parsed_files: List[Tuple[str, list]],
+    account_type: str,
+    card_holder: Optional[str],
+    before_commit: Optional[Callable[[List[schemas.UploadResponse]], None]] = None
+) -> List[schemas.UploadResponse]:
+    """여러 파일(토스뱅크/카드 혼합)을 파일 간 중복까지 제거하여 한 트랜잭션으로 적재
+
+    Args:
+        parsed_files: (종류, 파싱 결과) 목록 - "transactions" 는 컬럼 배치 목록,
+            "card_transactions" 는 거래 chunk 목록
+        before_commit: 저장 후 commit 전에 파일별 결과로 호출 (적재 기록 등을 같은 트랜잭션에 저장)
+    Returns:
+        파일별 업로드 결과 (parsed_files 순서)
+    """
+    transaction_keys = ExistingKeys(db, models.Transaction, TRANSACTION_DEDUP_COLUMNS)
+    card_keys = ExistingKeys(
+        db,
+        models.CardTransaction,
+        CARD_TRANSACTION_DEDUP_COLUMNS,
+        models.CardTransaction.card_holder == card_holder
+    )
+    cross_file_keys = {"transactions": CrossFileKeys(), "card_transactions": CrossFileKeys()}
+    watermarks = {kind: Watermarks(db, kind, account_type) for kind in ("transactions", "card_transactions")}
+    merchants = MerchantDictionary(db)
+    touched_months: Set[str] = set()
+    touched_card_months: Set[str] = set()
+    prepare_transaction = _transaction_preparer(account_type)
+    prepare_card_transaction = _card_transaction_preparer()
+
+    results = []
+    try:
+        for kind, data in parsed_files:
+            file_keys = cross_file_keys[kind]
+            file_keys.start_file()
+            if kind == "transactions":
+                result = _import_chunks(
+                    db, models.Transaction, TRANSACTION_DEDUP_COLUMNS,
+                    (batch_rows(batch) for batch in data), transaction_keys,
+                    prepare_transaction, watermarks[kind], merchants, cross_file_keys=file_keys,
+                    touched_months=touched_months
+                )
+            else:
+                result = _import_chunks(
+                    db, models.CardTransaction, CARD_TRANSACTION_DEDUP_COLUMNS,
+                    data, card_keys,
+                    prepare_card_transaction, watermarks[kind], merchants, cross_file_keys=file_keys,
+                    touched_months=touched_card_months
+                )
+            file_keys.finish_file()
+            results.append(result)
+
+        for kind_watermarks in watermarks.values():
+            kind_watermarks.save()
+        rollups.refresh(db, touched_months)
+        rollups.refresh_card_cube(db, touched_card_months)
+        if before_commit:
+            before_commit(results)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(
+        f"Imported {len(parsed_files)} files: "
+        f"{sum(r.new_records for r in results)} new, {sum(r.duplicate_records for r in results)} duplicates"
+    )
+    return results
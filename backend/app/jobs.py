@@ -0,0 +1,251 @@
+"""업로드 적재 작업 관리
+
+Excel 파싱과 DB 적재는 CPU/IO 를 오래 점유하므로 이벤트 루프가 아닌
+process pool 에서 실행하고, 진행 상황은 Manager 로 공유되는 작업 목록에 기록한다.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Hashable, List, Optional
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+
+from . import cache
+from .enums import JobStatus
+
+logger = logging.getLogger(__name__)
+
+# 적재 작업 프로세스 수
+IMPORT_WORKERS = int(os.environ.get("IMPORT_WORKERS", min(4, os.cpu_count() or 1)))
+# 메모리에 보관할 최대 작업 수 (오래된 완료 작업부터 정리)
+MAX_JOB_HISTORY = 100
+
+_lock = threading.Lock()
+_submit_lock = threading.Lock()  # 같은 파일의 진행 중 작업 확인과 등록을 한 번에
+_executor: Optional[ProcessPoolExecutor] = None
+_manager = None
+_jobs = None  # job_id -> 작업 상태 dict (프로세스 간 공유)
+_job_ids: List[str] = []  # 생성 순서
+
+
+def _init_worker() -> None:
+    """작업 프로세스 초기화 - 부모에게서 물려받은 DB 연결은 사용하지 않음"""
+    from .database import engine, read_engine
+    engine.dispose()
+    read_engine.dispose()
+
+
+def _ensure_started():
+    global _executor, _manager, _jobs
+    with _lock:
+        if _executor is None:
+            context = multiprocessing.get_context("spawn")
+            _manager = context.Manager()
+            _jobs = _manager.dict()
+            _executor = ProcessPoolExecutor(
+                max_workers=IMPORT_WORKERS,
+                mp_context=context,
+                initializer=_init_worker
+            )
+            logger.info(f"Import worker pool started ({IMPORT_WORKERS} workers)")
+    return _executor, _jobs
+
+
+def _update(jobs, job_id: str, **fields) -> None:
+    # Manager dict 의 값은 복사본이므로 통째로 다시 저장해야 반영됨
+    jobs[job_id] = {**jobs[job_id], **fields}
+
+
+def _run_job(jobs, job_id: str, func: Callable, args: tuple) -> None:
+    """작업 프로세스에서 실행되는 래퍼"""
+    from . import categorizer
+
+    # 매핑은 API 프로세스에서 바뀌므로 작업마다 분류기를 새로 생성
+    categorizer.invalidate_matcher()
+    _update(jobs, job_id, status=JobStatus.RUNNING.value, started_at=datetime.now().isoformat())
+
+    def report(rows_parsed: int, rows_inserted: int) -> None:
+        _update(jobs, job_id, rows_parsed=rows_parsed, rows_inserted=rows_inserted)
+
+    try:
+        result = func(*args, progress=report)
+        _update(
+            jobs,
+            job_id,
+            status=JobStatus.COMPLETED.value,
+            rows_parsed=result.total_records,
+            rows_inserted=result.new_records,
+            result=result.dict(),
+            finished_at=datetime.now().isoformat()
+        )
+    except Exception as e:
+        logger.error(f"Import job {job_id} failed: {e}", exc_info=True)
+        _update(
+            jobs,
+            job_id,
+            status=JobStatus.FAILED.value,
+            error=f"파일 처리 중 오류 발생: {str(e)}",
+            finished_at=datetime.now().isoformat()
+        )
+
+
+def _on_done(jobs, job_id: str, future) -> None:
+    """작업 종료 처리 - 통계 캐시 무효화, 작업 프로세스가 비정상 종료된 경우 실패로 기록"""
+    cache.bump_generation()
+    error = future.exception()
+    if error is not None:
+        logger.error(f"Import job {job_id} crashed: {error}")
+        _update(
+            jobs,
+            job_id,
+            status=JobStatus.FAILED.value,
+            error=f"파일 처리 중 오류 발생: {str(error)}",
+            finished_at=datetime.now().isoformat()
+        )
+
+
+def _prune(jobs) -> None:
+    """보관 한도를 넘으면 오래된 완료 작업 정리"""
+    finished = {JobStatus.COMPLETED.value, JobStatus.FAILED.value}
+    while len(_job_ids) > MAX_JOB_HISTORY:
+        oldest = next((j for j in _job_ids if jobs[j]["status"] in finished), None)
+        if oldest is None:
+            break
+        _job_ids.remove(oldest)
+        del jobs[oldest]
+
+
+def _register(jobs, kind: str, filename: Optional[str], **fields) -> str:
+    job_id = uuid.uuid4().hex
+    now = datetime.now().isoformat()
+    jobs[job_id] = {
+        "job_id": job_id,
+        "kind": kind,
+        "filename": filename,
+        "status": JobStatus.QUEUED.value,
+        "rows_parsed": 0,
+        "rows_inserted": 0,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "started_at": None,
+        "finished_at": None,
+        **fields
+    }
+    with _lock:
+        _job_ids.append(job_id)
+        _prune(jobs)
+    return job_id
+
+
+def _find_unfinished(jobs, kind: str, content_key: Hashable) -> Optional[dict]:
+    """같은 content_key 로 등록되어 대기 중이거나 실행 중인 작업"""
+    unfinished = {JobStatus.QUEUED.value, JobStatus.RUNNING.value}
+    with _lock:
+        job_ids = list(_job_ids)
+    for job_id in job_ids:
+        job = jobs.get(job_id)
+        if job and job["kind"] == kind and job.get("content_key") == content_key and job["status"] in unfinished:
+            return job
+    return None
+
+
+def submit(
+    kind: str,
+    func: Callable,
+    *args,
+    filename: Optional[str] = None,
+    content_key: Optional[Hashable] = None
+) -> dict:
+    """적재 작업 등록
+
+    func 는 모듈 최상위 함수여야 하며 (작업 프로세스로 전달됨),
+    progress 키워드 인자로 진행 상황 콜백을 받고 UploadResponse 를 반환해야 한다.
+    content_key(내용 해시, 적재 대상 등)가 같은 작업이 대기 중이거나 실행 중이면
+    새로 등록하지 않고 그 작업을 반환한다 (같은 파일을 연달아 올린 경우).
+    """
+    executor, jobs = _ensure_started()
+    with _submit_lock:
+        if content_key is not None:
+            job = _find_unfinished(jobs, kind, content_key)
+            if job is not None:
+                logger.info(f"Import job {job['job_id']} already queued for {filename}")
+                return job
+        job_id = _register(jobs, kind, filename, content_key=content_key)
+
+    future = executor.submit(_run_job, jobs, job_id, func, args)
+    future.add_done_callback(lambda f: _on_done(jobs, job_id, f))
+    logger.info(f"Import job {job_id} queued ({kind}, {filename})")
+    return jobs[job_id]
+
+
+def complete(kind: str, result, filename: Optional[str] = None) -> dict:
+    """작업 프로세스를 거치지 않고 이미 완료된 작업으로 등록 (이미 적재된 파일 등)"""
+    _, jobs = _ensure_started()
+    now = datetime.now().isoformat()
+    job_id = _register(
+        jobs,
+        kind,
+        filename,
+        status=JobStatus.COMPLETED.value,
+        rows_parsed=result.total_records,
+        rows_inserted=result.new_records,
+        result=result.dict(),
+        started_at=now,
+        finished_at=now
+    )
+    return jobs[job_id]
+
+
+async def run_in_worker(func: Callable, *args):
+    """작업 프로세스에서 함수를 실행하고 결과를 기다림 (이벤트 루프를 막지 않음)"""
+    executor, _ = _ensure_started()
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+def run_in_background(func: Callable, *args, on_done: Optional[Callable] = None) -> None:
+    """작업 프로세스에서 함수를 실행하고 기다리지 않음 (업로드 작업 목록에는 등록하지 않음)
+
+    끝나면 통계 캐시를 무효화하고 on_done(future) 를 호출한다.
+    """
+    executor, _ = _ensure_started()
+    future = executor.submit(func, *args)
+
+    def done(f) -> None:
+        cache.bump_generation()
+        if on_done is not None:
+            on_done(f)
+
+    future.add_done_callback(done)
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    """작업 상태 조회 (없으면 None)"""
+    if _jobs is None:
+        return None
+    return _jobs.get(job_id)
+
+
+def list_jobs() -> List[dict]:
+    """최근 작업부터 상태 목록 조회"""
+    if _jobs is None:
+        return []
+    with _lock:
+        job_ids = list(reversed(_job_ids))
+    return [job for job in (_jobs.get(job_id) for job_id in job_ids) if job]
+
+
+def shutdown() -> None:
+    """서버 종료 시 작업 프로세스 정리"""
+    global _executor, _manager, _jobs
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _manager.shutdown()
+            _executor = None
+            _manager = None
+            _jobs = None
+            _job_ids.clear()
@@ -0,0 +1,81 @@
+"""통합 지출 내역 (은행 거래내역 + 카드 거래내역)
+
+transactions 의 지출(금액 < 0)과 card_transactions 전체(취소는 양수로 상계)를 UNION ALL 로 합친
+SELECT 를 만든다. 통합 지출 엔드포인트는 이 SELECT 위에서 카테고리/월별로 한 번에 집계한다.
+
+은행 계좌에서 카드 대금이 빠져나간 거래는 카드 거래와 같은 지출을 두 번 세게 되므로
+기본적으로 제외한다 (적요가 CARD_PAYMENT_PATTERNS 중 하나와 일치하는 거래).
+"""
+from sqlalchemy import and_, func, literal, not_, or_, select, union_all
+from typing import Callable, Optional
+
+from . import models
+from .enums import LedgerSource, TransactionCategory
+
+# 카드 대금 출금으로 볼 은행 거래 적요 (LIKE 패턴)
+CARD_PAYMENT_PATTERNS = ("%카드%대금%", "%카드%결제대금%")
+
+
+def _category(column):
+    # 은행은 "미분류", 카드는 NULL 인 미분류 거래를 한 카테고리로 묶음
+    return func.coalesce(func.nullif(column, ""), TransactionCategory.UNCATEGORIZED.value)
+
+
+def is_card_payment(description_column):
+    """적요가 카드 대금 출금 패턴과 일치하는지"""
+    return or_(*(description_column.like(pattern) for pattern in CARD_PAYMENT_PATTERNS))
+
+
+def ledger_query(
+    from_month: Optional[str] = None,
+    to_month: Optional[str] = None,
+    exclude_card_payments: bool = True,
+    condition: Optional[Callable] = None
+):
+    """은행 지출과 카드 거래를 합친 SELECT (source, id, year_month, transaction_date, description,
+    amount, category, owner) - owner 는 은행은 계좌번호, 카드는 카드 사용자
+
+    월 조건과 테이블별 추가 조건 condition(model) 은 UNION 양쪽에 각각 걸어 테이블별 인덱스를 사용한다.
+    """
+    t = models.Transaction.__table__
+    c = models.CardTransaction.__table__
+
+    bank_filters = [t.c.amount < 0]
+    card_filters = []
+    if from_month:
+        bank_filters.append(t.c.year_month >= from_month)
+        card_filters.append(c.c.year_month >= from_month)
+    if to_month:
+        bank_filters.append(t.c.year_month <= to_month)
+        card_filters.append(c.c.year_month <= to_month)
+    if exclude_card_payments:
+        bank_filters.append(not_(is_card_payment(t.c.description)))
+    if condition is not None:
+        bank_filters.append(condition(models.Transaction))
+        card_filters.append(condition(models.CardTransaction))
+
+    bank = select(
+        literal(LedgerSource.BANK.value).label("source"),
+        t.c.id,
+        t.c.year_month,
+        t.c.transaction_date,
+        t.c.description,
+        t.c.amount,
+        _category(models.Transaction.category).label("category"),
+        t.c.account_number.label("owner"),
+    ).where(and_(*bank_filters))
+
+    card = select(
+        literal(LedgerSource.CARD.value).label("source"),
+        c.c.id,
+        c.c.year_month,
+        c.c.transaction_date,
+        c.c.description,
+        c.c.amount,
+        _category(models.CardTransaction.category).label("category"),
+        c.c.card_holder.label("owner"),
+    )
+    if card_filters:
+        card = card.where(and_(*card_filters))
+
+    return union_all(bank, card)
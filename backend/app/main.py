@@ -1,7 +1,8 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .routers import transactions, categories, statistics, card_transactions
+from .database import engine, Base, SessionLocal
+from . import cache, jobs, recategorize, rollups, search
+from .routers import transactions, categories, statistics, card_transactions, dashboard, imports, ledger, jobs as jobs_router, search as search_router
 import logging
 import time
 
@@ -33,6 +34,9 @@ async def log_requests(request: Request, call_next):
         logger.error(f"Request failed: {str(e)}", exc_info=True)
         raise
 
+# 통계 응답 캐시 (ETag / 304), 쓰기 요청 성공 시 캐시 세대 증가
+app.middleware("http")(cache.cache_middleware)
+
 # CORS 설정 (React 프론트엔드와 통신)
 app.add_middleware(
     CORSMiddleware,
@@ -46,7 +50,39 @@ app.add_middleware(
 app.include_router(transactions.router, prefix="/api/transactions", tags=["Transactions"])
 app.include_router(categories.router, prefix="/api/categories", tags=["Categories"])
 app.include_router(statistics.router, prefix="/api/statistics", tags=["Statistics"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
 app.include_router(card_transactions.router, prefix="/api", tags=["Card Transactions"])
+app.include_router(ledger.router, prefix="/api/ledger", tags=["Ledger"])
+app.include_router(search_router.router, prefix="/api/search", tags=["Search"])
+app.include_router(jobs_router.router, prefix="/api/jobs", tags=["Import Jobs"])
+app.include_router(imports.router, prefix="/api/imports", tags=["Imports"])
+
+
+@app.on_event("startup")
+def build_rollups():
+    # 집계 테이블 도입 전 데이터베이스는 최초 실행 시 집계 생성
+    db = SessionLocal()
+    try:
+        rollups.ensure_built(db)
+        # 전문 검색 색인 도입 전 데이터베이스는 최초 실행 시 색인 생성
+        search.ensure_index(db)
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+def resume_recategorization():
+    # 서버 종료로 중단된 재분류 작업은 저장된 위치부터 이어서 실행
+    db = SessionLocal()
+    try:
+        recategorize.resume_unfinished(db)
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+def shutdown_import_workers():
+    jobs.shutdown()
 
 
 @app.get("/")
@@ -54,6 +90,12 @@ def read_root():
     return {"message": "Account Book API Server"}
 
 
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    """통계 응답 캐시 적중/실패 횟수"""
+    return cache.stats()
+
+
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
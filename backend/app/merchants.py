@@ -0,0 +1,61 @@
+"""거래처 / 가맹점 사전
+
+편의점, 교통, 구독 서비스처럼 같은 적요가 수천 번 반복되므로 적요마다 merchants 에 한 행을 두고
+거래는 merchant_id 로 참조한다. 키워드 매핑 분류 결과도 가맹점 단위(merchants.category)로 저장하여
+업로드 / 매핑 적용 / 재분류 때 분류기를 거래마다가 아니라 가맹점마다 한 번만 실행한다.
+자동 분류 거래의 카테고리는 저장하지 않고 조회 시 가맹점 분류 결과로 정한다 (models.resolved_category).
+"""
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List
+import logging
+
+from . import categorizer, models, search
+
+logger = logging.getLogger(__name__)
+
+# 가맹점 id 조회 시 IN 절 하나에 넣을 적요 수
+LOOKUP_CHUNK_SIZE = 500
+
+
+class MerchantDictionary:
+    """적요 -> merchant_id (적재 동안 메모리에 유지, 처음 보는 적요는 가맹점으로 추가)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.ids: Dict[str, int] = {}
+
+    def resolve(self, names: Iterable[str]) -> None:
+        """아직 모르는 적요의 가맹점 id 를 조회하고, 없는 가맹점은 키워드 매핑 분류 결과와 함께 추가"""
+        missing = sorted(set(names) - self.ids.keys())
+        if not missing:
+            return
+
+        self._lookup(missing)
+        new_names = [name for name in missing if name not in self.ids]
+        if not new_names:
+            return
+
+        matcher = categorizer.get_matcher(self.db)
+        with search.deferred_index(self.db, models.Merchant):
+            # 다른 적재 작업이 먼저 추가한 가맹점은 건너뜀
+            self.db.execute(
+                insert(models.Merchant.__table__).on_conflict_do_nothing(index_elements=["name"]),
+                [{"name": name, "category": matcher.keyword_matcher.match(name)} for name in new_names]
+            )
+        self._lookup(new_names)
+        logger.info(f"Added {len(new_names)} merchants")
+
+    def _lookup(self, names: List[str]) -> None:
+        merchants = models.Merchant.__table__
+        for start in range(0, len(names), LOOKUP_CHUNK_SIZE):
+            rows = self.db.execute(
+                select(merchants.c.name, merchants.c.id).where(
+                    merchants.c.name.in_(names[start:start + LOOKUP_CHUNK_SIZE])
+                )
+            )
+            self.ids.update({name: merchant_id for name, merchant_id in rows})
+
+    def __getitem__(self, name: str) -> int:
+        return self.ids[name]
@@ -1,24 +1,112 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, ForeignKey, Integer, String, Float, DateTime, Index, UniqueConstraint, and_, func, or_, select
+from sqlalchemy.orm import Session, column_property
+from typing import Optional
 from .database import Base
+from .enums import TransactionCategory
+
+
+class Merchant(Base):
+    """거래처 / 가맹점 사전 (적요별 한 행, 키워드 매핑 분류 결과를 가맹점 단위로 저장)"""
+    __tablename__ = "merchants"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)  # 적요 (거래처명 / 가맹점명)
+    category = Column(String, nullable=True, index=True)  # 키워드 매핑 분류 결과 (매핑에 없으면 NULL)
+
+
+def resolved_category(stored_category, merchant_id, unmatched=None):
+    """거래의 카테고리 - 거래에 저장된 카테고리(직접 지정 / 메모) > 가맹점 분류 결과 (> unmatched)
+
+    매핑으로 정해지는 카테고리는 거래에 저장하지 않고 조회 시 정하므로 매핑이 바뀌어도 거래 행은 바뀌지 않는다.
+    """
+    merchant_category = select(Merchant.category).where(
+        Merchant.id == merchant_id
+    ).correlate_except(Merchant).scalar_subquery()
+    values = [stored_category, merchant_category]
+    if unmatched is not None:
+        values.append(unmatched)
+    return func.coalesce(*values)
+
+
+def category_condition(model, category: str, unmatched: Optional[str] = None):
+    """카테고리가 category 인 거래 조건 - 거래별로 카테고리를 계산하지 않고 인덱스로 찾음
+
+    저장된 카테고리와 가맹점 분류 결과를 따르는 거래(저장된 카테고리가 NULL)의 가맹점 모두 (category, merchant_id)
+    인덱스로 찾고, 가맹점은 merchants.category 인덱스로 찾는다. category 가 unmatched 이면 카테고리가 없는 거래도 포함한다.
+    """
+    table = model.__table__
+    merchants = Merchant.__table__
+    merchant_category = merchants.c.category == category
+    if category == unmatched:
+        merchant_category = or_(merchant_category, merchants.c.category.is_(None))
+    conditions = [
+        table.c.category == category,
+        and_(table.c.category.is_(None), table.c.merchant_id.in_(select(merchants.c.id).where(merchant_category))),
+    ]
+    if category == unmatched:
+        conditions.append(and_(table.c.category.is_(None), table.c.merchant_id.is_(None)))
+    return or_(*conditions)
+
+
+# 최신순 목록의 카테고리 필터를 거래 일시 순 스캔으로 바꾸는 매칭 거래 수 (조회 건수의 배수)
+ORDERED_SCAN_MATCH_RATIO = 50
+
+
+def category_filter(db: Session, model, category: str, unmatched: Optional[str] = None, rows: int = 100):
+    """최신순으로 rows 건(offset + limit)을 조회하는 목록의 카테고리 필터
+
+    인덱스로 찾으면 매칭 거래를 모두 정렬해야 하므로 매칭 거래가 많은 카테고리(미분류 등)는 느리고,
+    거래 일시 순으로 훑으면 매칭 거래가 적은 카테고리는 전체를 훑게 된다.
+    매칭 거래가 rows * ORDERED_SCAN_MATCH_RATIO 건 미만이면 category_condition (인덱스),
+    이상이면 조회 시 정한 카테고리로 걸러 거래 일시 인덱스를 최신순으로 훑다가 rows 건에서 멈춘다. (전체의 1/50 이내)
+    """
+    table = model.__table__
+    condition = category_condition(model, category, unmatched)
+    probe_limit = rows * ORDERED_SCAN_MATCH_RATIO
+    matches = db.execute(
+        select(func.count()).select_from(select(table.c.id).where(condition).limit(probe_limit).subquery())
+    ).scalar()
+    if matches < probe_limit:
+        return condition
+    return resolved_category(table.c.category, table.c.merchant_id, unmatched) == category
 
 
 class Transaction(Base):
     """거래내역 테이블"""
     __tablename__ = "transactions"
+    __table_args__ = (
+        # 월별 조회/통계 (거래 일시 정렬) + 업로드 중복 체크 키까지 포함
+        Index("ix_transactions_year_month_date", "year_month", "transaction_date", "amount", "merchant_id"),
+        # 계좌 유형 필터 + 월별 조회
+        Index("ix_transactions_account_type_year_month", "account_type", "year_month", "transaction_date"),
+        # 계좌별 최신 잔액
+        Index("ix_transactions_account_number_date", "account_number", "transaction_date"),
+        # 전체 거래내역 최신순
+        Index("ix_transactions_transaction_date", "transaction_date"),
+        # 카테고리 필터 / 재분류 - 저장된 카테고리, 가맹점 분류 결과를 따르는 거래(category IS NULL)의 가맹점
+        Index("ix_transactions_category_merchant", "category", "merchant_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     transaction_date = Column(String, nullable=False)  # 거래 일시
     description = Column(String, nullable=False)  # 적요 (거래처명)
+    merchant_id = Column(Integer, ForeignKey("merchants.id"), nullable=True, index=True)  # 거래처 (적요 사전)
     transaction_type = Column(String, nullable=False)  # 거래 유형
     institution = Column(String, nullable=True)  # 거래 기관
     account_number = Column(String, nullable=True)  # 계좌번호
     amount = Column(Float, nullable=False)  # 거래 금액 (음수: 지출, 양수: 수입)
     balance = Column(Float, nullable=False)  # 거래 후 잔액
     memo = Column(String, nullable=True)  # 메모
-    category = Column(String, nullable=True)  # 카테고리 (자동 분류 또는 수동 지정)
+    stored_category = Column("category", String, nullable=True)  # 직접 지정 또는 메모에 적힌 카테고리 (그 외: NULL)
+    category_source = Column(String, nullable=True)  # 카테고리 지정 방식 (auto, manual / 마이그레이션 전 거래: NULL)
     year_month = Column(String, nullable=False)  # 년월 (YYYY-MM) - 조회용
     account_type = Column(String, nullable=False, default="생활비")  # 계좌 유형 (생활비, 전체관리통장)
 
+    # 카테고리 (조회 시 결정, 매핑에 없으면 "미분류") - 카테고리 필터는 category_condition 사용
+    category = column_property(
+        resolved_category(stored_category, merchant_id, TransactionCategory.UNCATEGORIZED.value)
+    )
+
 
 class CategoryMapping(Base):
     """거래처별 카테고리 매핑 테이블"""
@@ -33,14 +121,149 @@ class CategoryMapping(Base):
 class CardTransaction(Base):
     """카드 거래내역 테이블 (Samsung Card 등)"""
     __tablename__ = "card_transactions"
+    __table_args__ = (
+        # 카테고리 필터 / 재분류 - 저장된 카테고리, 가맹점 분류 결과를 따르는 거래(category IS NULL)의 가맹점
+        Index("ix_card_transactions_category_merchant", "category", "merchant_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     card_holder = Column(String, nullable=False, index=True)  # 카드 사용자 (업로드 시 지정)
     payment_type = Column(String, nullable=False, index=True)  # 결제 유형 (일시불, 할부)
     transaction_date = Column(String, nullable=False, index=True)  # 거래 일시 (YYYY.MM.DD)
     description = Column(String, nullable=False)  # 가맹점명
+    merchant_id = Column(Integer, ForeignKey("merchants.id"), nullable=True, index=True)  # 가맹점 (적요 사전)
     amount = Column(Float, nullable=False)  # 거래 금액 (음수: 지출)
-    category = Column(String, nullable=True)  # 카테고리 (자동 분류 또는 수동 지정)
+    stored_category = Column("category", String, nullable=True)  # 직접 지정 또는 메모에 적힌 카테고리 (그 외: NULL)
+    category_source = Column(String, nullable=True)  # 카테고리 지정 방식 (auto, manual / 마이그레이션 전 거래: NULL)
     memo = Column(String, nullable=True)  # 메모
     year_month = Column(String, nullable=False, index=True)  # 년월 (YYYY-MM) - 조회용
     raw_date = Column(String, nullable=False)  # 원본 날짜 (YYYYMMDD)
+
+    # 카테고리 (조회 시 결정, 매핑에 없으면 NULL) - 카테고리 필터는 category_condition 사용
+    category = column_property(resolved_category(stored_category, merchant_id))
+
+
+class RecategorizationJob(Base):
+    """매핑 변경 후 기존 거래를 다시 분류하는 작업 (진행 위치를 저장하여 서버 재시작 시 이어서 실행)"""
+    __tablename__ = "recategorization_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, nullable=False)  # queued, running, completed, failed, cancelled
+    reason = Column(String, nullable=True)  # 작업을 만든 변경 (예: 매핑 삭제: 스타벅스)
+    current_table = Column(String, nullable=False)  # 처리 중인 테이블 (merchants)
+    last_id = Column(Integer, nullable=False, default=0)  # 마지막으로 처리한 가맹점 id
+    total_rows = Column(Integer, nullable=False, default=0)  # 작업 생성 시 두 테이블의 재분류 대상 거래 수
+    processed_rows = Column(Integer, nullable=False, default=0)  # 검사한 거래 수
+    updated_rows = Column(Integer, nullable=False, default=0)  # 카테고리가 바뀐 거래 수
+    error = Column(String, nullable=True)
+    created_at = Column(String, nullable=False)  # ISO 8601
+    started_at = Column(String, nullable=True)
+    finished_at = Column(String, nullable=True)
+
+
+class ImportedFile(Base):
+    """적재 완료된 업로드 파일 (내용 해시 기준 중복 업로드 확인용)"""
+    __tablename__ = "imported_files"
+    __table_args__ = (
+        UniqueConstraint("content_hash", "import_kind", "scope", name="uq_imported_files_hash_scope"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, nullable=False)  # 파일 내용 SHA-256
+    import_kind = Column(String, nullable=False)  # transactions, card_transactions
+    scope = Column(String, nullable=False)  # 계좌 유형 또는 카드 소유자
+    filename = Column(String, nullable=True)  # 업로드 당시 파일명
+    total_records = Column(Integer, nullable=False)
+    new_records = Column(Integer, nullable=False)
+    duplicate_records = Column(Integer, nullable=False)
+    imported_at = Column(String, nullable=False)  # 적재 완료 시각 (ISO 8601)
+
+
+class ImportWatermark(Base):
+    """계좌/카드별 적재 완료 구간 (재업로드 시 오래된 거래의 중복 조회 생략용)"""
+    __tablename__ = "import_watermarks"
+    __table_args__ = (
+        UniqueConstraint("import_kind", "scope", "payment_type", name="uq_import_watermarks_scope"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    import_kind = Column(String, nullable=False)  # transactions, card_transactions
+    scope = Column(String, nullable=False)  # 계좌번호 또는 카드 소유자
+    payment_type = Column(String, nullable=False, default="")  # 결제 유형 (카드) 또는 계좌 유형 (거래내역)
+    low_date = Column(String, nullable=False)  # 적재 구간의 가장 이른 거래 일시
+    high_date = Column(String, nullable=False)  # 적재 구간의 가장 늦은 거래 일시 (high-water mark)
+
+
+class MonthlyRollup(Base):
+    """월/계좌 유형/카테고리별 거래 집계 (통계 조회용, 거래 변경 시 같은 트랜잭션에서 갱신)"""
+    __tablename__ = "monthly_rollups"
+    __table_args__ = (
+        UniqueConstraint("year_month", "account_type", "category", name="uq_monthly_rollups_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    year_month = Column(String, nullable=False)  # 년월 (YYYY-MM)
+    account_type = Column(String, nullable=False)  # 계좌 유형
+    category = Column(String, nullable=False)  # 카테고리 (미지정: 빈 문자열)
+    income_total = Column(Float, nullable=False)  # 수입 합계
+    income_count = Column(Integer, nullable=False)
+    expense_total = Column(Float, nullable=False)  # 지출 합계 (음수)
+    expense_count = Column(Integer, nullable=False)
+    transaction_count = Column(Integer, nullable=False)  # 전체 거래 수 (금액 0 포함)
+    first_date = Column(String, nullable=False)  # 첫 거래 일시 (거래 일시, id 순)
+    first_id = Column(Integer, nullable=False)
+    first_amount = Column(Float, nullable=False)  # 첫 거래 금액
+    first_balance = Column(Float, nullable=False)  # 첫 거래 후 잔액
+    last_date = Column(String, nullable=False)  # 마지막 거래 일시
+    last_id = Column(Integer, nullable=False)
+    last_balance = Column(Float, nullable=False)  # 마지막 거래 후 잔액
+
+
+class AccountBalance(Base):
+    """계좌별 월말 잔액 스냅샷 (해당 월 마지막 거래 기준, 거래 변경 시 같은 트랜잭션에서 갱신)"""
+    __tablename__ = "account_balances"
+    __table_args__ = (
+        UniqueConstraint("year_month", "account_number", "account_type", name="uq_account_balances_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    year_month = Column(String, nullable=False)  # 년월 (YYYY-MM)
+    account_number = Column(String, nullable=False)  # 계좌번호
+    account_type = Column(String, nullable=False)  # 계좌 유형
+    institution = Column(String, nullable=True)  # 마지막 거래의 거래 기관
+    last_date = Column(String, nullable=False)  # 마지막 거래 일시
+    last_id = Column(Integer, nullable=False)
+    balance = Column(Float, nullable=False)  # 마지막 거래 후 잔액
+
+
+class AccountLatestBalance(Base):
+    """계좌별 최신 잔액 스냅샷 (account_balances 에서 계좌별 가장 최근 월)"""
+    __tablename__ = "account_latest_balances"
+    __table_args__ = (
+        UniqueConstraint("account_number", "account_type", name="uq_account_latest_balances_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    account_number = Column(String, nullable=False)  # 계좌번호
+    account_type = Column(String, nullable=False)  # 계좌 유형
+    year_month = Column(String, nullable=False)  # 마지막 거래 년월
+    institution = Column(String, nullable=True)  # 마지막 거래의 거래 기관
+    last_date = Column(String, nullable=False)  # 마지막 거래 일시
+    last_id = Column(Integer, nullable=False)
+    balance = Column(Float, nullable=False)  # 마지막 거래 후 잔액
+
+
+class CardSpendingCube(Base):
+    """월/카드 사용자/결제 유형/카테고리별 카드 거래 집계 (카드 통계 조회용, 카드 거래 변경 시 같은 트랜잭션에서 갱신)"""
+    __tablename__ = "card_spending_cube"
+    __table_args__ = (
+        UniqueConstraint("year_month", "card_holder", "payment_type", "category", name="uq_card_spending_cube_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    year_month = Column(String, nullable=False)  # 년월 (YYYY-MM)
+    card_holder = Column(String, nullable=False)  # 카드 사용자
+    payment_type = Column(String, nullable=False)  # 결제 유형 (일시불, 할부)
+    category = Column(String, nullable=False)  # 카테고리 (미지정: 빈 문자열)
+    total_amount = Column(Float, nullable=False)  # 금액 합계 (음수: 지출)
+    transaction_count = Column(Integer, nullable=False)
@@ -0,0 +1,260 @@
+"""매핑 변경 후 기존 거래 재분류 작업
+
+매핑이 수정/삭제되면 가맹점 사전(merchants)의 가맹점마다 현재 매핑으로 한 번 분류하여
+merchants.category 를 갱신한다. 자동 분류 거래의 카테고리는 조회 시 가맹점 분류 결과로 정해지므로
+거래 행은 바꾸지 않고, 분류 결과가 바뀐 가맹점의 거래가 있는 월의 집계만 다시 계산한다.
+사용자가 직접 지정한 카테고리(manual)와 메모에 적힌 카테고리는 매핑과 관계없이 유지된다.
+
+작업 상태와 진행 위치(마지막 가맹점 id)는 recategorization_jobs 테이블에 저장한다.
+배치마다 가맹점 분류 결과 / 집계 갱신 / 진행 위치를 한 트랜잭션으로 commit 하므로
+서버가 중간에 종료되어도 다음 시작 시 마지막 위치부터 이어서 실행한다.
+"""
+from datetime import datetime
+from functools import partial
+from sqlalchemy import and_, bindparam, func, or_, select, update
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+import logging
+
+from . import analytics, categorizer, jobs, models, rollups
+from .database import SessionLocal
+from .enums import CategorySource, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# 한 트랜잭션에서 검사할 가맹점 수
+RECATEGORIZE_BATCH_SIZE = 1000
+# 작업 목록 조회 시 최대 개수
+MAX_LISTED_JOBS = 20
+
+_UNFINISHED = (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+
+
+class _Target(NamedTuple):
+    name: str
+    model: type
+    refresh: Callable[[Session, Iterable[str]], None]  # 변경된 월의 집계 갱신
+
+
+TARGETS = (
+    _Target("transactions", models.Transaction, rollups.refresh),
+    _Target("card_transactions", models.CardTransaction, rollups.refresh_card_cube),
+)
+
+
+def not_manual(table):
+    """사용자가 직접 지정하지 않은 거래"""
+    return or_(
+        table.c.category_source.is_(None),
+        table.c.category_source != CategorySource.MANUAL.value
+    )
+
+
+def follows_merchant(table):
+    """카테고리를 가맹점 분류 결과로 정하는 거래 - 직접 지정한 카테고리와 메모에 적힌 카테고리가 없는 거래"""
+    return table.c.category.is_(None)
+
+
+def follows_merchants(db: Session, model, merchant_ids: List[int]) -> Dict[str, int]:
+    """merchant_ids 가맹점의 분류 결과를 따르는 거래의 년월별 건수 (가맹점 분류 결과가 바뀌면 카테고리가 바뀌는 거래)"""
+    if not merchant_ids:
+        return {}
+    table = model.__table__
+    return dict(db.execute(
+        select(table.c.year_month, func.count())
+        .where(table.c.merchant_id.in_(merchant_ids), follows_merchant(table))
+        .group_by(table.c.year_month)
+    ).all())
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def request(db: Session, reason: Optional[str] = None) -> models.RecategorizationJob:
+    """재분류 작업 생성 (진행 중인 이전 작업은 취소 - 새 작업이 전체를 다시 검사함)"""
+    db.query(models.RecategorizationJob).filter(
+        models.RecategorizationJob.status.in_(_UNFINISHED)
+    ).update(
+        {"status": JobStatus.CANCELLED.value, "finished_at": _now()},
+        synchronize_session=False
+    )
+    total_rows = sum(
+        db.execute(
+            select(func.count()).select_from(target.model.__table__).where(follows_merchant(target.model.__table__))
+        ).scalar()
+        for target in TARGETS
+    )
+    job = models.RecategorizationJob(
+        status=JobStatus.QUEUED.value,
+        reason=reason,
+        current_table=models.Merchant.__tablename__,
+        last_id=0,
+        total_rows=total_rows,
+        processed_rows=0,
+        updated_rows=0,
+        created_at=_now()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def start(job_id: int) -> None:
+    """작업 프로세스에서 재분류 실행"""
+    jobs.run_in_background(run, job_id, on_done=partial(_on_done, job_id))
+    logger.info(f"Recategorization job {job_id} queued")
+
+
+def submit(db: Session, reason: Optional[str] = None) -> models.RecategorizationJob:
+    """재분류 작업 생성 후 바로 실행"""
+    job = request(db, reason)
+    start(job.id)
+    return job
+
+
+def resume_unfinished(db: Session) -> List[int]:
+    """서버 시작 시 끝나지 않은 작업을 저장된 위치부터 이어서 실행"""
+    job_ids = [
+        job_id for (job_id,) in db.query(models.RecategorizationJob.id).filter(
+            models.RecategorizationJob.status.in_(_UNFINISHED)
+        ).order_by(models.RecategorizationJob.id)
+    ]
+    for job_id in job_ids:
+        logger.info(f"Resuming recategorization job {job_id}")
+        start(job_id)
+    return job_ids
+
+
+def get_job(db: Session, job_id: int) -> Optional[models.RecategorizationJob]:
+    return db.query(models.RecategorizationJob).filter(models.RecategorizationJob.id == job_id).first()
+
+
+def list_jobs(db: Session) -> List[models.RecategorizationJob]:
+    """최근 작업부터"""
+    return db.query(models.RecategorizationJob).order_by(
+        models.RecategorizationJob.id.desc()
+    ).limit(MAX_LISTED_JOBS).all()
+
+
+def _on_done(job_id: int, future) -> None:
+    """작업 종료 (API 프로세스) - 분석 엔진 무효화, 작업 프로세스가 비정상 종료된 경우 실패로 기록"""
+    analytics.invalidate_merchants()
+    error = future.exception()
+    if error is None:
+        return
+
+    logger.error(f"Recategorization job {job_id} crashed: {error}")
+    db = SessionLocal()
+    try:
+        _set_status(
+            db, job_id, JobStatus.FAILED, error=f"재분류 중 오류 발생: {str(error)}", finished_at=_now()
+        )
+    finally:
+        db.close()
+
+
+def _set_status(db: Session, job_id: int, status: JobStatus, **fields) -> bool:
+    """진행 중인 작업의 상태 변경 (취소된 작업이면 False)"""
+    job_table = models.RecategorizationJob.__table__
+    result = db.execute(
+        update(job_table)
+        .where(job_table.c.id == job_id, job_table.c.status.in_(_UNFINISHED))
+        .values(status=status.value, **fields)
+    )
+    db.commit()
+    return result.rowcount > 0
+
+
+def _categorize_merchants(db: Session, merchants, matcher: categorizer.CategoryMatcher) -> List[int]:
+    """가맹점마다 한 번 분류하여 결과가 바뀐 가맹점만 merchants.category 갱신, 바뀐 가맹점 id 반환"""
+    changes = []
+    for merchant in merchants:
+        category = matcher.keyword_matcher.match(merchant.name)
+        if category != merchant.category:
+            changes.append({"_id": merchant.id, "_category": category})
+    if changes:
+        merchant_table = models.Merchant.__table__
+        db.execute(
+            update(merchant_table)
+            .where(merchant_table.c.id == bindparam("_id"))
+            .values(category=bindparam("_category")),
+            changes
+        )
+    return [change["_id"] for change in changes]
+
+
+def _process_batch(db: Session, job: models.RecategorizationJob, matcher: categorizer.CategoryMatcher) -> bool:
+    """진행 위치 다음 가맹점 배치를 재분류하고 commit, 모든 가맹점을 마쳤으면 False"""
+    merchant_table = models.Merchant.__table__
+    job_table = models.RecategorizationJob.__table__
+    running = and_(job_table.c.id == job.id, job_table.c.status == JobStatus.RUNNING.value)
+
+    merchants = db.execute(
+        select(merchant_table.c.id, merchant_table.c.name, merchant_table.c.category)
+        .where(merchant_table.c.id > job.last_id)
+        .order_by(merchant_table.c.id)
+        .limit(RECATEGORIZE_BATCH_SIZE)
+    ).all()
+    if not merchants:
+        return False
+
+    changed_ids = _categorize_merchants(db, merchants, matcher)
+    processed_rows = updated_rows = 0
+    for target in TARGETS:
+        table = target.model.__table__
+        processed_rows += db.execute(
+            select(func.count()).select_from(table).where(
+                table.c.merchant_id.between(merchants[0].id, merchants[-1].id), follows_merchant(table)
+            )
+        ).scalar()
+        # 분류 결과가 바뀐 가맹점의 거래가 있는 월만 집계 갱신 (거래 행은 바꾸지 않음)
+        touched = follows_merchants(db, target.model, changed_ids)
+        if touched:
+            target.refresh(db, list(touched))
+        updated_rows += sum(touched.values())
+
+    # 분류 결과 / 집계 변경과 진행 위치를 함께 commit (그 사이 작업이 취소되었으면 되돌림)
+    result = db.execute(
+        update(job_table).where(running).values(
+            last_id=merchants[-1].id,
+            processed_rows=job_table.c.processed_rows + processed_rows,
+            updated_rows=job_table.c.updated_rows + updated_rows
+        )
+    )
+    if result.rowcount == 0:
+        db.rollback()
+    else:
+        db.commit()
+    return True
+
+
+def run(job_id: int) -> None:
+    """재분류 실행 (작업 프로세스) - 저장된 진행 위치부터 배치 단위로 처리"""
+    db = SessionLocal()
+    try:
+        job = get_job(db, job_id)
+        if job is None or not _set_status(
+            db, job_id, JobStatus.RUNNING, started_at=job.started_at or _now()
+        ):
+            return
+
+        # 매핑은 API 프로세스에서 바뀌므로 작업마다 분류기를 새로 생성
+        matcher = categorizer.build_matcher(db)
+        while True:
+            job = get_job(db, job_id)
+            if job.status != JobStatus.RUNNING.value:
+                logger.info(f"Recategorization job {job_id} {job.status}")
+                return
+            if not _process_batch(db, job, matcher):
+                break
+
+        _set_status(db, job_id, JobStatus.COMPLETED, finished_at=_now())
+        logger.info(f"Recategorization job {job_id} completed ({job.updated_rows} rows updated)")
+    except Exception as e:
+        logger.error(f"Recategorization job {job_id} failed: {e}", exc_info=True)
+        db.rollback()
+        _set_status(db, job_id, JobStatus.FAILED, error=f"재분류 중 오류 발생: {str(e)}", finished_at=_now())
+    finally:
+        db.close()
@@ -0,0 +1,287 @@
+"""월별 통계 집계 / 계좌 잔액 스냅샷 / 카드 지출 집계 테이블 관리
+
+통계 엔드포인트는 거래내역 대신 monthly_rollups (월별 집계), account_balances (계좌별 월말 잔액),
+account_latest_balances (계좌별 최신 잔액) 를 읽고, 카드 통계 엔드포인트는 카드 거래내역 대신
+card_spending_cube (월/사용자/결제 유형/카테고리별 집계) 를 읽는다.
+거래가 추가/수정/삭제되면 호출한 쪽의 트랜잭션 안에서 해당 년월의 집계를 다시 계산한다.
+"""
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Optional, Tuple
+import logging
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# 한 번에 다시 계산할 최대 년월 수 (SQL 변수 개수 제한)
+REFRESH_CHUNK_SIZE = 500
+
+# 집계 비교 시 허용 오차 (금액 합계의 부동소수점 오차)
+AMOUNT_TOLERANCE = 0.005
+
+
+def aggregate_query(year_months: Optional[List[str]] = None):
+    """거래내역에서 (년월, 계좌 유형, 카테고리)별 집계를 계산하는 SELECT"""
+    t = models.Transaction.__table__
+    category = func.coalesce(models.Transaction.category, "")
+    partition = (t.c.year_month, t.c.account_type, category)
+
+    ranked = select(
+        t.c.id,
+        t.c.year_month,
+        t.c.account_type,
+        category.label("category"),
+        t.c.transaction_date,
+        t.c.amount,
+        t.c.balance,
+        func.row_number().over(
+            partition_by=partition, order_by=(t.c.transaction_date, t.c.id)
+        ).label("first_rank"),
+        func.row_number().over(
+            partition_by=partition, order_by=(t.c.transaction_date.desc(), t.c.id.desc())
+        ).label("last_rank"),
+    )
+    if year_months is not None:
+        ranked = ranked.where(t.c.year_month.in_(year_months))
+    ranked = ranked.subquery()
+
+    r = ranked.c
+    is_first = r.first_rank == 1
+    is_last = r.last_rank == 1
+    query = select(
+        r.year_month,
+        r.account_type,
+        r.category,
+        func.sum(case((r.amount > 0, r.amount), else_=0.0)).label("income_total"),
+        func.sum(case((r.amount > 0, 1), else_=0)).label("income_count"),
+        func.sum(case((r.amount < 0, r.amount), else_=0.0)).label("expense_total"),
+        func.sum(case((r.amount < 0, 1), else_=0)).label("expense_count"),
+        func.count().label("transaction_count"),
+        func.max(case((is_first, r.transaction_date))).label("first_date"),
+        func.max(case((is_first, r.id))).label("first_id"),
+        func.max(case((is_first, r.amount))).label("first_amount"),
+        func.max(case((is_first, r.balance))).label("first_balance"),
+        func.max(case((is_last, r.transaction_date))).label("last_date"),
+        func.max(case((is_last, r.id))).label("last_id"),
+        func.max(case((is_last, r.balance))).label("last_balance"),
+    ).group_by(r.year_month, r.account_type, r.category)
+    return query
+
+
+def balance_query(year_months: Optional[List[str]] = None):
+    """거래내역에서 (년월, 계좌번호, 계좌 유형)별 마지막 거래 잔액을 계산하는 SELECT"""
+    t = models.Transaction.__table__
+    ranked = select(
+        t.c.year_month,
+        t.c.account_number,
+        t.c.account_type,
+        t.c.institution,
+        t.c.transaction_date.label("last_date"),
+        t.c.id.label("last_id"),
+        t.c.balance,
+        func.row_number().over(
+            partition_by=(t.c.year_month, t.c.account_number, t.c.account_type),
+            order_by=(t.c.transaction_date.desc(), t.c.id.desc())
+        ).label("last_rank"),
+    ).where(
+        # 계좌번호가 없는 거래는 총자산 계산에서 제외
+        t.c.account_number.isnot(None),
+        t.c.account_number != ""
+    )
+    if year_months is not None:
+        ranked = ranked.where(t.c.year_month.in_(year_months))
+    ranked = ranked.subquery()
+
+    r = ranked.c
+    return select(
+        r.year_month, r.account_number, r.account_type, r.institution, r.last_date, r.last_id, r.balance
+    ).where(r.last_rank == 1)
+
+
+def latest_balance_query(source=None):
+    """월말 잔액에서 (계좌번호, 계좌 유형)별 가장 최근 잔액을 고르는 SELECT
+
+    source 를 주지 않으면 저장된 account_balances 를 사용한다.
+    """
+    if source is None:
+        source = models.AccountBalance.__table__
+    b = source.c
+    ranked = select(
+        b.account_number,
+        b.account_type,
+        b.year_month,
+        b.institution,
+        b.last_date,
+        b.last_id,
+        b.balance,
+        func.row_number().over(
+            partition_by=(b.account_number, b.account_type),
+            order_by=(b.last_date.desc(), b.last_id.desc())
+        ).label("latest_rank"),
+    ).subquery()
+
+    r = ranked.c
+    return select(
+        r.account_number, r.account_type, r.year_month, r.institution, r.last_date, r.last_id, r.balance
+    ).where(r.latest_rank == 1)
+
+
+def card_cube_query(year_months: Optional[List[str]] = None):
+    """카드 거래내역에서 (년월, 사용자, 결제 유형, 카테고리)별 합계를 계산하는 SELECT"""
+    c = models.CardTransaction.__table__
+    category = func.coalesce(models.CardTransaction.category, "")
+    query = select(
+        c.c.year_month,
+        c.c.card_holder,
+        c.c.payment_type,
+        category.label("category"),
+        func.sum(c.c.amount).label("total_amount"),
+        func.count().label("transaction_count"),
+    ).group_by(c.c.year_month, c.c.card_holder, c.c.payment_type, category)
+    if year_months is not None:
+        query = query.where(c.c.year_month.in_(year_months))
+    return query
+
+
+def _rows(db: Session, query) -> List[dict]:
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+def _replace(db: Session, table, rows: List[dict]) -> None:
+    if rows:
+        db.execute(table.insert(), rows)
+
+
+def _refresh_latest_balances(db: Session) -> None:
+    # 계좌 수 x 개월 수 규모라 전체를 다시 계산
+    latest = models.AccountLatestBalance.__table__
+    db.execute(delete(latest))
+    _replace(db, latest, _rows(db, latest_balance_query()))
+
+
+def refresh(db: Session, year_months: Iterable[str]) -> None:
+    """해당 년월의 집계와 잔액 스냅샷을 거래내역에서 다시 계산 (commit 은 호출한 쪽에서)"""
+    year_months = sorted({ym for ym in year_months if ym})
+    if not year_months:
+        return
+
+    rollup = models.MonthlyRollup.__table__
+    balances = models.AccountBalance.__table__
+    for start in range(0, len(year_months), REFRESH_CHUNK_SIZE):
+        chunk = year_months[start:start + REFRESH_CHUNK_SIZE]
+        db.execute(delete(rollup).where(rollup.c.year_month.in_(chunk)))
+        _replace(db, rollup, _rows(db, aggregate_query(chunk)))
+        db.execute(delete(balances).where(balances.c.year_month.in_(chunk)))
+        _replace(db, balances, _rows(db, balance_query(chunk)))
+    _refresh_latest_balances(db)
+
+
+def refresh_card_cube(db: Session, year_months: Iterable[str]) -> None:
+    """해당 년월의 카드 지출 집계를 카드 거래내역에서 다시 계산 (commit 은 호출한 쪽에서)"""
+    year_months = sorted({ym for ym in year_months if ym})
+    cube = models.CardSpendingCube.__table__
+    for start in range(0, len(year_months), REFRESH_CHUNK_SIZE):
+        chunk = year_months[start:start + REFRESH_CHUNK_SIZE]
+        db.execute(delete(cube).where(cube.c.year_month.in_(chunk)))
+        _replace(db, cube, _rows(db, card_cube_query(chunk)))
+
+
+def rebuild_card_cube(db: Session) -> int:
+    """전체 카드 지출 집계를 다시 생성 (commit 은 호출한 쪽에서), 생성된 행 수 반환"""
+    cube = models.CardSpendingCube.__table__
+    db.execute(delete(cube))
+    rows = _rows(db, card_cube_query())
+    _replace(db, cube, rows)
+    logger.info(f"Card spending cube rebuilt ({len(rows)} rows)")
+    return len(rows)
+
+
+def rebuild(db: Session) -> int:
+    """전체 집계와 잔액 스냅샷을 다시 생성 (commit 은 호출한 쪽에서), 생성된 월별 집계 행 수 반환"""
+    rollup = models.MonthlyRollup.__table__
+    balances = models.AccountBalance.__table__
+    db.execute(delete(rollup))
+    rows = _rows(db, aggregate_query())
+    _replace(db, rollup, rows)
+    db.execute(delete(balances))
+    _replace(db, balances, _rows(db, balance_query()))
+    _refresh_latest_balances(db)
+    logger.info(f"Monthly rollups rebuilt ({len(rows)} rows)")
+    return len(rows)
+
+
+def ensure_built(db: Session) -> None:
+    """집계 테이블이 비어 있는데 거래내역이 있으면 생성 (기존 데이터베이스 업그레이드용)"""
+    t = models.Transaction
+    missing_rollups = (
+        db.query(models.MonthlyRollup.id).first() is None
+        and db.query(t.id).first() is not None
+    )
+    missing_balances = (
+        db.query(models.AccountBalance.id).first() is None
+        and db.query(t.id).filter(t.account_number.isnot(None), t.account_number != "").first() is not None
+    )
+    missing_card_cube = (
+        db.query(models.CardSpendingCube.id).first() is None
+        and db.query(models.CardTransaction.id).first() is not None
+    )
+    if not (missing_rollups or missing_balances or missing_card_cube):
+        return
+    if missing_rollups or missing_balances:
+        rebuild(db)
+    if missing_card_cube:
+        rebuild_card_cube(db)
+    db.commit()
+
+
+def _differs(stored, expected) -> bool:
+    if isinstance(expected, float) or isinstance(stored, float):
+        return abs((stored or 0) - (expected or 0)) > AMOUNT_TOLERANCE
+    return stored != expected
+
+
+def _compare(label: str, model, key_columns: Tuple[str, ...], expected_rows: List[dict], db: Session) -> List[str]:
+    expected = {tuple(row[c] for c in key_columns): row for row in expected_rows}
+    stored = {
+        tuple(getattr(row, c) for c in key_columns): row
+        for row in db.query(model).all()
+    }
+
+    problems = []
+    for key in sorted(expected.keys() - stored.keys()):
+        problems.append(f"{label} {key}: 집계 없음")
+    for key in sorted(stored.keys() - expected.keys()):
+        problems.append(f"{label} {key}: 거래내역에 없는 집계")
+    for key in sorted(expected.keys() & stored.keys()):
+        for field, value in expected[key].items():
+            stored_value = getattr(stored[key], field)
+            if _differs(stored_value, value):
+                problems.append(f"{label} {key}: {field} 저장값 {stored_value} != 계산값 {value}")
+    return problems
+
+
+def check_consistency(db: Session) -> List[str]:
+    """저장된 집계/잔액 스냅샷과 전체 재계산 결과 비교 (불일치 내역 목록, 일치하면 빈 목록)"""
+    return (
+        _compare(
+            "monthly_rollups", models.MonthlyRollup,
+            ("year_month", "account_type", "category"),
+            _rows(db, aggregate_query()), db
+        )
+        + _compare(
+            "account_balances", models.AccountBalance,
+            ("year_month", "account_number", "account_type"),
+            _rows(db, balance_query()), db
+        )
+        + _compare(
+            "account_latest_balances", models.AccountLatestBalance,
+            ("account_number", "account_type"),
+            _rows(db, latest_balance_query(balance_query().subquery())), db
+        )
+        + _compare(
+            "card_spending_cube", models.CardSpendingCube,
+            ("year_month", "card_holder", "payment_type", "category"),
+            _rows(db, card_cube_query()), db
+        )
+    )
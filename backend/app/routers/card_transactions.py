@@ -1,115 +1,162 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from typing import List, Optional
-import pandas as pd
-import os
+from typing import Iterator, List, Optional
+from openpyxl import load_workbook
 import logging
 
-from .. import models, schemas
-from ..database import get_db
-from ..enums import TransactionCategory
+from .. import analytics, bulk_edit, categorizer, importer, jobs, models, rollups, schemas, uploads
+from ..database import SessionLocal, get_db
+from ..enums import CardCubeDimension, CategorySource, TransactionCategory
 
 router = APIRouter(prefix="/card-transactions", tags=["card-transactions"])
 logger = logging.getLogger(__name__)
 
 
-def parse_samsung_card_excel(file_path: str, card_holder: str) -> List[dict]:
+# 한 번에 적재할 카드 거래 수
+CARD_CHUNK_SIZE = 1000
+
+
+def _parse_card_row(values: tuple, sheet_name: str, card_holder: str) -> Optional[dict]:
+    """시트의 한 행을 카드 거래로 변환 (합계 행이나 잘못된 행은 None)"""
+    # 합계 행 제외 (첫 번째 열이 비어 있는 행)
+    if not values or values[0] is None:
+        return None
+
+    try:
+        raw_date = str(int(values[0]))  # YYYYMMDD (숫자로 읽힐 수 있음)
+
+        # YYYY.MM.DD 형식으로 변환
+        if len(raw_date) == 8:
+            trans_date = f"{raw_date[:4]}.{raw_date[4:6]}.{raw_date[6:8]}"
+            year_month = f"{raw_date[:4]}-{raw_date[4:6]}"
+        else:
+            logger.warning(f"Invalid date format: {raw_date}")
+            return None
+
+        # Column 9: 원 (금액 - 실제 숫자 값)
+        amount_val = values[9] if len(values) > 9 else None
+
+        if amount_val is None:
+            logger.warning(f"Amount is empty for row: {values[2]}")
+            return None
+
+        amount = float(amount_val)
+
+        return {
+            "card_holder": card_holder,  # 업로드 시 입력한 사용자
+            "payment_type": sheet_name,  # 시트명 (일시불, 할부)
+            "transaction_date": trans_date,
+            "description": str(values[2]),  # 가맹점
+            "amount": -amount,  # 지출은 음수로 저장
+            "year_month": year_month,
+            "raw_date": raw_date
+        }
+
+    except Exception as e:
+        logger.error(f"Error parsing row in sheet {sheet_name}: {e}", exc_info=True)
+        return None
+
+
+def parse_samsung_card_excel(
+    file_path: str,
+    card_holder: str,
+    chunk_size: int = CARD_CHUNK_SIZE
+) -> Iterator[List[dict]]:
     """Samsung Card Excel 파일 파싱 (일시불/할부 시트별 처리)
 
+    통합 문서를 읽기 전용 모드로 한 번만 열고, 파싱된 거래를 chunk_size 건씩
+    나누어 반환하므로 파일 크기와 관계없이 메모리 사용량이 일정하다.
+
     Args:
         file_path: Excel 파일 경로
         card_holder: 카드 소유자 이름 (업로드 시 사용자가 입력)
+        chunk_size: 한 번에 반환할 거래 수
     """
     try:
-        xls = pd.ExcelFile(file_path)
-        all_transactions = []
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+    except Exception as e:
+        logger.error(f"Error parsing Samsung Card Excel: {e}", exc_info=True)
+        raise ValueError(f"Samsung Card Excel 파싱 오류: {str(e)}")
 
+    try:
         # 첫 2개 시트만 처리 (일시불, 할부)
-        sheets_to_process = xls.sheet_names[:2]
+        sheets_to_process = workbook.sheetnames[:2]
         logger.info(f"Processing sheets for user {card_holder}: {sheets_to_process}")
 
+        chunk = []
+        total = 0
         for sheet_name in sheets_to_process:
             logger.info(f"Parsing sheet: {sheet_name}")
-            # skiprows=2: 제목 행과 빈 행 건너뛰기 (Row 0, 1)
-            # Row 2가 헤더, Row 3부터 데이터 시작
-            df = pd.read_excel(file_path, sheet_name=sheet_name, skiprows=2, header=0)
-            
-            # 합계 행 제외 (첫 번째 열이 NaN인 행)
-            df = df[df.iloc[:, 0].notna()]
-            
-            for _, row in df.iterrows():
-                try:
-                    raw_date = str(int(row.iloc[0]))  # YYYYMMDD (숫자로 읽힐 수 있음)
-                    
-                    # YYYY.MM.DD 형식으로 변환
-                    if len(raw_date) == 8:
-                        trans_date = f"{raw_date[:4]}.{raw_date[4:6]}.{raw_date[6:8]}"
-                        year_month = f"{raw_date[:4]}-{raw_date[4:6]}"
-                    else:
-                        logger.warning(f"Invalid date format: {raw_date}")
-                        continue
-                    
-                    # Column 9: 원 (금액 - 실제 숫자 값)
-                    amount_val = row.iloc[9]
-                    
-                    # NaN 체크
-                    if pd.isna(amount_val):
-                        logger.warning(f"Amount is NaN for row: {row.iloc[2]}")
-                        continue
-                    
-                    amount = float(amount_val)
-                    
-                    transaction = {
-                        "card_holder": card_holder,  # 업로드 시 입력한 사용자
-                        "payment_type": sheet_name,  # 시트명 (일시불, 할부)
-                        "transaction_date": trans_date,
-                        "description": str(row.iloc[2]),  # 가맹점
-                        "amount": -amount,  # 지출은 음수로 저장
-                        "year_month": year_month,
-                        "raw_date": raw_date
-                    }
-                    all_transactions.append(transaction)
-                    
-                except Exception as e:
-                    logger.error(f"Error parsing row in sheet {sheet_name}: {e}", exc_info=True)
+            sheet = workbook[sheet_name]
+            sheet.reset_dimensions()  # 잘못 기록된 시트 크기 정보 무시
+
+            # Row 1, 2: 제목 행과 빈 행, Row 3: 헤더, Row 4부터 데이터 시작
+            for values in sheet.iter_rows(min_row=4, values_only=True):
+                transaction = _parse_card_row(values, sheet_name, card_holder)
+                if transaction is None:
                     continue
-        
-        logger.info(f"Total transactions parsed: {len(all_transactions)}")
-        return all_transactions
-        
-    except Exception as e:
-        logger.error(f"Error parsing Samsung Card Excel: {e}", exc_info=True)
-        raise ValueError(f"Samsung Card Excel 파싱 오류: {str(e)}")
 
+                chunk.append(transaction)
+                if len(chunk) >= chunk_size:
+                    total += len(chunk)
+                    yield chunk
+                    chunk = []
 
-def auto_categorize(description: str, memo: Optional[str], db: Session) -> Optional[str]:
-    """거래처명과 메모를 기반으로 카테고리 자동 분류"""
-    # 1. 메모에 카테고리가 명시되어 있는지 확인
-    if memo:
-        for category in TransactionCategory:
-            if category == TransactionCategory.UNCATEGORIZED:
-                continue
-            if category.value in memo:
-                return category.value
-    
-    # 2. 데이터베이스의 매핑 테이블에서 검색
-    mappings = db.query(models.CategoryMapping).all()
-    for mapping in mappings:
-        if mapping.keyword in description:
-            return mapping.category
-    
-    # 3. 기본값: None (미분류)
-    return None
+        if chunk:
+            total += len(chunk)
+            yield chunk
+
+        logger.info(f"Total transactions parsed: {total}")
+
+    finally:
+        workbook.close()
 
 
-@router.post("/upload", response_model=schemas.UploadResponse)
+def import_file(
+    file_path: str,
+    card_holder: str,
+    content_hash: str,
+    filename: str,
+    progress=None
+) -> schemas.UploadResponse:
+    """업로드된 Samsung Card Excel 파일 파싱 및 적재 (적재 작업 프로세스에서 실행)"""
+    db = SessionLocal()
+    try:
+        # 대기 중에 같은 파일을 다른 작업이 먼저 적재했으면 파싱하지 않음
+        imported_file = uploads.find_imported_file(db, content_hash, "card_transactions", card_holder)
+        if imported_file:
+            return uploads.already_imported_response(imported_file)
+
+        # Excel 파싱 (카드 소유자 정보 전달) - chunk 단위로 읽으면서 적재
+        chunks = parse_samsung_card_excel(file_path, card_holder)
+
+        # 적재 기록은 거래와 같은 트랜잭션으로 저장
+        return importer.import_card_transactions(
+            db,
+            chunks,
+            card_holder,
+            progress,
+            before_commit=lambda result: uploads.record_imported_file(
+                db, content_hash, "card_transactions", card_holder, filename, result
+            )
+        )
+    finally:
+        db.close()
+
+
+@router.post("/upload", response_model=schemas.ImportJob)
 async def upload_excel(
     file: UploadFile = File(...),
     card_holder: str = Form(...),
     db: Session = Depends(get_db)
 ):
-    """Samsung Card Excel 파일 업로드 및 파싱
+    """Samsung Card Excel 파일 업로드
+
+    파싱과 저장은 백그라운드 작업으로 실행되며, 작업 ID 를 바로 반환한다.
+    진행 상황과 결과는 GET /api/jobs/{job_id} 로 조회한다.
+    같은 카드 소유자로 이미 적재된 파일(내용 기준)이면 파싱 없이 바로 완료 처리한다.
 
     Args:
         file: Samsung Card Excel 파일
@@ -120,63 +167,32 @@ async def upload_excel(
 
     if not card_holder or not card_holder.strip():
         raise HTTPException(status_code=400, detail="카드 소유자 이름을 입력해주세요.")
+    card_holder = card_holder.strip()
     
-    # 파일 저장
-    upload_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads")
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    file_path = os.path.join(upload_dir, file.filename)
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-    
-    try:
-        # Excel 파싱 (카드 소유자 정보 전달)
-        transactions_data = parse_samsung_card_excel(file_path, card_holder.strip())
-        
-        new_records = 0
-        duplicate_records = 0
-        
-        for trans_data in transactions_data:
-            # 중복 체크 (같은 카드소유자, 결제유형, 날짜, 금액, 가맹점)
-            existing = db.query(models.CardTransaction).filter(
-                models.CardTransaction.card_holder == trans_data["card_holder"],
-                models.CardTransaction.payment_type == trans_data["payment_type"],
-                models.CardTransaction.transaction_date == trans_data["transaction_date"],
-                models.CardTransaction.amount == trans_data["amount"],
-                models.CardTransaction.description == trans_data["description"]
-            ).first()
-            
-            if existing:
-                duplicate_records += 1
-                continue
-            
-            # 카테고리 자동 분류
-            category = auto_categorize(
-                trans_data["description"],
-                trans_data.get("memo"),
-                db
-            )
-            trans_data["category"] = category
-            trans_data["memo"] = None  # 기본값
-            
-            # DB에 저장
-            db_transaction = models.CardTransaction(**trans_data)
-            db.add(db_transaction)
-            new_records += 1
-        
-        db.commit()
-        
-        return schemas.UploadResponse(
-            message="업로드 완료",
-            total_records=len(transactions_data),
-            new_records=new_records,
-            duplicate_records=duplicate_records
+    # 파일 저장 (내용 해시 기준 파일명)
+    file_path, content_hash = await uploads.spool_upload(file)
+
+    imported_file = await run_in_threadpool(
+        uploads.find_imported_file, db, content_hash, "card_transactions", card_holder
+    )
+    if imported_file:
+        logger.info(f"Skipping already imported file: {file.filename} ({content_hash})")
+        return jobs.complete(
+            "card_transactions",
+            uploads.already_imported_response(imported_file),
+            filename=file.filename
         )
     
-    except Exception as e:
-        logger.error(f"File processing error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"파일 처리 중 오류 발생: {str(e)}")
+    return jobs.submit(
+        "card_transactions",
+        import_file,
+        file_path,
+        card_holder,
+        content_hash,
+        file.filename,
+        filename=file.filename,
+        content_key=(content_hash, card_holder)
+    )
 
 
 @router.get("/", response_model=List[schemas.CardTransaction])
@@ -196,7 +212,7 @@ def get_card_transactions(
     if year_month:
         query = query.filter(models.CardTransaction.year_month == year_month)
     if category:
-        query = query.filter(models.CardTransaction.category == category)
+        query = query.filter(models.category_filter(db, models.CardTransaction, category, rows=offset + limit))
     
     transactions = query.order_by(
         models.CardTransaction.transaction_date.desc()
@@ -225,6 +241,29 @@ def get_available_year_months(db: Session = Depends(get_db)):
     return [ym[0] for ym in year_months]
 
 
+@router.put("/bulk", response_model=schemas.BulkUpdateResponse)
+def bulk_update_card_transactions(
+    request: schemas.CardTransactionBulkUpdate,
+    db: Session = Depends(get_db)
+):
+    """카드 거래 카테고리/메모 일괄 수정 (id 목록 또는 조회 필터, UPDATE 한 번 + 집계 갱신 한 번)"""
+    if request.category is None and request.memo is None:
+        raise HTTPException(status_code=400, detail="수정할 카테고리 또는 메모를 입력해주세요.")
+
+    if request.ids is not None and len(request.ids) > bulk_edit.MAX_BULK_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"한 번에 최대 {bulk_edit.MAX_BULK_IDS}건까지 수정할 수 있습니다."
+        )
+    conditions = bulk_edit.build_conditions(models.CardTransaction, request.ids, request.filters)
+    if not conditions:
+        raise HTTPException(status_code=400, detail="수정할 거래를 id 목록 또는 필터로 지정해주세요.")
+
+    updated_count = bulk_edit.update_rows(
+        db, models.CardTransaction, conditions, request.category, request.memo, rollups.refresh_card_cube
+    )
+    return schemas.BulkUpdateResponse(updated_count=updated_count)
+
+
 @router.put("/{transaction_id}", response_model=schemas.CardTransaction)
 def update_card_transaction_category(
     transaction_id: int,
@@ -241,46 +280,121 @@ def update_card_transaction_category(
         raise HTTPException(status_code=404, detail="거래내역을 찾을 수 없습니다.")
     
     if category is not None:
-        transaction.category = category
+        transaction.stored_category = category
+        transaction.category_source = CategorySource.MANUAL.value
     if memo is not None:
         transaction.memo = memo
+        # 메모에 적힌 카테고리도 자동 분류 거래의 카테고리를 바꿈
+        if transaction.category_source != CategorySource.MANUAL.value:
+            transaction.stored_category = categorizer.memo_category(memo)
     
+    if category is not None or memo is not None:
+        db.flush()
+        rollups.refresh_card_cube(db, [transaction.year_month])
     db.commit()
+    analytics.invalidate(models.CardTransaction, [transaction_id])
     db.refresh(transaction)
     return transaction
 
 
 
 
+def _cube_statistics(
+    db: Session,
+    dimensions: List[CardCubeDimension],
+    year_month: Optional[str] = None,
+    from_month: Optional[str] = None,
+    to_month: Optional[str] = None,
+    card_holder: Optional[str] = None,
+    payment_type: Optional[str] = None,
+    category: Optional[str] = None
+) -> List[dict]:
+    """카드 지출을 주어진 기준으로 묶은 합계/건수/비율 (기준 컬럼 값 순)
+
+    분석 엔진이 켜져 있으면 엔진에서, 아니면 카드 지출 집계(card_spending_cube)에서 계산한다.
+    비율은 조회 결과 전체의 금액 절대값 합계 대비 각 행 금액의 절대값 (window 함수로 계산).
+    """
+    engine = analytics.get_engine(db)
+    if engine is not None:
+        return engine.card_groups(
+            [dimension.value for dimension in dimensions],
+            year_month or None, from_month or None, to_month or None,
+            card_holder or None, payment_type or None, category or None
+        )
+
+    cube = models.CardSpendingCube
+    columns = [getattr(cube, dimension.value) for dimension in dimensions]
+    total_amount = func.sum(cube.total_amount)
+    query = db.query(
+        *columns,
+        total_amount.label("total_amount"),
+        func.sum(cube.transaction_count).label("transaction_count"),
+        func.coalesce(
+            func.abs(total_amount) * 100.0 / func.nullif(func.sum(func.abs(total_amount)).over(), 0),
+            0.0
+        ).label("percentage")
+    )
+
+    if year_month:
+        query = query.filter(cube.year_month == year_month)
+    if from_month:
+        query = query.filter(cube.year_month >= from_month)
+    if to_month:
+        query = query.filter(cube.year_month <= to_month)
+    if card_holder:
+        query = query.filter(cube.card_holder == card_holder)
+    if payment_type:
+        query = query.filter(cube.payment_type == payment_type)
+    if category:
+        # 미분류 거래는 빈 문자열로 집계됨
+        if category == TransactionCategory.UNCATEGORIZED.value:
+            query = query.filter(cube.category.in_(["", category]))
+        else:
+            query = query.filter(cube.category == category)
+
+    results = query.group_by(*columns).order_by(*columns).all()
+    # 기준 없이 조회했는데 조건에 맞는 거래가 없으면 합계가 NULL 인 한 행이 나옴
+    return [r._asdict() for r in results if r.transaction_count is not None]
+
+
+@router.get("/statistics/cube", response_model=List[schemas.CardCubeStatistics])
+def get_cube_statistics(
+    dimensions: List[CardCubeDimension] = Query([]),
+    year_month: Optional[str] = None,
+    from_month: Optional[str] = Query(None, alias="from"),
+    to_month: Optional[str] = Query(None, alias="to"),
+    card_holder: Optional[str] = None,
+    payment_type: Optional[str] = None,
+    category: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """카드 지출 집계 조회 (년월/사용자/결제 유형/카테고리 중 원하는 기준으로 묶고 필터링)
+
+    예: /statistics/cube?dimensions=card_holder&dimensions=category&from=2025-01&to=2025-06
+    dimensions 를 주지 않으면 조건에 맞는 전체 합계 한 행을 반환한다.
+    """
+    dimensions = list(dict.fromkeys(dimensions))  # 중복 제거 (순서 유지)
+    results = _cube_statistics(
+        db, dimensions, year_month, from_month, to_month, card_holder, payment_type, category
+    )
+
+    statistics = []
+    for row in results:
+        if "category" in row:
+            row["category"] = row["category"] or "미분류"
+        statistics.append(schemas.CardCubeStatistics(**row))
+    return statistics
+
+
 @router.get("/statistics/by-user", response_model=List[schemas.UserStatistics])
 def get_user_statistics(
     year_month: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """사용자별 통계 조회"""
-    query = db.query(
-        models.CardTransaction.card_holder,
-        func.sum(models.CardTransaction.amount).label('total_amount'),
-        func.count(models.CardTransaction.id).label('transaction_count')
-    )
-    
-    if year_month:
-        query = query.filter(models.CardTransaction.year_month == year_month)
-    
-    results = query.group_by(models.CardTransaction.card_holder).all()
-    
-    # 총 금액 계산 (비율 계산용)
-    total = sum(abs(r.total_amount) for r in results)
-    
-    return [
-        schemas.UserStatistics(
-            card_holder=r.card_holder,
-            total_amount=r.total_amount,
-            transaction_count=r.transaction_count,
-            percentage=abs(r.total_amount) / total * 100 if total > 0 else 0
-        )
-        for r in results
-    ]
+    results = _cube_statistics(db, [CardCubeDimension.CARD_HOLDER], year_month=year_month)
+
+    return [schemas.UserStatistics(**r) for r in results]
 
 
 @router.get("/statistics/monthly", response_model=List[dict])
@@ -289,27 +403,18 @@ def get_monthly_statistics(
     db: Session = Depends(get_db)
 ):
     """월별 통계 조회 (사용자별 분류 가능)"""
-    query = db.query(
-        models.CardTransaction.year_month,
-        models.CardTransaction.card_holder,
-        func.sum(models.CardTransaction.amount).label('total_amount'),
-        func.count(models.CardTransaction.id).label('transaction_count')
+    results = _cube_statistics(
+        db, [CardCubeDimension.YEAR_MONTH, CardCubeDimension.CARD_HOLDER], card_holder=card_holder
     )
-    
-    if card_holder:
-        query = query.filter(models.CardTransaction.card_holder == card_holder)
-    
-    results = query.group_by(
-        models.CardTransaction.year_month,
-        models.CardTransaction.card_holder
-    ).order_by(models.CardTransaction.year_month.desc()).all()
-    
+    # 최신 월 먼저 (같은 월 안에서는 사용자 순서 유지)
+    results.sort(key=lambda r: r["year_month"], reverse=True)
+
     return [
         {
-            "year_month": r.year_month,
-            "card_holder": r.card_holder,
-            "total_amount": r.total_amount,
-            "transaction_count": r.transaction_count
+            "year_month": r["year_month"],
+            "card_holder": r["card_holder"],
+            "total_amount": r["total_amount"],
+            "transaction_count": r["transaction_count"]
         }
         for r in results
     ]
@@ -322,34 +427,20 @@ def get_category_statistics(
     db: Session = Depends(get_db)
 ):
     """카테고리별 통계 조회 (사용자별 분류 가능)"""
-    query = db.query(
-        models.CardTransaction.category,
-        models.CardTransaction.card_holder,
-        func.sum(models.CardTransaction.amount).label('total_amount'),
-        func.count(models.CardTransaction.id).label('transaction_count')
+    results = _cube_statistics(
+        db,
+        [CardCubeDimension.CATEGORY, CardCubeDimension.CARD_HOLDER],
+        year_month=year_month,
+        card_holder=card_holder
     )
-    
-    if year_month:
-        query = query.filter(models.CardTransaction.year_month == year_month)
-    if card_holder:
-        query = query.filter(models.CardTransaction.card_holder == card_holder)
-    
-    # category가 None인 경우도 포함
-    results = query.group_by(
-        models.CardTransaction.category,
-        models.CardTransaction.card_holder
-    ).all()
-    
-    # 총 금액 계산 (비율 계산용)
-    total = sum(abs(r.total_amount) for r in results)
-    
+
     return [
         {
-            "category": r.category or "미분류",
-            "card_holder": r.card_holder,
-            "total_amount": r.total_amount,
-            "transaction_count": r.transaction_count,
-            "percentage": abs(r.total_amount) / total * 100 if total > 0 else 0
+            "category": r["category"] or "미분류",
+            "card_holder": r["card_holder"],
+            "total_amount": r["total_amount"],
+            "transaction_count": r["transaction_count"],
+            "percentage": r["percentage"]
         }
         for r in results
     ]
@@ -368,6 +459,11 @@ def delete_card_transaction(
     if not transaction:
         raise HTTPException(status_code=404, detail="거래내역을 찾을 수 없습니다.")
     
+    uploads.forget_imported_files(db, "card_transactions", transaction.card_holder)
+    importer.forget_watermark(db, "card_transactions", transaction.card_holder, transaction.payment_type)
     db.delete(transaction)
+    db.flush()
+    rollups.refresh_card_cube(db, [transaction.year_month])
     db.commit()
+    analytics.invalidate(models.CardTransaction, [transaction_id])
     return {"message": "삭제 완료"}
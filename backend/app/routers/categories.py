@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import and_, func, or_, select, update
+from typing import List, Tuple
 
-from .. import models, schemas
+from .. import analytics, categorizer, models, recategorize, schemas, search
 from ..database import get_db
 from ..enums import TransactionCategory
 
@@ -14,13 +15,53 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# 한 번에 분류 결과를 기록할 가맹점 수 (chunk 마다 commit 하여 쓰기 잠금을 짧게 유지)
+BACKFILL_CHUNK_SIZE = 500
+
+
+def _backfill_condition(model):
+    """새 매핑을 적용할 거래 - 미분류이고 직접 지정하지 않은 거래"""
+    return and_(
+        or_(model.category.is_(None), model.category == TransactionCategory.UNCATEGORIZED.value),
+        recategorize.not_manual(model.__table__)
+    )
+
+
+def _backfill_chunk(db: Session, merchant_ids: List[int], category: str) -> Tuple[int, int]:
+    """아직 매핑되지 않은 가맹점의 분류 결과를 기록하고 카테고리가 바뀐 거래가 있는 월의 집계 갱신
+
+    거래 행은 바꾸지 않는다 (카테고리는 조회 시 가맹점 분류 결과로 결정).
+    Returns:
+        (카테고리가 바뀐 거래 수, 카테고리가 바뀐 카드 거래 수)
+    """
+    merchants = models.Merchant.__table__
+    merchant_ids = db.execute(
+        update(merchants)
+        .where(merchants.c.id.in_(merchant_ids), merchants.c.category.is_(None))
+        .values(category=category)
+        .returning(merchants.c.id)
+    ).scalars().all()
+
+    counts = []
+    for target in recategorize.TARGETS:
+        touched = recategorize.follows_merchants(db, target.model, merchant_ids)
+        if touched:
+            target.refresh(db, touched)
+        counts.append(sum(touched.values()))
+    db.commit()
+    return counts[0], counts[1]
+
+
 def apply_mapping_to_existing_transactions(
     db: Session,
     keyword: str,
     category: str
-) -> int:
+) -> Tuple[int, int]:
     """
-    새로운 카테고리 매핑을 기존 거래에 적용
+    새로운 카테고리 매핑을 기존 거래내역 / 카드 거래내역에 적용
+    
+    가맹점명에 키워드를 포함하는 가맹점 중 아직 매핑되지 않은 가맹점의 분류 결과만 기록한다.
+    그 가맹점들의 거래 중 직접 지정하지 않았고 메모에 카테고리가 없는 거래의 카테고리가 바뀐다.
     
     Args:
         db: 데이터베이스 세션
@@ -28,39 +69,29 @@ def apply_mapping_to_existing_transactions(
         category: 적용할 카테고리
         
     Returns:
-        업데이트된 거래 수
+        (업데이트된 거래 수, 업데이트된 카드 거래 수)
     """
     logger.info(f"Starting auto-categorization: keyword='{keyword}', category='{category}'")
-    
-    # 먼저 키워드를 포함하는 모든 거래 찾기
-    all_matching = db.query(models.Transaction).filter(
-        models.Transaction.description.ilike(f"%{keyword}%")
-    ).all()
-    logger.info(f"Found {len(all_matching)} transactions matching keyword '{keyword}'")
-    
-    # category가 NULL이거나 "미분류"인 거래만 필터링
-    transactions = [t for t in all_matching 
-                    if t.category is None or t.category == TransactionCategory.UNCATEGORIZED.value]
-    
-    null_count = len([t for t in all_matching if t.category is None])
-    uncategorized_count = len([t for t in all_matching if t.category == TransactionCategory.UNCATEGORIZED.value])
-    logger.info(f"Of these, {null_count} have NULL category and {uncategorized_count} have '미분류' category")
-    logger.info(f"Total {len(transactions)} transactions will be updated")
-    
-    # 카테고리 업데이트
-    updated_count = 0
-    for transaction in transactions:
-        logger.debug(f"Updating transaction {transaction.id}: '{transaction.description}' (old: {transaction.category}) -> category='{category}'")
-        transaction.category = category
-        updated_count += 1
-    
-    if updated_count > 0:
-        db.commit()
-        logger.info(f"Applied mapping '{keyword}' -> '{category}': {updated_count} transactions updated")
-    else:
-        logger.info(f"No transactions updated for mapping '{keyword}' -> '{category}'")
-    
-    return updated_count
+
+    merchants = models.Merchant.__table__
+    # 새 매핑은 가장 나중에 등록되므로 다른 키워드에 매핑되지 않은 가맹점만 분류 결과가 바뀜
+    merchant_ids = db.execute(
+        search.matching_merchants(keyword).where(merchants.c.category.is_(None)).order_by(merchants.c.id)
+    ).scalars().all()
+
+    updated_count = updated_card_count = 0
+    for start in range(0, len(merchant_ids), BACKFILL_CHUNK_SIZE):
+        count, card_count = _backfill_chunk(db, merchant_ids[start:start + BACKFILL_CHUNK_SIZE], category)
+        updated_count += count
+        updated_card_count += card_count
+
+    if updated_count or updated_card_count:
+        analytics.invalidate_merchants()
+    logger.info(
+        f"Applied mapping '{keyword}' -> '{category}': "
+        f"{updated_count} transactions, {updated_card_count} card transactions updated"
+    )
+    return updated_count, updated_card_count
 
 
 @router.get("/", response_model=List[schemas.CategoryMapping])
@@ -88,9 +119,10 @@ def create_category_mapping(
     db.add(db_mapping)
     db.commit()
     db.refresh(db_mapping)
+    categorizer.invalidate_matcher()
     
     # 기존 거래에 매핑 적용
-    updated_count = apply_mapping_to_existing_transactions(
+    updated_count, updated_card_count = apply_mapping_to_existing_transactions(
         db=db,
         keyword=mapping.keyword,
         category=mapping.category
@@ -101,19 +133,70 @@ def create_category_mapping(
         id=db_mapping.id,
         keyword=db_mapping.keyword,
         category=db_mapping.category,
-        updated_transactions_count=updated_count
+        updated_transactions_count=updated_count,
+        updated_card_transactions_count=updated_card_count
     )
     
     return response
 
 
-@router.put("/{mapping_id}", response_model=schemas.CategoryMapping)
+@router.get("/preview", response_model=schemas.CategoryMappingPreview)
+def preview_category_mapping(
+    keyword: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """카테고리 매핑을 만들면 자동 분류될 기존 거래 (건수 + 최신순 일부)"""
+    counts = {
+        model: db.execute(
+            select(func.count()).select_from(model.__table__).where(
+                search.keyword_filter(model, keyword, ("description",)),
+                _backfill_condition(model)
+            )
+        ).scalar()
+        for model in (models.Transaction, models.CardTransaction)
+    }
+    entries = search.search_query(keyword, columns=("description",), condition=_backfill_condition).subquery()
+    samples = db.query(entries).order_by(
+        entries.c.transaction_date.desc(), entries.c.source, entries.c.id.desc()
+    ).limit(limit).all()
+
+    return schemas.CategoryMappingPreview(
+        keyword=keyword,
+        transactions_count=counts[models.Transaction],
+        card_transactions_count=counts[models.CardTransaction],
+        samples=[sample._asdict() for sample in samples]
+    )
+
+
+@router.post("/recategorize", response_model=schemas.RecategorizationJob)
+def start_recategorization(db: Session = Depends(get_db)):
+    """현재 매핑으로 자동 분류된 거래 / 미분류 거래 전체 재분류 (백그라운드 작업)"""
+    return recategorize.submit(db, "전체 재분류")
+
+
+@router.get("/recategorize", response_model=List[schemas.RecategorizationJob])
+def get_recategorization_jobs(db: Session = Depends(get_db)):
+    """재분류 작업 목록 (최근 순)"""
+    return recategorize.list_jobs(db)
+
+
+@router.get("/recategorize/{job_id}", response_model=schemas.RecategorizationJob)
+def get_recategorization_job(job_id: int, db: Session = Depends(get_db)):
+    """재분류 작업 진행 상황 조회"""
+    job = recategorize.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job
+
+
+@router.put("/{mapping_id}", response_model=schemas.CategoryMappingChangeResponse)
 def update_category_mapping(
     mapping_id: int,
     category: str,
     db: Session = Depends(get_db)
 ):
-    """카테고리 매핑 수정"""
+    """카테고리 매핑 수정 후 기존 거래 재분류 작업 시작"""
     mapping = db.query(models.CategoryMapping).filter(models.CategoryMapping.id == mapping_id).first()
     if not mapping:
         raise HTTPException(status_code=404, detail="매핑을 찾을 수 없습니다.")
@@ -121,19 +204,31 @@ def update_category_mapping(
     mapping.category = category
     db.commit()
     db.refresh(mapping)
-    return mapping
+    categorizer.invalidate_matcher()
+
+    job = recategorize.submit(db, f"매핑 수정: {mapping.keyword}")
+    return schemas.CategoryMappingChangeResponse(
+        id=mapping.id,
+        keyword=mapping.keyword,
+        category=mapping.category,
+        recategorization_job_id=job.id
+    )
 
 
 @router.delete("/{mapping_id}")
 def delete_category_mapping(mapping_id: int, db: Session = Depends(get_db)):
-    """카테고리 매핑 삭제"""
+    """카테고리 매핑 삭제 후 기존 거래 재분류 작업 시작"""
     mapping = db.query(models.CategoryMapping).filter(models.CategoryMapping.id == mapping_id).first()
     if not mapping:
         raise HTTPException(status_code=404, detail="매핑을 찾을 수 없습니다.")
 
+    keyword = mapping.keyword
     db.delete(mapping)
     db.commit()
-    return {"message": "삭제 완료"}
+    categorizer.invalidate_matcher()
+
+    job = recategorize.submit(db, f"매핑 삭제: {keyword}")
+    return {"message": "삭제 완료", "recategorization_job_id": job.id}
 
 
 @router.get("/list")
@@ -0,0 +1,154 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func
+from typing import Dict, List, Tuple
+
+from .. import models, schemas
+from ..database import get_db
+from .statistics import (
+    _empty_monthly_statistics,
+    _month_range,
+    _months_before,
+    get_available_months,
+    get_total_assets,
+    get_total_assets_by_month,
+)
+
+router = APIRouter()
+
+# 추이 차트에 표시할 개월 수
+TREND_MONTHS = 6
+
+
+def _monthly_and_category_statistics(
+    db: Session,
+    from_month: str,
+    to_month: str
+) -> Tuple[Dict[str, schemas.MonthlyStatistics], Dict[str, List[schemas.CategoryStatistics]]]:
+    """기간 내 월별 통계와 월별 카테고리 지출을 쿼리 한 번으로 계산
+
+    SQLite 에는 GROUPING SETS 가 없으므로 (년월, 카테고리) 로 묶은 결과에
+    년월 단위 window 합계를 붙여 월 합계와 카테고리별 합계를 함께 받는다.
+    """
+    rollup = models.MonthlyRollup
+    ranked = db.query(
+        rollup.year_month,
+        rollup.category,
+        rollup.income_total,
+        rollup.expense_total,
+        rollup.expense_count,
+        rollup.transaction_count,
+        (rollup.first_balance - rollup.first_amount).label("start_balance"),
+        rollup.last_balance,
+        func.row_number().over(
+            partition_by=rollup.year_month,
+            order_by=(rollup.first_date, rollup.first_id)
+        ).label("first_rank"),
+        func.row_number().over(
+            partition_by=rollup.year_month,
+            order_by=(rollup.last_date.desc(), rollup.last_id.desc())
+        ).label("last_rank")
+    ).filter(
+        rollup.year_month >= from_month,
+        rollup.year_month <= to_month
+    ).subquery()
+
+    r = ranked.c
+    by_category = db.query(
+        r.year_month,
+        r.category,
+        func.sum(r.income_total).label("income_total"),
+        func.sum(r.expense_total).label("expense_total"),
+        func.sum(r.expense_count).label("expense_count"),
+        func.sum(r.transaction_count).label("transaction_count"),
+        func.max(case((r.first_rank == 1, r.start_balance))).label("start_balance"),
+        func.max(case((r.last_rank == 1, r.last_balance))).label("end_balance")
+    ).group_by(r.year_month, r.category).subquery()
+
+    c = by_category.c
+    month = {"partition_by": c.year_month}
+    results = db.query(
+        c.year_month,
+        c.category,
+        c.expense_total,
+        c.expense_count,
+        func.sum(c.income_total).over(**month).label("month_income"),
+        func.sum(c.expense_total).over(**month).label("month_expense"),
+        func.sum(c.transaction_count).over(**month).label("month_count"),
+        func.max(c.start_balance).over(**month).label("month_start_balance"),
+        func.max(c.end_balance).over(**month).label("month_end_balance")
+    ).all()
+
+    monthly: Dict[str, schemas.MonthlyStatistics] = {}
+    expenses: Dict[str, List] = {}
+    for row in results:
+        if row.year_month not in monthly:
+            monthly[row.year_month] = schemas.MonthlyStatistics(
+                year_month=row.year_month,
+                total_income=row.month_income,
+                total_expense=abs(row.month_expense),
+                net_change=row.month_end_balance - row.month_start_balance,
+                start_balance=row.month_start_balance,
+                end_balance=row.month_end_balance,
+                transaction_count=row.month_count
+            )
+        if row.expense_count > 0:
+            expenses.setdefault(row.year_month, []).append(row)
+
+    categories: Dict[str, List[schemas.CategoryStatistics]] = {}
+    for year_month, rows in expenses.items():
+        total_expense = sum(abs(r.expense_total) for r in rows)
+        statistics = [
+            schemas.CategoryStatistics(
+                category=r.category or "미분류",
+                total_amount=abs(r.expense_total),
+                transaction_count=r.expense_count,
+                percentage=round(abs(r.expense_total) / total_expense * 100, 2) if total_expense > 0 else 0
+            )
+            for r in rows
+        ]
+        statistics.sort(key=lambda x: x.total_amount, reverse=True)
+        categories[year_month] = statistics
+
+    return monthly, categories
+
+
+@router.get("/{year_month}", response_model=schemas.DashboardResponse)
+def get_dashboard(
+    year_month: str,
+    recent_limit: int = Query(5, ge=0, le=100),
+    db: Session = Depends(get_db)
+):
+    """대시보드 데이터 한 번에 조회 (월별/카테고리 통계, 추이, 총자산, 최근 거래)
+
+    요청 월에 거래가 없으면 가장 최근 거래가 있는 월을 기준으로 한다.
+    """
+    months = get_available_months(db=db)["months"]
+    if months and year_month not in months:
+        year_month = months[0]
+    _month_range(year_month, year_month)  # 형식 검사
+
+    from_month = _months_before(year_month, TREND_MONTHS - 1)
+    trend_months = _month_range(from_month, year_month)
+    previous_month = _months_before(year_month, 1)
+
+    monthly, categories = _monthly_and_category_statistics(db, from_month, year_month)
+    trend = [monthly.get(ym) or _empty_monthly_statistics(ym) for ym in trend_months]
+
+    recent_transactions = db.query(models.Transaction)\
+        .order_by(models.Transaction.transaction_date.desc())\
+        .limit(recent_limit)\
+        .all()
+
+    return schemas.DashboardResponse(
+        year_month=year_month,
+        previous_month=previous_month,
+        months=months,
+        current=trend[-1],
+        previous=trend[-2],
+        trend=trend,
+        categories=categories.get(year_month, []),
+        total_assets=get_total_assets(db=db),
+        previous_total_assets=get_total_assets_by_month(previous_month, db=db),
+        recent_transactions=recent_transactions
+    )
@@ -0,0 +1,180 @@
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from openpyxl import load_workbook
+import asyncio
+import logging
+
+from .. import importer, jobs, models, schemas, uploads
+from ..database import get_db
+from ..enums import AccountType
+from . import card_transactions, transactions
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# 헤더 행('거래 일시')을 찾을 때 확인할 최대 행 수
+HEADER_SEARCH_ROWS = 50
+
+
+def detect_file_kind(file_path: str) -> str:
+    """Excel 파일 형식 판별 (토스뱅크: transactions, Samsung Card: card_transactions)"""
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        first_sheet = workbook[workbook.sheetnames[0]]
+        first_sheet.reset_dimensions()
+        for values in first_sheet.iter_rows(max_row=HEADER_SEARCH_ROWS, values_only=True):
+            if any(value is not None and '거래 일시' in str(value) for value in values):
+                return "transactions"
+
+        if any(name in ("일시불", "할부") for name in workbook.sheetnames):
+            return "card_transactions"
+    finally:
+        workbook.close()
+
+    raise ValueError("토스뱅크 또는 Samsung Card Excel 파일이 아닙니다.")
+
+
+def parse_file(file_path: str, card_holder: Optional[str]) -> Tuple[str, list]:
+    """파일 형식을 판별하여 파싱 (적재 작업 프로세스에서 실행)"""
+    kind = detect_file_kind(file_path)
+    if kind == "transactions":
+        return kind, transactions.parse_toss_excel(file_path)
+
+    if not card_holder:
+        raise ValueError("카드 내역 파일은 카드 소유자 이름이 필요합니다.")
+    return kind, list(card_transactions.parse_samsung_card_excel(file_path, card_holder))
+
+
+def _scope(kind: str, account_type: str, card_holder: Optional[str]) -> str:
+    return account_type if kind == "transactions" else card_holder
+
+
+def find_imported_files(
+    db: Session,
+    spooled: List[Tuple[str, str, str]],
+    account_type: str,
+    card_holder: Optional[str]
+) -> Dict[str, Tuple[str, models.ImportedFile]]:
+    """이미 적재된 파일 조회 - 내용 해시 -> (종류, 적재 기록)"""
+    skipped = {}
+    for filename, _, content_hash in spooled:
+        for kind in ("transactions", "card_transactions"):
+            scope = _scope(kind, account_type, card_holder)
+            if scope is None:
+                continue
+            imported_file = uploads.find_imported_file(db, content_hash, kind, scope)
+            if imported_file:
+                skipped[content_hash] = (kind, imported_file)
+                break
+    return skipped
+
+
+def import_parsed_files(
+    db: Session,
+    pending: List[Tuple[str, str, str]],
+    parsed: List[Tuple[str, list]],
+    account_type: str,
+    card_holder: Optional[str]
+) -> List[schemas.UploadResponse]:
+    """파싱된 파일들을 적재하고 적재 기록까지 한 트랜잭션으로 저장"""
+    def record_imported_files(results: List[schemas.UploadResponse]) -> None:
+        for (filename, _, content_hash), (kind, _), result in zip(pending, parsed, results):
+            scope = _scope(kind, account_type, card_holder)
+            uploads.record_imported_file(db, content_hash, kind, scope, filename, result)
+
+    return importer.import_files(
+        db,
+        parsed,
+        account_type,
+        card_holder,
+        before_commit=record_imported_files
+    )
+
+
+@router.post("/batch", response_model=schemas.BatchUploadResponse)
+async def upload_batch(
+    files: List[UploadFile] = File(...),
+    account_type: AccountType = Form(AccountType.LIVING),
+    card_holder: Optional[str] = Form(None),
+    db: Session = Depends(get_db)
+):
+    """여러 Excel 파일 일괄 업로드 (토스뱅크/Samsung Card 혼합 가능)
+
+    파일들은 작업 프로세스에서 병렬로 파싱하고, 파일 간 중복과 기존 거래와의 중복을
+    제거한 뒤 한 트랜잭션으로 저장한다. 하나라도 실패하면 아무것도 저장하지 않는다.
+
+    Args:
+        files: 토스뱅크 또는 Samsung Card Excel 파일들
+        account_type: 토스뱅크 파일에 적용할 계좌 유형
+        card_holder: Samsung Card 파일에 적용할 카드 소유자 이름
+    """
+    for file in files:
+        if not file.filename.endswith(('.xlsx', '.xls')):
+            raise HTTPException(status_code=400, detail=f"Excel 파일만 업로드 가능합니다: {file.filename}")
+
+    card_holder = card_holder.strip() if card_holder and card_holder.strip() else None
+
+    # 파일 저장 (내용 해시 기준 파일명)
+    spooled = [(file.filename,) + await uploads.spool_upload(file) for file in files]
+
+    # 이미 적재된 파일은 파싱하지 않음
+    skipped = await run_in_threadpool(find_imported_files, db, spooled, account_type.value, card_holder)
+
+    # 같은 내용의 파일이 여러 번 올라온 경우 한 번만 파싱
+    pending = []
+    pending_hashes = set()
+    for filename, file_path, content_hash in spooled:
+        if content_hash not in skipped and content_hash not in pending_hashes:
+            pending.append((filename, file_path, content_hash))
+            pending_hashes.add(content_hash)
+
+    parsed = await asyncio.gather(
+        *(jobs.run_in_worker(parse_file, file_path, card_holder) for _, file_path, _ in pending),
+        return_exceptions=True
+    )
+
+    errors = [
+        f"{filename}: {result}"
+        for (filename, _, _), result in zip(pending, parsed)
+        if isinstance(result, Exception)
+    ]
+    if errors:
+        logger.error(f"Batch upload parsing failed: {errors}")
+        raise HTTPException(status_code=400, detail=f"파일 처리 중 오류 발생: {'; '.join(errors)}")
+
+    results = await run_in_threadpool(import_parsed_files, db, pending, parsed, account_type.value, card_holder)
+    by_hash = {
+        content_hash: (kind, result)
+        for (_, _, content_hash), (kind, _), result in zip(pending, parsed, results)
+    }
+
+    # 파일별 결과 (업로드 순서)
+    file_results = []
+    reported = set()
+    for filename, _, content_hash in spooled:
+        if content_hash in skipped:
+            kind, imported_file = skipped[content_hash]
+            result = uploads.already_imported_response(imported_file)
+        elif content_hash in reported:
+            # 같은 내용의 파일이 한 번 더 올라온 경우
+            kind, first_result = by_hash[content_hash]
+            result = schemas.UploadResponse(
+                message="이미 업로드된 파일입니다.",
+                total_records=first_result.total_records,
+                new_records=0,
+                duplicate_records=first_result.total_records
+            )
+        else:
+            kind, result = by_hash[content_hash]
+        reported.add(content_hash)
+        file_results.append(schemas.BatchFileResult(filename=filename, kind=kind, **result.dict()))
+
+    return schemas.BatchUploadResponse(
+        message="업로드 완료",
+        total_records=sum(r.total_records for r in file_results),
+        new_records=sum(r.new_records for r in file_results),
+        duplicate_records=sum(r.duplicate_records for r in file_results),
+        files=file_results
+    )
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, HTTPException
+from typing import List
+
+from .. import jobs, schemas
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[schemas.ImportJob])
+def get_import_jobs():
+    """업로드 적재 작업 목록 (최근 순)"""
+    return jobs.list_jobs()
+
+
+@router.get("/{job_id}", response_model=schemas.ImportJob)
+def get_import_job(job_id: str):
+    """업로드 적재 작업 상태 조회 (진행 건수, 완료 시 업로드 결과 포함)"""
+    job = jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job
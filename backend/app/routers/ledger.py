@@ -0,0 +1,178 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func
+from typing import List, Optional
+
+from .. import ledger, models, schemas
+from ..database import get_db
+from ..enums import LedgerSource, TransactionCategory
+from .statistics import _month_range, _months_before
+
+router = APIRouter()
+
+# 비교에 사용하는 직전 기간 (개월)
+SHORT_TRAILING_MONTHS = 3
+LONG_TRAILING_MONTHS = 12
+
+
+def _spending_columns(entries):
+    """지출 합계 (양수) / 출처별 합계 / 건수"""
+    spending = -func.sum(entries.c.amount)
+    return (
+        spending.label("total_amount"),
+        (-func.sum(case((entries.c.source == LedgerSource.BANK.value, entries.c.amount), else_=0.0)))
+        .label("bank_amount"),
+        (-func.sum(case((entries.c.source == LedgerSource.CARD.value, entries.c.amount), else_=0.0)))
+        .label("card_amount"),
+        func.count().label("transaction_count"),
+    )
+
+
+@router.get("/", response_model=List[schemas.LedgerEntry])
+def get_ledger_entries(
+    from_month: Optional[str] = Query(None, alias="from"),
+    to_month: Optional[str] = Query(None, alias="to"),
+    category: Optional[str] = None,
+    source: Optional[LedgerSource] = None,
+    exclude_card_payments: bool = True,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """은행 지출과 카드 거래를 합친 지출 내역 (최신순)"""
+    condition = None
+    if category:
+        # 미분류 카드 거래(카테고리 NULL)도 "미분류" 로 묶음
+        condition = lambda model: models.category_filter(
+            db, model, category, TransactionCategory.UNCATEGORIZED.value, offset + limit
+        )
+    entries = ledger.ledger_query(from_month, to_month, exclude_card_payments, condition).subquery()
+    query = db.query(entries)
+    if source:
+        query = query.filter(entries.c.source == source.value)
+
+    return query.order_by(
+        entries.c.transaction_date.desc(), entries.c.source, entries.c.id.desc()
+    ).offset(offset).limit(limit).all()
+
+
+@router.get("/categories", response_model=List[schemas.LedgerCategoryStatistics])
+def get_ledger_category_statistics(
+    from_month: Optional[str] = Query(None, alias="from"),
+    to_month: Optional[str] = Query(None, alias="to"),
+    exclude_card_payments: bool = True,
+    db: Session = Depends(get_db)
+):
+    """은행 + 카드 카테고리별 지출 (쿼리 한 번, 비율은 window 함수로 계산)"""
+    entries = ledger.ledger_query(from_month, to_month, exclude_card_payments).subquery()
+    spending = -func.sum(entries.c.amount)
+    results = db.query(
+        entries.c.category,
+        *_spending_columns(entries),
+        func.coalesce(spending * 100.0 / func.nullif(func.sum(spending).over(), 0), 0.0).label("percentage")
+    ).group_by(entries.c.category).order_by(spending.desc()).all()
+
+    return [
+        schemas.LedgerCategoryStatistics(
+            category=r.category,
+            total_amount=r.total_amount,
+            bank_amount=r.bank_amount,
+            card_amount=r.card_amount,
+            transaction_count=r.transaction_count,
+            percentage=round(r.percentage, 2)
+        )
+        for r in results
+    ]
+
+
+@router.get("/monthly", response_model=List[schemas.LedgerMonthlyStatistics])
+def get_ledger_monthly_statistics(
+    from_month: str = Query(..., alias="from"),
+    to_month: str = Query(..., alias="to"),
+    exclude_card_payments: bool = True,
+    db: Session = Depends(get_db)
+):
+    """은행 + 카드 월별 지출 (from ~ to, YYYY-MM) - 지출이 없는 월은 0 으로 채움"""
+    year_months = _month_range(from_month, to_month)
+    entries = ledger.ledger_query(from_month, to_month, exclude_card_payments).subquery()
+    results = db.query(
+        entries.c.year_month,
+        *_spending_columns(entries)
+    ).group_by(entries.c.year_month).all()
+
+    statistics = {r.year_month: r._asdict() for r in results}
+    empty = {"total_amount": 0, "bank_amount": 0, "card_amount": 0, "transaction_count": 0}
+    return [
+        schemas.LedgerMonthlyStatistics(**statistics.get(ym, {"year_month": ym, **empty}))
+        for ym in year_months
+    ]
+
+
+def _comparison(category: str, current: float, previous: float, last_year: float,
+                trailing_short: float, trailing_long: float) -> schemas.LedgerCategoryComparison:
+    return schemas.LedgerCategoryComparison(
+        category=category,
+        current=current,
+        previous=previous,
+        previous_change=current - previous,
+        last_year=last_year,
+        last_year_change=current - last_year,
+        last_year_change_rate=round((current - last_year) / last_year * 100, 2) if last_year else None,
+        trailing_3_average=trailing_short / SHORT_TRAILING_MONTHS,
+        trailing_12_average=trailing_long / LONG_TRAILING_MONTHS
+    )
+
+
+@router.get("/comparison/{year_month}", response_model=schemas.LedgerComparison)
+def get_ledger_comparison(
+    year_month: str,
+    source: Optional[LedgerSource] = None,
+    exclude_card_payments: bool = True,
+    db: Session = Depends(get_db)
+):
+    """기준 월의 카테고리별 지출을 전월, 전년 동월, 직전 3/12개월 평균과 비교
+
+    기준 월과 직전 12개월(13개월 범위)의 은행 지출 + 카드 거래를 카테고리별로 한 번에 집계한다.
+    """
+    _month_range(year_month, year_month)  # 형식 검사
+    previous_month = _months_before(year_month, 1)
+    last_year_month = _months_before(year_month, 12)
+    short_from = _months_before(year_month, SHORT_TRAILING_MONTHS)
+    long_from = _months_before(year_month, LONG_TRAILING_MONTHS)
+
+    entries = ledger.ledger_query(long_from, year_month, exclude_card_payments).subquery()
+    month = entries.c.year_month
+
+    def spending(condition):
+        return -func.sum(case((condition, entries.c.amount), else_=0.0))
+
+    query = db.query(
+        entries.c.category,
+        spending(month == year_month).label("current"),
+        spending(month == previous_month).label("previous"),
+        spending(month == last_year_month).label("last_year"),
+        spending(month.between(short_from, previous_month)).label("trailing_short"),
+        spending(month.between(long_from, previous_month)).label("trailing_long")
+    )
+    if source:
+        query = query.filter(entries.c.source == source.value)
+    results = query.group_by(entries.c.category).all()
+
+    categories = [
+        _comparison(r.category, r.current, r.previous, r.last_year, r.trailing_short, r.trailing_long)
+        for r in results
+    ]
+    categories.sort(key=lambda c: (c.current, c.trailing_12_average), reverse=True)
+    total = _comparison(
+        "전체",
+        *(sum(getattr(r, field) for r in results)
+          for field in ("current", "previous", "last_year", "trailing_short", "trailing_long"))
+    )
+
+    return schemas.LedgerComparison(
+        year_month=year_month,
+        previous_month=previous_month,
+        last_year_month=last_year_month,
+        total=total,
+        categories=categories
+    )
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from .. import models, schemas, search
+from ..database import get_db
+from ..enums import LedgerSource, TransactionCategory
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[schemas.SearchResult])
+def search_transactions(
+    q: str = Query(..., min_length=1),
+    from_month: Optional[str] = Query(None, alias="from"),
+    to_month: Optional[str] = Query(None, alias="to"),
+    category: Optional[str] = None,
+    source: Optional[LedgerSource] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """적요 / 메모에 검색어가 포함된 은행 거래와 카드 거래 (최신순)
+
+    3글자 이상의 검색어는 전문 검색 색인(FTS5 trigram)으로 찾는다.
+    """
+    condition = None
+    if category:
+        # 미분류 카드 거래(카테고리 NULL)도 "미분류" 로 묶음
+        condition = lambda model: models.category_filter(
+            db, model, category, TransactionCategory.UNCATEGORIZED.value, offset + limit
+        )
+    entries = search.search_query(q, from_month, to_month, source, condition=condition).subquery()
+    query = db.query(entries)
+
+    return query.order_by(
+        entries.c.transaction_date.desc(), entries.c.source, entries.c.id.desc()
+    ).offset(offset).limit(limit).all()
@@ -1,77 +1,171 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from sqlalchemy import case, func
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Dict, List
+import math
 
-from .. import models, schemas
+from .. import analytics, models, schemas
 from ..database import get_db
+from ..enums import SeriesResolution
 
 router = APIRouter()
 
 
-@router.get("/monthly/{year_month}", response_model=schemas.MonthlyStatistics)
-def get_monthly_statistics(year_month: str, account_type: str = None, db: Session = Depends(get_db)):
-    """월별 통계"""
-    query = db.query(models.Transaction).filter(
-        models.Transaction.year_month == year_month
-    )
-    
-    if account_type:
-        query = query.filter(models.Transaction.account_type == account_type)
-    
-    transactions = query.order_by(models.Transaction.transaction_date).all()
-
-    if not transactions:
-        return schemas.MonthlyStatistics(
-            year_month=year_month,
-            total_income=0,
-            total_expense=0,
-            net_change=0,
-            start_balance=0,
-            end_balance=0,
-            transaction_count=0
-        )
+# 기간 통계로 한 번에 조회할 수 있는 최대 개월 수
+MAX_RANGE_MONTHS = 120
 
-    # 수입/지출 계산
-    total_income = sum(t.amount for t in transactions if t.amount > 0)
-    total_expense = sum(abs(t.amount) for t in transactions if t.amount < 0)
+# 잔액 시계열 기본 / 최대 시점 수
+DEFAULT_SERIES_POINTS = 200
+MAX_SERIES_POINTS = 1000
 
-    # 시작 잔액과 종료 잔액
-    # 첫 번째 거래의 잔액에서 거래금액을 빼면 시작 잔액
-    first_transaction = transactions[0]
-    start_balance = first_transaction.balance - first_transaction.amount
-    end_balance = transactions[-1].balance
 
+def _empty_monthly_statistics(year_month: str) -> schemas.MonthlyStatistics:
     return schemas.MonthlyStatistics(
         year_month=year_month,
-        total_income=total_income,
-        total_expense=total_expense,
-        net_change=end_balance - start_balance,
-        start_balance=start_balance,
-        end_balance=end_balance,
-        transaction_count=len(transactions)
+        total_income=0,
+        total_expense=0,
+        net_change=0,
+        start_balance=0,
+        end_balance=0,
+        transaction_count=0
     )
 
 
-@router.get("/category/{year_month}", response_model=List[schemas.CategoryStatistics])
-def get_category_statistics(year_month: str, account_type: str = None, db: Session = Depends(get_db)):
-    """카테고리별 통계 (지출만)"""
-    # 카테고리별 지출 합계
+def _month_range(from_month: str, to_month: str) -> List[str]:
+    """from_month ~ to_month (YYYY-MM) 사이의 모든 년월"""
+    try:
+        from_year, from_mon = (int(part) for part in from_month.split("-"))
+        to_year, to_mon = (int(part) for part in to_month.split("-"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="년월은 YYYY-MM 형식이어야 합니다.")
+
+    start = from_year * 12 + from_mon - 1
+    end = to_year * 12 + to_mon - 1
+    if not (1 <= from_mon <= 12 and 1 <= to_mon <= 12) or start > end:
+        raise HTTPException(status_code=400, detail="조회 기간이 올바르지 않습니다.")
+    if end - start + 1 > MAX_RANGE_MONTHS:
+        raise HTTPException(status_code=400, detail=f"최대 {MAX_RANGE_MONTHS}개월까지 조회할 수 있습니다.")
+
+    return [f"{month // 12:04d}-{month % 12 + 1:02d}" for month in range(start, end + 1)]
+
+
+def _months_before(year_month: str, count: int) -> str:
+    """year_month 에서 count 개월 전 (YYYY-MM)"""
+    year, month = (int(part) for part in year_month.split("-"))
+    index = year * 12 + month - 1 - count
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _monthly_statistics(
+    db: Session,
+    from_month: str,
+    to_month: str,
+    account_type: str = None
+) -> Dict[str, schemas.MonthlyStatistics]:
+    """기간 내 거래가 있는 월의 통계 (분석 엔진이 켜져 있으면 엔진에서, 아니면 월별 집계 테이블에서 계산)"""
+    engine = analytics.get_engine(db)
+    if engine is not None:
+        results = engine.monthly_totals(from_month, to_month, account_type or None)
+    else:
+        results = _rollup_monthly_totals(db, from_month, to_month, account_type)
+
+    return {
+        r.year_month: schemas.MonthlyStatistics(
+            year_month=r.year_month,
+            total_income=r.total_income,
+            total_expense=abs(r.total_expense),
+            net_change=r.end_balance - r.start_balance,
+            start_balance=r.start_balance,
+            end_balance=r.end_balance,
+            transaction_count=r.transaction_count
+        )
+        for r in results
+    }
+
+
+def _rollup_monthly_totals(db: Session, from_month: str, to_month: str, account_type: str = None):
+    """월별 집계 테이블에서 월별 합계 / 월초·월말 잔액을 쿼리 한 번으로 계산"""
+    rollup = models.MonthlyRollup
     query = db.query(
-        models.Transaction.category,
-        func.sum(models.Transaction.amount).label("total_amount"),
-        func.count(models.Transaction.id).label("transaction_count")
+        rollup.year_month,
+        rollup.income_total,
+        rollup.expense_total,
+        rollup.transaction_count,
+        (rollup.first_balance - rollup.first_amount).label("start_balance"),
+        rollup.last_balance,
+        # 월 안에서 첫 거래 / 마지막 거래를 가진 집계 행
+        func.row_number().over(
+            partition_by=rollup.year_month,
+            order_by=(rollup.first_date, rollup.first_id)
+        ).label("first_rank"),
+        func.row_number().over(
+            partition_by=rollup.year_month,
+            order_by=(rollup.last_date.desc(), rollup.last_id.desc())
+        ).label("last_rank")
     ).filter(
-        models.Transaction.year_month == year_month,
-        models.Transaction.amount < 0  # 지출만
+        rollup.year_month >= from_month,
+        rollup.year_month <= to_month
     )
-    
+
     if account_type:
-        query = query.filter(models.Transaction.account_type == account_type)
-    
-    results = query.group_by(
-        models.Transaction.category
-    ).all()
+        query = query.filter(rollup.account_type == account_type)
+
+    ranked = query.subquery()
+    return db.query(
+        ranked.c.year_month,
+        func.sum(ranked.c.income_total).label("total_income"),
+        func.sum(ranked.c.expense_total).label("total_expense"),
+        func.sum(ranked.c.transaction_count).label("transaction_count"),
+        func.max(case((ranked.c.first_rank == 1, ranked.c.start_balance))).label("start_balance"),
+        func.max(case((ranked.c.last_rank == 1, ranked.c.last_balance))).label("end_balance")
+    ).group_by(ranked.c.year_month).all()
+
+
+@router.get("/monthly", response_model=List[schemas.MonthlyStatistics])
+def get_monthly_statistics_range(
+    from_month: str = Query(..., alias="from"),
+    to_month: str = Query(..., alias="to"),
+    account_type: str = None,
+    db: Session = Depends(get_db)
+):
+    """기간별 월별 통계 (from ~ to, YYYY-MM) - 거래가 없는 월은 0 으로 채움"""
+    year_months = _month_range(from_month, to_month)
+    statistics = _monthly_statistics(db, from_month, to_month, account_type)
+    return [statistics.get(ym) or _empty_monthly_statistics(ym) for ym in year_months]
+
+
+@router.get("/monthly/{year_month}", response_model=schemas.MonthlyStatistics)
+def get_monthly_statistics(year_month: str, account_type: str = None, db: Session = Depends(get_db)):
+    """월별 통계"""
+    statistics = _monthly_statistics(db, year_month, year_month, account_type)
+    return statistics.get(year_month) or _empty_monthly_statistics(year_month)
+
+
+@router.get("/category/{year_month}", response_model=List[schemas.CategoryStatistics])
+def get_category_statistics(year_month: str, account_type: str = None, db: Session = Depends(get_db)):
+    """카테고리별 통계 (지출만)"""
+    engine = analytics.get_engine(db)
+    if engine is not None:
+        results = engine.category_expenses(year_month, account_type or None)
+    else:
+        # 카테고리별 지출 합계
+        query = db.query(
+            models.MonthlyRollup.category,
+            func.sum(models.MonthlyRollup.expense_total).label("total_amount"),
+            func.sum(models.MonthlyRollup.expense_count).label("transaction_count")
+        ).filter(
+            models.MonthlyRollup.year_month == year_month,
+            models.MonthlyRollup.expense_count > 0  # 지출만
+        )
+
+        if account_type:
+            query = query.filter(models.MonthlyRollup.account_type == account_type)
+
+        results = query.group_by(
+            models.MonthlyRollup.category
+        ).all()
 
     # 전체 지출 금액
     total_expense = sum(abs(r.total_amount) for r in results)
@@ -98,68 +192,61 @@ def get_category_statistics(year_month: str, account_type: str = None, db: Sessi
 @router.get("/months")
 def get_available_months(account_type: str = None, db: Session = Depends(get_db)):
     """조회 가능한 년월 목록"""
-    query = db.query(models.Transaction.year_month).distinct()
+    engine = analytics.get_engine(db)
+    if engine is not None:
+        return {"months": engine.available_months(account_type or None)}
+
+    query = db.query(models.MonthlyRollup.year_month).distinct()
 
     if account_type:
-        query = query.filter(models.Transaction.account_type == account_type)
+        query = query.filter(models.MonthlyRollup.account_type == account_type)
 
     results = query.all()
     months = sorted([r.year_month for r in results], reverse=True)
     return {"months": months}
 
 
-@router.get("/total-assets")
-def get_total_assets(account_type: str = None, db: Session = Depends(get_db)):
-    """전체 총자산 계산 - 각 계좌별 최신 잔액의 합"""
-    # 각 계좌번호별로 가장 최근 거래를 찾기
-    # account_number로 그룹화하고 각 그룹의 최신 거래를 가져옴
-
-    # 1. 모든 고유 계좌번호 조회
-    query = db.query(models.Transaction.account_number).distinct()
-    if account_type:
-        query = query.filter(models.Transaction.account_type == account_type)
-
-    account_numbers = [r.account_number for r in query.all() if r.account_number]
-
-    if not account_numbers:
-        return {
-            "total_assets": 0,
-            "account_count": 0,
-            "accounts": []
+def _account_balances(db: Session, model, *filters) -> List[dict]:
+    """계좌번호별 가장 최근 잔액 스냅샷 (여러 계좌 유형에 걸친 계좌는 가장 최근 거래 기준)"""
+    ranked = db.query(
+        model.account_number,
+        model.account_type,
+        model.balance,
+        model.last_date,
+        model.institution,
+        func.row_number().over(
+            partition_by=model.account_number,
+            order_by=(model.last_date.desc(), model.last_id.desc())
+        ).label("latest_rank")
+    ).filter(*filters).subquery()
+
+    results = db.query(ranked).filter(
+        ranked.c.latest_rank == 1
+    ).order_by(ranked.c.account_number).all()
+
+    return [
+        {
+            "account_number": r.account_number,
+            "account_type": r.account_type,
+            "latest_balance": r.balance,
+            "last_transaction_date": r.last_date,
+            "institution": r.institution
         }
+        for r in results
+    ]
 
-    # 2. 각 계좌별 최신 거래의 잔액 조회
-    accounts_info = []
-    total_assets = 0
 
-    for account_number in account_numbers:
-        # 해당 계좌의 가장 최근 거래 조회
-        latest_transaction = db.query(models.Transaction).filter(
-            models.Transaction.account_number == account_number
-        )
+@router.get("/total-assets")
+def get_total_assets(account_type: str = None, db: Session = Depends(get_db)):
+    """전체 총자산 계산 - 각 계좌별 최신 잔액의 합 (계좌별 최신 잔액 스냅샷 기준)"""
+    filters = []
+    if account_type:
+        filters.append(models.AccountLatestBalance.account_type == account_type)
 
-        if account_type:
-            latest_transaction = latest_transaction.filter(
-                models.Transaction.account_type == account_type
-            )
-
-        latest_transaction = latest_transaction.order_by(
-            models.Transaction.transaction_date.desc()
-        ).first()
-
-        if latest_transaction:
-            balance = latest_transaction.balance
-            total_assets += balance
-            accounts_info.append({
-                "account_number": account_number,
-                "account_type": latest_transaction.account_type,
-                "latest_balance": balance,
-                "last_transaction_date": latest_transaction.transaction_date,
-                "institution": latest_transaction.institution
-            })
+    accounts_info = _account_balances(db, models.AccountLatestBalance, *filters)
 
     return {
-        "total_assets": total_assets,
+        "total_assets": sum(a["latest_balance"] for a in accounts_info),
         "account_count": len(accounts_info),
         "accounts": accounts_info
     }
@@ -167,59 +254,112 @@ def get_total_assets(account_type: str = None, db: Session = Depends(get_db)):
 
 @router.get("/total-assets/{year_month}")
 def get_total_assets_by_month(year_month: str, account_type: str = None, db: Session = Depends(get_db)):
-    """특정 월의 총자산 계산 - 해당 월의 각 계좌별 마지막 잔액의 합"""
-    # 1. 해당 월에 거래가 있는 모든 고유 계좌번호 조회
-    query = db.query(models.Transaction.account_number).filter(
-        models.Transaction.year_month == year_month
-    ).distinct()
-
+    """특정 월의 총자산 계산 - 해당 월의 각 계좌별 마지막 잔액의 합 (계좌별 월말 잔액 스냅샷 기준)"""
+    filters = [models.AccountBalance.year_month == year_month]
     if account_type:
-        query = query.filter(models.Transaction.account_type == account_type)
-
-    account_numbers = [r.account_number for r in query.all() if r.account_number]
+        filters.append(models.AccountBalance.account_type == account_type)
 
-    if not account_numbers:
-        return {
-            "year_month": year_month,
-            "total_assets": 0,
-            "account_count": 0,
-            "accounts": []
-        }
-
-    # 2. 각 계좌별 해당 월의 마지막 거래 잔액 조회
-    accounts_info = []
-    total_assets = 0
-
-    for account_number in account_numbers:
-        # 해당 계좌의 해당 월 마지막 거래 조회
-        latest_transaction = db.query(models.Transaction).filter(
-            models.Transaction.account_number == account_number,
-            models.Transaction.year_month == year_month
-        )
-
-        if account_type:
-            latest_transaction = latest_transaction.filter(
-                models.Transaction.account_type == account_type
-            )
-
-        latest_transaction = latest_transaction.order_by(
-            models.Transaction.transaction_date.desc()
-        ).first()
-
-        if latest_transaction:
-            balance = latest_transaction.balance
-            total_assets += balance
-            accounts_info.append({
-                "account_number": account_number,
-                "account_type": latest_transaction.account_type,
-                "latest_balance": balance,
-                "last_transaction_date": latest_transaction.transaction_date,
-                "institution": latest_transaction.institution
-            })
+    accounts_info = _account_balances(db, models.AccountBalance, *filters)
 
     return {
         "year_month": year_month,
-        "total_assets": total_assets,
+        "total_assets": sum(a["latest_balance"] for a in accounts_info),
         "account_count": len(accounts_info),
         "accounts": accounts_info
     }
+
+
+def _period_ends(from_date: date, to_date: date, resolution: SeriesResolution) -> List[date]:
+    """기간을 해상도 단위로 나눈 각 구간의 마지막 날짜 (마지막 구간은 to_date 까지)"""
+    ends = []
+    current = from_date
+    while current <= to_date:
+        if resolution == SeriesResolution.DAILY:
+            end = current
+        elif resolution == SeriesResolution.WEEKLY:
+            end = current + timedelta(days=6 - current.weekday())
+        else:
+            next_month = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+            end = next_month - timedelta(days=1)
+        end = min(end, to_date)
+        ends.append(end)
+        current = end + timedelta(days=1)
+    return ends
+
+
+def _downsample(ends: List[date], points: int) -> List[date]:
+    """시점 수가 points 를 넘으면 일정 간격으로 구간을 합침 (마지막 시점은 항상 포함)"""
+    if len(ends) <= points:
+        return ends
+    stride = math.ceil(len(ends) / points)
+    sampled = ends[stride - 1::stride]
+    if sampled[-1] != ends[-1]:
+        sampled.append(ends[-1])
+    return sampled
+
+
+@router.get("/balance-series", response_model=schemas.BalanceSeries)
+def get_balance_series(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    resolution: SeriesResolution = SeriesResolution.MONTHLY,
+    points: int = Query(DEFAULT_SERIES_POINTS, ge=1, le=MAX_SERIES_POINTS),
+    account_type: str = None,
+    db: Session = Depends(get_db)
+):
+    """계좌별 / 전체 잔액 시계열 (from ~ to, YYYY-MM-DD)
+
+    각 시점은 구간 마지막 날짜 종료 시점의 잔액이며, 거래가 없는 구간은 직전 잔액을 이어 쓴다.
+    구간 수가 points 를 넘으면 여러 구간을 하나로 합쳐 응답 크기를 points 이하로 유지한다.
+    """
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="조회 기간이 올바르지 않습니다.")
+
+    ends = _downsample(_period_ends(from_date, to_date, resolution), points)
+    # 거래 일시 ("YYYY.MM.DD HH:MM:SS") 와 문자열로 비교
+    end_keys = [end.strftime("%Y.%m.%d") for end in ends]
+    upper_bound = (to_date + timedelta(days=1)).strftime("%Y.%m.%d")
+
+    # 계좌번호, 거래 일시 순으로 한 번만 읽음 (from 이전 거래는 시작 잔액 계산용)
+    t = models.Transaction
+    query = db.query(
+        t.account_number, t.account_type, t.transaction_date, t.balance
+    ).filter(
+        t.account_number.isnot(None),
+        t.account_number != "",
+        t.transaction_date < upper_bound
+    )
+    if account_type:
+        query = query.filter(t.account_type == account_type)
+    rows = query.order_by(t.account_number, t.transaction_date, t.id).yield_per(5000)
+
+    accounts = []
+    totals = [0.0] * len(ends)
+    for account_number, account_rows in groupby(rows, key=lambda r: r.account_number):
+        balances = [None] * len(ends)
+        index = 0
+        balance = None
+        for row in account_rows:
+            day = row.transaction_date[:10]
+            while day > end_keys[index]:
+                balances[index] = balance
+                index += 1
+            balance = row.balance
+            last_account_type = row.account_type
+        balances[index:] = [balance] * (len(ends) - index)
+
+        for i, value in enumerate(balances):
+            if value is not None:
+                totals[i] += value
+        accounts.append(schemas.BalanceSeriesAccount(
+            account_number=account_number,
+            account_type=last_account_type,
+            balances=balances
+        ))
+
+    return schemas.BalanceSeries(
+        resolution=resolution,
+        dates=[end.isoformat() for end in ends],
+        totals=totals,
+        accounts=accounts
+    )
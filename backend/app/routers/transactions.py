@@ -1,149 +1,151 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List
 import pandas as pd
-import os
 from datetime import datetime
 import logging
 
-from .. import models, schemas
-from ..database import get_db
-from ..enums import AccountType, TransactionCategory
+from .. import analytics, bulk_edit, importer, jobs, models, rollups, schemas, uploads
+from ..database import SessionLocal, get_db
+from ..enums import AccountType, CategorySource, TransactionCategory
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-def parse_toss_excel(file_path: str) -> List[dict]:
-    """토스뱅크 Excel 파일 파싱"""
-    df = pd.read_excel(file_path)
+# 컬럼 배치 하나에 담을 최대 거래 수
+TOSS_BATCH_SIZE = 5000
+
+
+def _optional_text_column(df: pd.DataFrame, column: str) -> list:
+    """선택 컬럼을 문자열 목록으로 변환 (값이 없으면 None)"""
+    if column not in df.columns:
+        return [None] * len(df)
+    values = df[column]
+    return values.map(str, na_action='ignore').astype(object).where(values.notna(), None).tolist()
+
+
+def parse_toss_excel(file_path: str, batch_size: int = TOSS_BATCH_SIZE) -> List[importer.ColumnBatch]:
+    """토스뱅크 Excel 파일 파싱 (컬럼 단위 배치로 반환)"""
+    raw = pd.read_excel(file_path, header=None, dtype=object)
 
     # 실제 거래내역이 시작되는 행 찾기 (컬럼명이 '거래 일시'인 행)
-    header_row = None
-    for idx, row in df.iterrows():
-        if '거래 일시' in str(row.values):
-            header_row = idx
-            break
+    is_header = raw.apply(
+        lambda column: column.astype(str).str.contains('거래 일시', regex=False)
+    ).any(axis=1).to_numpy()
 
-    if header_row is None:
+    if not is_header.any():
         raise ValueError("거래 일시 컬럼을 찾을 수 없습니다.")
 
     # 헤더 설정 및 데이터 추출
-    df = pd.read_excel(file_path, skiprows=header_row)
-    df.columns = df.iloc[0]
-    df = df[1:]  # 헤더 행 제거
+    header_row = int(is_header.argmax())
+    df = raw.iloc[header_row + 1:]
+    df.columns = raw.iloc[header_row]
 
     # NaN 제거 및 데이터 정제
     df = df.dropna(subset=['거래 일시', '적요', '거래 금액'])
 
-    transactions = []
-    for _, row in df.iterrows():
-        try:
-            # 날짜 파싱
-            transaction_date = str(row['거래 일시'])
-            year_month = transaction_date[:7].replace('.', '-')  # "2025.12" -> "2025-12"
-
-            transactions.append({
-                "transaction_date": transaction_date,
-                "description": str(row['적요']),
-                "transaction_type": str(row['거래 유형']),
-                "institution": str(row.get('거래 기관', '')) if pd.notna(row.get('거래 기관')) else None,
-                "account_number": str(row.get('계좌번호', '')) if pd.notna(row.get('계좌번호')) else None,
-                "amount": float(row['거래 금액']),
-                "balance": float(row['거래 후 잔액']),
-                "memo": str(row.get('메모', '')) if pd.notna(row.get('메모')) else None,
-                "year_month": year_month
-            })
-        except Exception as e:
-            logger.error(f"Error parsing row: {e}", exc_info=True)
-            continue
-
-    return transactions
-
-
-def auto_categorize(description: str, memo: str, db: Session) -> str:
-    """거래처명과 메모를 기반으로 카테고리 자동 분류"""
-    # 1. 메모에 카테고리가 명시되어 있는지 확인
-    if memo:
-        for category in TransactionCategory:
-            if category == TransactionCategory.UNCATEGORIZED:
-                continue
-            if category.value in memo:
-                return category.value
-
-    # 2. 데이터베이스의 매핑 테이블에서 검색
-    mappings = db.query(models.CategoryMapping).all()
-    for mapping in mappings:
-        if mapping.keyword in description:
-            return mapping.category
-
-    # 3. 기본 카테고리 반환
-    return TransactionCategory.UNCATEGORIZED
-
-
-@router.post("/upload", response_model=schemas.UploadResponse)
+    amount = pd.to_numeric(df['거래 금액'], errors='coerce')
+    balance = pd.to_numeric(df['거래 후 잔액'], errors='coerce')
+    invalid = amount.isna() | balance.isna()
+    if invalid.any():
+        logger.warning(f"Skipping {int(invalid.sum())} rows with invalid amount or balance")
+        df, amount, balance = df[~invalid], amount[~invalid], balance[~invalid]
+
+    # 날짜 파싱 ("2025.12.01 ..." -> "2025-12")
+    transaction_date = df['거래 일시'].map(str)
+    year_month = transaction_date.str[:7].str.replace('.', '-', regex=False)
+
+    columns = {
+        "transaction_date": transaction_date.tolist(),
+        "description": df['적요'].map(str).tolist(),
+        "transaction_type": df['거래 유형'].map(str).tolist(),
+        "institution": _optional_text_column(df, '거래 기관'),
+        "account_number": _optional_text_column(df, '계좌번호'),
+        "amount": amount.astype(float).tolist(),
+        "balance": balance.astype(float).tolist(),
+        "memo": _optional_text_column(df, '메모'),
+        "year_month": year_month.tolist()
+    }
+
+    return [
+        {name: values[start:start + batch_size] for name, values in columns.items()}
+        for start in range(0, len(df), batch_size)
+    ]
+
+
+def import_file(
+    file_path: str,
+    account_type: str,
+    content_hash: str,
+    filename: str,
+    progress=None
+) -> schemas.UploadResponse:
+    """업로드된 Excel 파일 파싱 및 적재 (적재 작업 프로세스에서 실행)"""
+    db = SessionLocal()
+    try:
+        # 대기 중에 같은 파일을 다른 작업이 먼저 적재했으면 파싱하지 않음
+        imported_file = uploads.find_imported_file(db, content_hash, "transactions", account_type)
+        if imported_file:
+            return uploads.already_imported_response(imported_file)
+
+        # Excel 파싱
+        batches = parse_toss_excel(file_path)
+
+        # 적재 기록은 거래와 같은 트랜잭션으로 저장
+        return importer.import_transactions(
+            db,
+            batches,
+            account_type,
+            progress,
+            before_commit=lambda result: uploads.record_imported_file(
+                db, content_hash, "transactions", account_type, filename, result
+            )
+        )
+    finally:
+        db.close()
+
+
+@router.post("/upload", response_model=schemas.ImportJob)
 async def upload_excel(
     file: UploadFile = File(...),
     account_type: AccountType = AccountType.LIVING,
     db: Session = Depends(get_db)
 ):
-    """Excel 파일 업로드 및 파싱"""
+    """Excel 파일 업로드
+
+    파싱과 저장은 백그라운드 작업으로 실행되며, 작업 ID 를 바로 반환한다.
+    진행 상황과 결과는 GET /api/jobs/{job_id} 로 조회한다.
+    같은 계좌 유형으로 이미 적재된 파일(내용 기준)이면 파싱 없이 바로 완료 처리한다.
+    """
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="Excel 파일만 업로드 가능합니다.")
 
-    # 파일 저장
-    upload_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads")
-    os.makedirs(upload_dir, exist_ok=True)
-
-    file_path = os.path.join(upload_dir, file.filename)
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-
-    try:
-        # Excel 파싱
-        transactions_data = parse_toss_excel(file_path)
-
-        new_records = 0
-        duplicate_records = 0
-
-        for trans_data in transactions_data:
-            # 중복 체크 (같은 날짜, 금액, 거래처)
-            existing = db.query(models.Transaction).filter(
-                models.Transaction.transaction_date == trans_data["transaction_date"],
-                models.Transaction.amount == trans_data["amount"],
-                models.Transaction.description == trans_data["description"]
-            ).first()
-
-            if existing:
-                duplicate_records += 1
-                continue
-
-            # 카테고리 자동 분류
-            category = auto_categorize(
-                trans_data["description"],
-                trans_data.get("memo"),
-                db
-            )
-            trans_data["category"] = category
-            trans_data["account_type"] = account_type.value
-
-            # DB에 저장
-            db_transaction = models.Transaction(**trans_data)
-            db.add(db_transaction)
-            new_records += 1
-
-        db.commit()
-
-        return schemas.UploadResponse(
-            message="업로드 완료",
-            total_records=len(transactions_data),
-            new_records=new_records,
-            duplicate_records=duplicate_records
+    # 파일 저장 (내용 해시 기준 파일명)
+    file_path, content_hash = await uploads.spool_upload(file)
+
+    imported_file = await run_in_threadpool(
+        uploads.find_imported_file, db, content_hash, "transactions", account_type.value
+    )
+    if imported_file:
+        logger.info(f"Skipping already imported file: {file.filename} ({content_hash})")
+        return jobs.complete(
+            "transactions",
+            uploads.already_imported_response(imported_file),
+            filename=file.filename
         )
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"파일 처리 중 오류 발생: {str(e)}")
+    return jobs.submit(
+        "transactions",
+        import_file,
+        file_path,
+        account_type.value,
+        content_hash,
+        file.filename,
+        filename=file.filename,
+        content_key=(content_hash, account_type.value)
+    )
 
 
 @router.get("/", response_model=List[schemas.Transaction])
@@ -162,7 +164,9 @@ def get_transactions(
         query = query.filter(models.Transaction.year_month == year_month)
 
     if category:
-        query = query.filter(models.Transaction.category == category)
+        query = query.filter(models.category_filter(
+            db, models.Transaction, category, TransactionCategory.UNCATEGORIZED.value, skip + limit
+        ))
 
     if account_type:
         query = query.filter(models.Transaction.account_type == account_type.value)
@@ -173,6 +177,31 @@ def get_transactions(
     return query.offset(skip).limit(limit).all()
 
 
+@router.put("/bulk", response_model=schemas.BulkUpdateResponse)
+def bulk_update_transactions(
+    request: schemas.TransactionBulkUpdate,
+    db: Session = Depends(get_db)
+):
+    """거래내역 카테고리/메모 일괄 수정 (id 목록 또는 조회 필터, UPDATE 한 번 + 집계 갱신 한 번)"""
+    if request.category is None and request.memo is None:
+        raise HTTPException(status_code=400, detail="수정할 카테고리 또는 메모를 입력해주세요.")
+
+    if request.ids is not None and len(request.ids) > bulk_edit.MAX_BULK_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"한 번에 최대 {bulk_edit.MAX_BULK_IDS}건까지 수정할 수 있습니다."
+        )
+    conditions = bulk_edit.build_conditions(
+        models.Transaction, request.ids, request.filters, TransactionCategory.UNCATEGORIZED.value
+    )
+    if not conditions:
+        raise HTTPException(status_code=400, detail="수정할 거래를 id 목록 또는 필터로 지정해주세요.")
+
+    updated_count = bulk_edit.update_rows(
+        db, models.Transaction, conditions, request.category, request.memo, rollups.refresh
+    )
+    return schemas.BulkUpdateResponse(updated_count=updated_count)
+
+
 @router.get("/{transaction_id}", response_model=schemas.Transaction)
 def get_transaction(transaction_id: int, db: Session = Depends(get_db)):
     """특정 거래내역 조회"""
@@ -193,8 +222,12 @@ def update_transaction_category(
     if not transaction:
         raise HTTPException(status_code=404, detail="거래내역을 찾을 수 없습니다.")
 
-    transaction.category = category
+    transaction.stored_category = category
+    transaction.category_source = CategorySource.MANUAL.value
+    db.flush()
+    rollups.refresh(db, [transaction.year_month])
     db.commit()
+    analytics.invalidate(models.Transaction, [transaction_id])
     db.refresh(transaction)
     return transaction
 
@@ -206,8 +239,13 @@ def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
     if not transaction:
         raise HTTPException(status_code=404, detail="거래내역을 찾을 수 없습니다.")
 
+    uploads.forget_imported_files(db, "transactions", transaction.account_type)
+    importer.forget_watermark(db, "transactions", transaction.account_number or "", transaction.account_type)
     db.delete(transaction)
+    db.flush()
+    rollups.refresh(db, [transaction.year_month])
     db.commit()
+    analytics.invalidate(models.Transaction, [transaction_id])
     return {"message": "삭제 완료"}
 
 
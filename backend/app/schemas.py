@@ -1,7 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
-from .enums import AccountType
+from .enums import AccountType, CategorySource, JobStatus, LedgerSource, SeriesResolution
 
 
 class TransactionBase(BaseModel):
@@ -24,6 +24,7 @@ class TransactionCreate(TransactionBase):
 
 class Transaction(TransactionBase):
     id: int
+    category_source: Optional[CategorySource] = None
 
     class Config:
         from_attributes = True
@@ -51,11 +52,60 @@ class CardTransactionCreate(CardTransactionBase):
 class CardTransaction(CardTransactionBase):
     """카드 거래내역 전체 스키마"""
     id: int
+    category_source: Optional[CategorySource] = None
 
     class Config:
         from_attributes = True
 
 
+class TransactionBulkFilter(BaseModel):
+    """일괄 수정 대상 거래내역 필터 (GET /api/transactions/ 조회 조건과 동일)"""
+    year_month: Optional[str] = None
+    category: Optional[str] = None
+    account_type: Optional[AccountType] = None
+
+
+class TransactionBulkUpdate(BaseModel):
+    """거래내역 일괄 수정 요청 - ids 또는 filters 로 대상 지정 (함께 주면 둘 다 만족하는 거래)"""
+    ids: Optional[List[int]] = Field(None, min_length=1)  # 빈 목록은 거부 (422)
+    filters: Optional[TransactionBulkFilter] = None
+    category: Optional[str] = None  # 직접 지정 카테고리로 변경
+    memo: Optional[str] = None
+
+
+class CardTransactionBulkFilter(BaseModel):
+    """일괄 수정 대상 카드 거래 필터 (GET /api/card-transactions/ 조회 조건과 동일)"""
+    card_holder: Optional[str] = None
+    year_month: Optional[str] = None
+    category: Optional[str] = None
+
+
+class CardTransactionBulkUpdate(BaseModel):
+    """카드 거래 일괄 수정 요청 - ids 또는 filters 로 대상 지정 (함께 주면 둘 다 만족하는 거래)"""
+    ids: Optional[List[int]] = Field(None, min_length=1)  # 빈 목록은 거부 (422)
+    filters: Optional[CardTransactionBulkFilter] = None
+    category: Optional[str] = None  # 직접 지정 카테고리로 변경
+    memo: Optional[str] = None
+
+
+class BulkUpdateResponse(BaseModel):
+    """일괄 수정 결과"""
+    updated_count: int
+
+
+class SearchResult(BaseModel):
+    """적요/메모 검색 결과 스키마 (은행 거래 + 카드 거래)"""
+    source: LedgerSource
+    id: int  # 출처 테이블의 거래 id
+    year_month: str
+    transaction_date: str
+    description: str
+    memo: Optional[str] = None
+    amount: float
+    category: str
+    owner: Optional[str] = None  # 은행: 계좌번호, 카드: 카드 사용자
+
+
 class CategoryMappingBase(BaseModel):
     keyword: str
     category: str
@@ -75,6 +125,20 @@ class CategoryMapping(CategoryMappingBase):
 class CategoryMappingResponse(CategoryMapping):
     """카테고리 매핑 생성 응답 (업데이트된 거래 수 포함)"""
     updated_transactions_count: int = 0
+    updated_card_transactions_count: int = 0
+
+
+class CategoryMappingPreview(BaseModel):
+    """카테고리 매핑 미리보기 (생성 시 자동 분류될 기존 거래)"""
+    keyword: str
+    transactions_count: int = 0  # 분류될 거래내역 수
+    card_transactions_count: int = 0  # 분류될 카드 거래 수
+    samples: List[SearchResult] = []  # 분류될 거래 (최신순 일부)
+
+
+class CategoryMappingChangeResponse(CategoryMapping):
+    """카테고리 매핑 수정 응답 (기존 거래 재분류 작업 ID 포함)"""
+    recategorization_job_id: int
 
 
 class UploadResponse(BaseModel):
@@ -84,6 +148,50 @@ class UploadResponse(BaseModel):
     duplicate_records: int
 
 
+class BatchFileResult(UploadResponse):
+    """일괄 업로드의 파일별 결과"""
+    filename: str
+    kind: str  # transactions, card_transactions
+
+
+class BatchUploadResponse(UploadResponse):
+    """일괄 업로드 결과 (전체 합계 + 파일별 결과)"""
+    files: List[BatchFileResult]
+
+
+class ImportJob(BaseModel):
+    """업로드 적재 작업 상태"""
+    job_id: str
+    kind: str  # transactions, card_transactions
+    filename: Optional[str] = None
+    status: JobStatus
+    rows_parsed: int = 0  # 지금까지 파싱된 거래 수
+    rows_inserted: int = 0  # 지금까지 저장된 거래 수
+    result: Optional[UploadResponse] = None  # 완료 시 업로드 결과
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+class RecategorizationJob(BaseModel):
+    """기존 거래 재분류 작업 상태"""
+    id: int
+    status: JobStatus
+    reason: Optional[str] = None
+    current_table: str  # 처리 중인 테이블 (transactions, card_transactions)
+    total_rows: int  # 두 테이블의 재분류 대상 거래 수
+    processed_rows: int  # 검사한 거래 수
+    updated_rows: int  # 카테고리가 바뀐 거래 수
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 class MonthlyStatistics(BaseModel):
     year_month: str
     total_income: float
@@ -101,6 +209,35 @@ class CategoryStatistics(BaseModel):
     percentage: float
 
 
+class DashboardResponse(BaseModel):
+    """대시보드 한 번에 조회 스키마"""
+    year_month: str  # 조회 기준 월 (요청 월에 거래가 없으면 가장 최근 월)
+    previous_month: str
+    months: List[str]  # 조회 가능한 년월 (최신순)
+    current: MonthlyStatistics
+    previous: MonthlyStatistics
+    trend: List[MonthlyStatistics]  # 기준 월까지 최근 N개월 (오래된 순)
+    categories: List[CategoryStatistics]  # 기준 월 카테고리별 지출
+    total_assets: dict  # 계좌별 최신 잔액 합계
+    previous_total_assets: dict  # 이전 월 말 총자산
+    recent_transactions: List[Transaction]
+
+
+class BalanceSeriesAccount(BaseModel):
+    """계좌별 잔액 시계열 (dates 와 같은 순서, 첫 거래 이전은 None)"""
+    account_number: str
+    account_type: str
+    balances: List[Optional[float]]
+
+
+class BalanceSeries(BaseModel):
+    """잔액 시계열 스키마 - 각 시점은 해당 날짜 종료 시점의 잔액"""
+    resolution: SeriesResolution
+    dates: List[str]  # YYYY-MM-DD
+    totals: List[float]  # 계좌별 잔액 합계
+    accounts: List[BalanceSeriesAccount]
+
+
 
 class UserStatistics(BaseModel):
     """사용자별 통계 스키마"""
@@ -108,3 +245,67 @@ class UserStatistics(BaseModel):
     total_amount: float
     transaction_count: int
     percentage: float
+
+
+class CardCubeStatistics(BaseModel):
+    """카드 지출 집계 스키마 (요청한 기준 컬럼만 채워짐)"""
+    year_month: Optional[str] = None
+    card_holder: Optional[str] = None
+    payment_type: Optional[str] = None
+    category: Optional[str] = None
+    total_amount: float
+    transaction_count: int
+    percentage: float  # 조회 결과 전체 금액 대비 비율 (%)
+
+
+class LedgerEntry(BaseModel):
+    """통합 지출 내역 스키마 (은행 지출 + 카드 거래)"""
+    source: LedgerSource
+    id: int  # 출처 테이블의 거래 id
+    year_month: str
+    transaction_date: str
+    description: str
+    amount: float  # 음수: 지출 (카드 취소는 양수)
+    category: str
+    owner: Optional[str] = None  # 은행: 계좌번호, 카드: 카드 사용자
+
+
+class LedgerCategoryStatistics(BaseModel):
+    """통합 카테고리별 지출 스키마 (금액은 지출을 양수로)"""
+    category: str
+    total_amount: float
+    bank_amount: float
+    card_amount: float
+    transaction_count: int
+    percentage: float
+
+
+class LedgerMonthlyStatistics(BaseModel):
+    """통합 월별 지출 스키마 (금액은 지출을 양수로)"""
+    year_month: str
+    total_amount: float
+    bank_amount: float
+    card_amount: float
+    transaction_count: int
+
+
+class LedgerCategoryComparison(BaseModel):
+    """카테고리별 지출 비교 스키마 (금액은 지출을 양수로)"""
+    category: str
+    current: float  # 기준 월
+    previous: float  # 전월
+    previous_change: float  # 기준 월 - 전월
+    last_year: float  # 전년 동월
+    last_year_change: float  # 기준 월 - 전년 동월
+    last_year_change_rate: Optional[float] = None  # 전년 동월 대비 증감률 (%), 전년 동월 지출이 없으면 None
+    trailing_3_average: float  # 기준 월 직전 3개월 평균
+    trailing_12_average: float  # 기준 월 직전 12개월 평균
+
+
+class LedgerComparison(BaseModel):
+    """기준 월 지출 비교 스키마 (전월, 전년 동월, 직전 3/12개월 평균)"""
+    year_month: str
+    previous_month: str
+    last_year_month: str
+    total: LedgerCategoryComparison  # 전체 카테고리 합계 (category: "전체")
+    categories: List[LedgerCategoryComparison]
@@ -0,0 +1,186 @@
+"""적요 / 메모 전문 검색 (SQLite FTS5 trigram)
+
+적요는 거래마다 색인하지 않고 가맹점 사전(merchants.name)에 가맹점당 한 번 색인하여
+merchant_id 로 거래를 찾고, 메모는 transactions / card_transactions 의 external content
+FTS5 테이블(<테이블>_fts) 로 색인한다. trigram 토크나이저라 한국어 가맹점명의 부분 문자열도
+색인으로 찾고, 색인은 INSERT / DELETE / UPDATE 트리거로 원본 테이블과 같은 트랜잭션에서 갱신된다.
+업로드 적재(multi-row INSERT)는 행 단위 트리거 대신 적재 후 새 행을 한 번에 색인한다 (deferred_index).
+trigram 색인은 3글자 이상의 검색어만 찾을 수 있으므로 더 짧은 검색어는 LIKE 로 찾는다.
+"""
+from contextlib import contextmanager
+from sqlalchemy import DDL, and_, column, event, func, literal, literal_column, or_, select, table, text, union_all
+from sqlalchemy.orm import Session
+from typing import Callable, List, Optional, Tuple
+import logging
+
+from . import models
+from .enums import LedgerSource
+from .ledger import _category
+
+logger = logging.getLogger(__name__)
+
+# 색인으로 찾을 수 있는 최소 검색어 길이 (trigram)
+MIN_INDEXED_LENGTH = 3
+# 검색 대상 컬럼 (description 은 가맹점 사전으로 검색)
+SEARCH_COLUMNS = ("description", "memo")
+# 테이블별 색인 컬럼
+INDEXED_COLUMNS = {
+    models.Merchant: ("name",),
+    models.Transaction: ("memo",),
+    models.CardTransaction: ("memo",),
+}
+INDEXED_MODELS = tuple(INDEXED_COLUMNS)
+# 행 단위 INSERT 색인을 잠시 멈춘 테이블 (적재 트랜잭션 안에서만 행이 존재)
+PAUSE_TABLE = "search_index_pause"
+
+
+def fts_table_name(table_name: str) -> str:
+    return f"{table_name}_fts"
+
+
+def _ddl(table_name: str, indexed_columns: Tuple[str, ...]) -> List[str]:
+    """FTS5 테이블과 동기화 트리거 생성 문 (이미 있으면 건너뜀)"""
+    fts = fts_table_name(table_name)
+    columns = ", ".join(indexed_columns)
+    new_values = ", ".join(f"new.{name}" for name in indexed_columns)
+    old_values = ", ".join(f"old.{name}" for name in indexed_columns)
+    insert = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+    delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    paused = f"SELECT 1 FROM {PAUSE_TABLE} WHERE table_name = '{table_name}'"
+    return [
+        f"CREATE TABLE IF NOT EXISTS {PAUSE_TABLE} (table_name TEXT PRIMARY KEY)",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{columns}, content='{table_name}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} "
+        f"WHEN NOT EXISTS ({paused}) BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table_name} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+# 새 데이터베이스는 원본 테이블을 만들 때 색인도 함께 생성
+for _model, _columns in INDEXED_COLUMNS.items():
+    for _statement in _ddl(_model.__tablename__, _columns):
+        event.listen(_model.__table__, "after_create", DDL(_statement))
+
+
+def ensure_index(db: Session) -> None:
+    """색인이 없는 기존 데이터베이스는 색인을 만들고 원본 전체를 색인 (서버 시작 시)"""
+    existing = {name for (name,) in db.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+    for model, columns in INDEXED_COLUMNS.items():
+        fts = fts_table_name(model.__tablename__)
+        for statement in _ddl(model.__tablename__, columns):
+            db.execute(text(statement))
+        if fts not in existing:
+            db.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+            logger.info(f"Full-text index {fts} built")
+    db.commit()
+
+
+@contextmanager
+def deferred_index(db: Session, model):
+    """대량 INSERT 동안 행 단위 색인을 멈추고, 끝나면 새로 추가된 행을 INSERT ... SELECT 한 번으로 색인
+
+    FTS5 는 문장마다 대기 중인 색인을 디스크에 쓰므로 executemany 로 행마다 트리거가 실행되면
+    작은 세그먼트가 많이 생겨 적재가 몇 배 느려진다. 멈춤 표시는 같은 트랜잭션 안에서만 보인다.
+    """
+    source = model.__table__
+    fts = fts_table_name(source.name)
+    columns = ", ".join(INDEXED_COLUMNS[model])
+    last_id = db.execute(select(func.max(source.c.id))).scalar() or 0
+
+    db.execute(text(f"INSERT INTO {PAUSE_TABLE} (table_name) VALUES (:name)"), {"name": source.name})
+    try:
+        yield
+    finally:
+        db.execute(text(f"DELETE FROM {PAUSE_TABLE} WHERE table_name = :name"), {"name": source.name})
+    db.execute(
+        text(f"INSERT INTO {fts}(rowid, {columns}) SELECT id, {columns} FROM {source.name} WHERE id > :last_id"),
+        {"last_id": last_id}
+    )
+
+
+def _match_expression(keyword: str, columns: Tuple[str, ...]) -> str:
+    """columns 중 하나에 keyword 가 부분 문자열로 포함된 행을 찾는 MATCH 식"""
+    phrase = '"' + keyword.replace('"', '""') + '"'
+    return "{" + " ".join(columns) + "} : " + phrase
+
+
+def _fts_filter(model, keyword: str, columns: Tuple[str, ...]):
+    """model 의 색인 컬럼 columns 중 하나에 keyword 가 포함된 행 조건 (영문 대소문자 구분 없음)"""
+    source = model.__table__
+    if len(keyword) >= MIN_INDEXED_LENGTH:
+        fts = table(fts_table_name(source.name), column("rowid"))
+        matched = select(fts.c.rowid).where(
+            literal_column(fts.name).op("MATCH")(_match_expression(keyword, columns))
+        )
+        return source.c.id.in_(matched)
+
+    escaped = keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return or_(*(source.c[name].ilike(f"%{escaped}%", escape="\\") for name in columns))
+
+
+def matching_merchants(keyword: str):
+    """가맹점명에 keyword 가 포함된 가맹점 id SELECT"""
+    merchants = models.Merchant.__table__
+    return select(merchants.c.id).where(_fts_filter(models.Merchant, keyword, ("name",)))
+
+
+def keyword_filter(model, keyword: str, columns: Tuple[str, ...] = SEARCH_COLUMNS):
+    """columns 중 하나에 keyword 가 포함된 거래 조건 (영문 대소문자 구분 없음)
+
+    description 은 가맹점 사전에서 찾은 가맹점의 거래 (merchant_id 인덱스) 로 찾는다.
+    """
+    source = model.__table__
+    filters = []
+    if "description" in columns:
+        filters.append(source.c.merchant_id.in_(matching_merchants(keyword)))
+    row_columns = tuple(name for name in columns if name != "description")
+    if row_columns:
+        filters.append(_fts_filter(model, keyword, row_columns))
+    return or_(*filters)
+
+
+def search_query(
+    keyword: str,
+    from_month: Optional[str] = None,
+    to_month: Optional[str] = None,
+    source: Optional[LedgerSource] = None,
+    columns: Tuple[str, ...] = SEARCH_COLUMNS,
+    condition: Optional[Callable] = None
+):
+    """적요/메모에 keyword 가 포함된 은행 거래와 카드 거래의 SELECT (source, id, year_month,
+    transaction_date, description, memo, amount, category, owner) - 수입 거래 포함
+
+    condition 이 주어지면 테이블별 추가 조건 condition(model) 을 함께 건다.
+    """
+    selects = []
+    for entry_source, model, owner in (
+        (LedgerSource.BANK, models.Transaction, "account_number"),
+        (LedgerSource.CARD, models.CardTransaction, "card_holder"),
+    ):
+        if source is not None and source != entry_source:
+            continue
+        t = model.__table__
+        filters = [keyword_filter(model, keyword, columns)]
+        if condition is not None:
+            filters.append(condition(model))
+        if from_month:
+            filters.append(t.c.year_month >= from_month)
+        if to_month:
+            filters.append(t.c.year_month <= to_month)
+        selects.append(
+            select(
+                literal(entry_source.value).label("source"),
+                t.c.id,
+                t.c.year_month,
+                t.c.transaction_date,
+                t.c.description,
+                t.c.memo,
+                t.c.amount,
+                _category(model.category).label("category"),
+                t.c[owner].label("owner"),
+            ).where(and_(*filters))
+        )
+    return union_all(*selects)
@@ -0,0 +1,112 @@
+"""업로드 파일 저장 및 중복 파일 확인
+
+업로드 파일은 chunk 단위로 디스크에 기록하면서 SHA-256 해시를 계산하고,
+해시 기반 파일명(content-addressed)으로 저장한다.
+"""
+from fastapi import UploadFile
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional, Tuple
+import hashlib
+import os
+import tempfile
+
+from . import models, schemas
+
+UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uploads")
+# 한 번에 읽어 저장할 크기 (1MB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def spool_upload(file: UploadFile) -> Tuple[str, str]:
+    """업로드 파일을 chunk 단위로 저장하고 (저장 경로, 내용 해시) 반환"""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                f.write(chunk)
+
+        content_hash = digest.hexdigest()
+        extension = os.path.splitext(file.filename)[1].lower()
+        file_path = os.path.join(UPLOAD_DIR, f"{content_hash}{extension}")
+
+        # 같은 내용의 파일이 이미 있으면 그대로 사용
+        if os.path.exists(file_path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return file_path, content_hash
+
+
+def find_imported_file(
+    db: Session,
+    content_hash: str,
+    import_kind: str,
+    scope: str
+) -> Optional[models.ImportedFile]:
+    """같은 대상(계좌 유형/카드 소유자)으로 이미 적재된 동일 파일 조회"""
+    return db.query(models.ImportedFile).filter(
+        models.ImportedFile.content_hash == content_hash,
+        models.ImportedFile.import_kind == import_kind,
+        models.ImportedFile.scope == scope
+    ).first()
+
+
+def record_imported_file(
+    db: Session,
+    content_hash: str,
+    import_kind: str,
+    scope: str,
+    filename: Optional[str],
+    result: schemas.UploadResponse
+) -> None:
+    """적재 완료된 파일 기록 (commit 은 호출한 쪽에서 - 적재한 거래와 같은 트랜잭션)
+
+    같은 파일을 동시에 적재한 다른 작업이 먼저 기록했으면 건너뛴다.
+    """
+    db.execute(
+        insert(models.ImportedFile.__table__).on_conflict_do_nothing(
+            index_elements=["content_hash", "import_kind", "scope"]
+        ),
+        {
+            "content_hash": content_hash,
+            "import_kind": import_kind,
+            "scope": scope,
+            "filename": filename,
+            "total_records": result.total_records,
+            "new_records": result.new_records,
+            "duplicate_records": result.duplicate_records,
+            "imported_at": datetime.now().isoformat()
+        }
+    )
+
+
+def forget_imported_files(db: Session, import_kind: str, scope: str) -> None:
+    """거래 삭제 시 해당 대상의 적재 기록 삭제 (같은 파일을 다시 올리면 삭제된 거래가 복원되도록)"""
+    db.query(models.ImportedFile).filter(
+        models.ImportedFile.import_kind == import_kind,
+        models.ImportedFile.scope == scope
+    ).delete(synchronize_session=False)
+
+
+def already_imported_response(imported_file: models.ImportedFile) -> schemas.UploadResponse:
+    """이미 적재된 파일에 대한 업로드 결과 (파싱/중복 체크 없이 전체를 중복으로 처리)"""
+    return schemas.UploadResponse(
+        message="이미 업로드된 파일입니다.",
+        total_records=imported_file.total_records,
+        new_records=0,
+        duplicate_records=imported_file.total_records
+    )
@@ -0,0 +1,190 @@
+"""
+통계 조회 벤치마크 - SQL (집계 테이블) vs NumPy 분석 엔진
+
+임시 데이터베이스에 거래내역 / 카드 거래내역을 적재한 뒤, 통계 엔드포인트가 사용하는 조회를
+현재 SQL 경로와 분석 엔진(ANALYTICS_ENGINE=numpy)으로 각각 반복 실행하여 평균 시간을 비교하고
+두 결과가 같은지 확인합니다. 엔진의 최초 적재 시간과 증분 적재(새 행만 읽기) 시간도 출력합니다.
+
+사용법:
+    python benchmark_analytics.py            # 거래내역 200,000건, 카드 거래 100,000건
+    python benchmark_analytics.py 500000     # 거래내역 건수 지정 (카드 거래는 절반)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy.orm import sessionmaker
+from app import analytics, cache, categorizer, importer, models, rollups
+from app.merchants import MerchantDictionary
+from app.database import SQLITE_PROFILES, Base, create_write_engine
+from app.enums import CardCubeDimension
+from app.routers import card_transactions, statistics
+from benchmark_import import make_rows, to_batch
+
+REPEAT = 20
+INCREMENT_ROWS = 1000
+ACCOUNTS = ["1000-1234-5678", "1000-2222-3333", "3333-01-4444555"]
+CATEGORIES = ["식비", "교통비", "주거생활비", "문화생활비", None]
+CARD_HOLDERS = ["홍길동", "김철수", "이영희"]
+
+
+def make_transactions(count: int, offset: int = 0):
+    rows = make_rows(offset + count)[offset:]
+    for i, row in enumerate(rows, start=offset):
+        row["account_number"] = ACCOUNTS[i % len(ACCOUNTS)]
+    return rows
+
+
+def make_card_batches(count: int, seed: int = 7, batch_size: int = 10000):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        month = 1 + (i * 12 // count)
+        day = 1 + i % 28
+        rows.append({
+            "card_holder": rng.choice(CARD_HOLDERS),
+            "payment_type": rng.choice(["일시불", "일시불", "할부"]),
+            "transaction_date": f"2025.{month:02d}.{day:02d}",
+            "description": f"가맹점{i % 500}",
+            "amount": -float(rng.randint(1, 500) * 100),
+            "year_month": f"2025-{month:02d}",
+            "raw_date": f"2025{month:02d}{day:02d}",
+        })
+    return [rows[start:start + batch_size] for start in range(0, count, batch_size)]
+
+
+def add_mappings(db, descriptions):
+    """적요마다 카테고리 매핑 등록 (적요 해시로 카테고리 선택, None 이면 미분류로 둠)"""
+    # 긴 적요부터 등록 - "가맹점1" 이 "가맹점10" 에도 포함되므로 먼저 등록된 키워드가 우선하도록
+    for description in sorted(set(descriptions), key=lambda d: (-len(d), d)):
+        category = CATEGORIES[zlib.crc32(description.encode()) % len(CATEGORIES)]
+        if category is not None:
+            db.add(models.CategoryMapping(keyword=description, category=category))
+    db.commit()
+    categorizer.invalidate_matcher()
+
+
+def import_data(Session, transaction_rows, card_batches):
+    db = Session()
+    try:
+        add_mappings(
+            db,
+            [row["description"] for row in transaction_rows]
+            + [row["description"] for batch in card_batches for row in batch]
+        )
+        importer.import_transactions(db, [to_batch(transaction_rows)], "생활비 계좌")
+        for holder in CARD_HOLDERS:
+            importer.import_card_transactions(
+                db,
+                ([row for row in batch if row["card_holder"] == holder] for batch in card_batches),
+                holder
+            )
+    finally:
+        db.close()
+
+
+def workloads():
+    """(이름, 함수(db)) - 통계 엔드포인트와 같은 조회"""
+    cube = CardCubeDimension
+    return [
+        ("월별 통계 12개월", lambda db: statistics._monthly_statistics(db, "2025-01", "2025-12")),
+        ("월별 통계 1개월", lambda db: statistics._monthly_statistics(db, "2025-06", "2025-06")),
+        ("카테고리별 통계", lambda db: statistics.get_category_statistics("2025-06", db=db)),
+        ("조회 가능한 월", lambda db: statistics.get_available_months(db=db)),
+        ("카드 사용자별", lambda db: card_transactions._cube_statistics(db, [cube.CARD_HOLDER])),
+        ("카드 월 x 사용자", lambda db: card_transactions._cube_statistics(
+            db, [cube.YEAR_MONTH, cube.CARD_HOLDER])),
+        ("카드 카테고리 x 사용자 (월)", lambda db: card_transactions._cube_statistics(
+            db, [cube.CATEGORY, cube.CARD_HOLDER], year_month="2025-06")),
+    ]
+
+
+def normalize(value):
+    """비교용 - 모델은 dict 로, 실수는 반올림"""
+    if hasattr(value, "dict"):
+        value = value.dict()
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, float):
+        return round(value, 4)
+    return value
+
+
+def timed(function, db):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        result = function(db)
+    return (time.perf_counter() - start) / REPEAT * 1000, result
+
+
+def main(transaction_count: int) -> int:
+    if analytics.np is None:
+        print("❌ NumPy 가 설치되어 있지 않습니다.")
+        return 1
+
+    card_count = transaction_count // 2
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_write_engine(os.path.join(tmp_dir, "benchmark.db"), SQLITE_PROFILES["performance"])
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        print(f"적재: 거래내역 {transaction_count:,}건, 카드 거래 {card_count:,}건")
+        import_data(Session, make_transactions(transaction_count), make_card_batches(card_count))
+
+        db = Session()
+        analytics.ANALYTICS_ENGINE = "numpy"
+        start = time.perf_counter()
+        analytics.get_engine(db)
+        print(f"엔진 최초 적재: {(time.perf_counter() - start) * 1000:,.0f} ms")
+        db.close()
+
+        # 새 거래 추가 (업로드 완료와 같이 데이터 세대 증가)
+        db = Session()
+        new_rows = make_transactions(INCREMENT_ROWS, offset=transaction_count)
+        merchant_ids = MerchantDictionary(db)
+        merchant_ids.resolve(row["description"] for row in new_rows)
+        for row in new_rows:
+            row.update(merchant_id=merchant_ids[row["description"]], account_type="생활비 계좌")
+        importer.bulk_insert(db, models.Transaction, new_rows)
+        rollups.refresh(db, {row["year_month"] for row in new_rows})
+        db.commit()
+        cache.bump_generation()
+        start = time.perf_counter()
+        analytics.get_engine(db)
+        print(f"엔진 증분 적재 ({INCREMENT_ROWS:,}건 추가): {(time.perf_counter() - start) * 1000:,.1f} ms")
+
+        print("-" * 60)
+        print(f"{'조회':<28}{'SQL (ms)':>10}{'엔진 (ms)':>11}{'배율':>8}  결과")
+        mismatches = 0
+        for name, function in workloads():
+            analytics.ANALYTICS_ENGINE = "sql"
+            sql_ms, sql_result = timed(function, db)
+            analytics.ANALYTICS_ENGINE = "numpy"
+            engine_ms, engine_result = timed(function, db)
+            same = normalize(sql_result) == normalize(engine_result)
+            mismatches += not same
+            print(f"{name:<28}{sql_ms:>10.2f}{engine_ms:>11.2f}{sql_ms / engine_ms:>7.1f}x  {'일치' if same else '불일치'}")
+        db.close()
+
+    print("-" * 60)
+    if mismatches:
+        print(f"❌ 결과 불일치 {mismatches}건")
+        return 1
+    print("✅ 모든 조회 결과가 일치합니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    sys.exit(main(count))
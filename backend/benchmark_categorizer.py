@@ -0,0 +1,91 @@
+"""
+카테고리 자동 분류 마이크로 벤치마크
+
+매핑 5,000개 기준으로 기존 방식(매핑 목록을 순서대로 `keyword in description` 검사)과
+Aho-Corasick 분류기(app.categorizer)의 초당 분류 건수를 비교합니다.
+기존 방식에서 거래마다 수행하던 매핑 테이블 전체 조회 비용은 포함하지 않습니다.
+
+사용법:
+    python benchmark_categorizer.py                # 매핑 5,000개, 거래 20,000건
+    python benchmark_categorizer.py 10000 50000    # 매핑 수, 거래 수 지정
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from app.categorizer import CategoryMatcher
+from app.enums import TransactionCategory
+
+CATEGORIES = [c.value for c in TransactionCategory if c != TransactionCategory.UNCATEGORIZED]
+
+
+def random_word(rng, length):
+    """임의의 한글 단어"""
+    return "".join(chr(rng.randint(0xAC00, 0xD7A3)) for _ in range(length))
+
+
+def make_data(mapping_count: int, row_count: int, seed: int = 7):
+    rng = random.Random(seed)
+    keywords = list(dict.fromkeys(random_word(rng, rng.randint(2, 6)) for _ in range(mapping_count)))
+    mappings = [(keyword, rng.choice(CATEGORIES)) for keyword in keywords]
+
+    rows = []
+    for _ in range(row_count):
+        description = random_word(rng, rng.randint(4, 12))
+        if rng.random() < 0.5:
+            # 절반은 등록된 키워드를 포함
+            description += " " + rng.choice(keywords)
+        memo = rng.choice([None, None, None, "친구랑 " + rng.choice(CATEGORIES)])
+        rows.append((description, memo))
+    return mappings, rows
+
+
+def legacy_categorize(description, memo, mappings):
+    """기존 분류 방식 (매핑 조회 비용 제외)"""
+    if memo:
+        for category in CATEGORIES:
+            if category in memo:
+                return category
+    for keyword, category in mappings:
+        if keyword in description:
+            return category
+    return None
+
+
+def run(mapping_count: int, row_count: int):
+    mappings, rows = make_data(mapping_count, row_count)
+
+    start = time.perf_counter()
+    legacy_results = [legacy_categorize(d, m, mappings) for d, m in rows]
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = CategoryMatcher(mappings)
+    build_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [matcher.categorize(d, m) for d, m in rows]
+    match_elapsed = time.perf_counter() - start
+
+    assert results == legacy_results, "분류 결과가 기존 방식과 다릅니다."
+
+    print(f"[매핑 {len(mappings):,}개, 거래 {row_count:,}건]")
+    print(f"  기존 방식    : {row_count / legacy_elapsed:>12,.0f} rows/s")
+    print(f"  Aho-Corasick : {row_count / match_elapsed:>12,.0f} rows/s (생성 {build_elapsed * 1000:.1f}ms)")
+    print(f"  개선 배율    : {legacy_elapsed / match_elapsed:>12,.1f}x")
+
+
+if __name__ == "__main__":
+    mapping_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    row_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    print("=" * 60)
+    print("카테고리 자동 분류 벤치마크")
+    print("=" * 60)
+    run(mapping_count, row_count)
+    print("=" * 60)
@@ -0,0 +1,121 @@
+"""
+업로드 적재 중 조회 지연 벤치마크
+
+임시 데이터베이스에 거래내역을 적재하는 동안 다른 스레드에서 월별 조회를 반복 실행하여
+조회 지연(p50/p95/최대)과 실패(database is locked) 건수를 비교합니다.
+
+- 기존 방식: 엔진 하나, PRAGMA 없음 (rollback journal, synchronous=FULL)
+- 분리 방식: app.database 의 performance 프로필 (WAL) + 쓰기/읽기 전용 엔진 분리
+
+사용법:
+    python benchmark_concurrency.py            # 적재 100,000건
+    python benchmark_concurrency.py 300000     # 적재 건수 지정
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app import importer, models
+from app.database import SQLITE_PROFILES, Base, create_read_engine, create_write_engine
+from benchmark_import import make_rows, to_batch
+
+SEED_ROWS = 20000
+READ_MONTH = "2025-01"
+
+
+def legacy_engines(database_path: str):
+    engine = create_engine(f"sqlite:///{database_path}", connect_args={"check_same_thread": False})
+    return engine, engine
+
+
+def split_engines(database_path: str):
+    pragmas = SQLITE_PROFILES["performance"]
+    return create_write_engine(database_path, pragmas), create_read_engine(database_path, pragmas)
+
+
+def percentile(values, ratio):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def run(label: str, make_engines, import_count: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_path = os.path.join(tmp_dir, "benchmark.db")
+        write_engine, read_engine = make_engines(database_path)
+        Base.metadata.create_all(bind=write_engine)
+        WriteSession = sessionmaker(bind=write_engine)
+        ReadSession = sessionmaker(bind=read_engine)
+
+        rows = make_rows(SEED_ROWS + import_count)
+        db = WriteSession()
+        importer.import_transactions(db, [to_batch(rows[:SEED_ROWS])], "생활비")
+        db.close()
+
+        latencies = []
+        errors = 0
+        importing = threading.Event()
+        importing.set()
+
+        def reader():
+            nonlocal errors
+            while importing.is_set():
+                session = ReadSession()
+                start = time.perf_counter()
+                try:
+                    # 카테고리별 통계와 같은 집계 쿼리
+                    session.query(
+                        models.Transaction.category,
+                        func.sum(models.Transaction.amount),
+                        func.count(models.Transaction.id)
+                    ).filter(
+                        models.Transaction.year_month == READ_MONTH
+                    ).group_by(models.Transaction.category).all()
+                    latencies.append(time.perf_counter() - start)
+                except OperationalError:
+                    errors += 1
+                finally:
+                    session.close()
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+
+        start = time.perf_counter()
+        db = WriteSession()
+        importer.import_transactions(db, [to_batch(rows[SEED_ROWS:])], "생활비")
+        db.close()
+        import_elapsed = time.perf_counter() - start
+
+        importing.clear()
+        thread.join()
+        write_engine.dispose()
+        read_engine.dispose()
+
+    print(f"[{label}]")
+    print(f"  적재 {import_count:,}건 : {import_elapsed:.2f}s")
+    if latencies:
+        print(
+            f"  조회 {len(latencies):,}회 : p50 {percentile(latencies, 0.5) * 1000:.1f}ms, "
+            f"p95 {percentile(latencies, 0.95) * 1000:.1f}ms, 최대 {max(latencies) * 1000:.1f}ms"
+        )
+    print(f"  조회 실패  : {errors}회")
+
+
+if __name__ == "__main__":
+    import_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print("=" * 60)
+    print("업로드 적재 중 조회 지연 벤치마크")
+    print("=" * 60)
+    run("기존 방식 (단일 엔진, PRAGMA 없음)", legacy_engines, import_count)
+    run("분리 방식 (WAL, 쓰기/읽기 엔진 분리)", split_engines, import_count)
+    print("=" * 60)
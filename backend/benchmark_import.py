@@ -0,0 +1,134 @@
+"""
+거래내역 업로드 적재 성능 벤치마크
+
+기존 방식(거래마다 SELECT ... first() 후 db.add)과 일괄 적재 방식
+(app.importer)의 초당 처리 건수를 비교합니다.
+재업로드 상황을 가정하여 앞쪽 절반 기간은 이미 저장된 거래, 뒤쪽 절반은 신규 거래로 구성합니다.
+(같은 계좌의 내보내기 파일은 기간이 끊기지 않으므로 이미 적재된 기간 안에 빠진 거래는 없다고 가정 -
+ importer.Watermarks 참고)
+
+사용법:
+    python benchmark_import.py               # 10,000건, 100,000건
+    python benchmark_import.py 5000 20000    # 원하는 건수 지정
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app import importer, models
+from app.database import Base
+
+# 기존 방식은 거래 수 x 저장된 거래 수 만큼 비교하므로 앞부분만 측정하여 초당 건수를 구함
+LEGACY_SAMPLE_LIMIT = 5000
+
+MERCHANTS = ["GS25 역삼점", "스타벅스 강남", "쿠팡", "카카오T 택시", "넷플릭스", "이마트", "올리브영", "CU 편의점"]
+
+
+def make_rows(count: int, seed: int = 42):
+    """벤치마크용 토스뱅크 거래 생성"""
+    rng = random.Random(seed)
+    rows = []
+    balance = 10_000_000
+    for i in range(count):
+        month = 1 + (i * 12 // count)
+        amount = float(rng.choice([-1, -1, -1, 1]) * rng.randint(1, 500) * 100)
+        balance += amount
+        rows.append({
+            "transaction_date": f"2025.{month:02d}.{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:{i % 59:02d}",
+            "description": rng.choice(MERCHANTS),
+            "transaction_type": "체크카드결제",
+            "institution": None,
+            "account_number": "1000-1234-5678",
+            "amount": amount,
+            "balance": balance,
+            "memo": None,
+            "year_month": f"2025-{month:02d}"
+        })
+    return rows
+
+
+def to_batch(rows):
+    """행 목록을 컬럼 배치로 변환"""
+    return {name: [row[name] for row in rows] for name in rows[0]}
+
+
+def legacy_import(db, transactions_data):
+    """기존 업로드 방식 (거래마다 중복 조회 후 ORM 객체 추가)"""
+    for trans_data in transactions_data:
+        existing = db.query(models.Transaction).filter(
+            models.Transaction.transaction_date == trans_data["transaction_date"],
+            models.Transaction.amount == trans_data["amount"],
+            models.Transaction.description == trans_data["description"]
+        ).first()
+        if existing:
+            continue
+        db.add(models.Transaction(**trans_data, account_type="생활비 계좌"))
+    db.commit()
+
+
+def run(count: int):
+    rows = make_rows(count)
+    half = count // 2
+    existing_rows = rows[:half]  # 앞쪽 절반 기간은 이미 저장된 거래
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        db = Session()
+        importer.import_transactions(db, [to_batch(existing_rows)], "생활비 계좌")
+        db.close()
+
+        # 기존 방식 - 저장된 거래와 신규 거래가 절반씩 되도록 경계 주변을 측정
+        sample_size = min(count, LEGACY_SAMPLE_LIMIT)
+        sample_start = half - sample_size // 2
+        sample = [dict(r) for r in rows[sample_start:sample_start + sample_size]]
+        db = Session()
+        start = time.perf_counter()
+        legacy_import(db, sample)
+        legacy_elapsed = time.perf_counter() - start
+        db.rollback()
+        db.close()
+
+        # 기존 방식으로 추가된 거래 제거
+        with engine.begin() as conn:
+            conn.execute(models.Transaction.__table__.delete().where(
+                models.Transaction.id > len(existing_rows)
+            ))
+
+        # 일괄 적재 방식
+        db = Session()
+        start = time.perf_counter()
+        result = importer.import_transactions(db, [to_batch(rows)], "생활비 계좌")
+        bulk_elapsed = time.perf_counter() - start
+        db.close()
+        engine.dispose()
+
+    legacy_rate = len(sample) / legacy_elapsed
+    bulk_rate = count / bulk_elapsed
+    sampled = f" ({len(sample):,}건 측정)" if len(sample) < count else ""
+    print(f"[{count:,}건] 신규 {result.new_records:,} / 중복 {result.duplicate_records:,}")
+    print(f"  기존 방식    : {legacy_rate:>12,.0f} rows/s{sampled}")
+    print(f"  일괄 적재    : {bulk_rate:>12,.0f} rows/s ({bulk_elapsed:.2f}s)")
+    print(f"  개선 배율    : {bulk_rate / legacy_rate:>12,.1f}x")
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    print("=" * 60)
+    print("업로드 적재 벤치마크")
+    print("=" * 60)
+    for count in counts:
+        run(count)
+    print("=" * 60)
@@ -0,0 +1,107 @@
+"""
+업로드 적재 구간(import_watermarks) 점검
+
+빈 메모리 데이터베이스(models.py 스키마)에 토스뱅크 내보내기 파일을 적재하면서,
+적재 구간 때문에 새 거래가 중복으로 처리되는 경우가 있으면 실패(exit 1)합니다.
+
+- 같은 파일을 다시 올리면 모두 중복
+- 계좌번호가 없는 다른 계좌 유형의 파일은 기간이 겹쳐도 모두 신규
+- 거래를 지운 뒤에는 같은 파일의 빠진 거래만 신규
+
+사용법:
+    python check_import_watermarks.py
+"""
+
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import importer, models
+from app.database import Base
+from app.enums import AccountType
+
+
+def make_rows(description: str, months, per_month: int = 12):
+    """계좌번호 없는 토스뱅크 거래 (월마다 per_month 건)"""
+    rows = []
+    balance = 1_000_000.0
+    for month in months:
+        for day in range(1, per_month + 1):
+            amount = -1000.0 * day
+            balance += amount
+            rows.append({
+                "transaction_date": f"2025.{month:02d}.{day:02d} 12:00:00",
+                "description": description,
+                "transaction_type": "체크카드결제",
+                "institution": None,
+                "account_number": None,
+                "amount": amount,
+                "balance": balance,
+                "memo": None,
+                "year_month": f"2025-{month:02d}"
+            })
+    return rows
+
+
+def to_batch(rows):
+    """행 목록을 컬럼 배치로 변환"""
+    return {name: [row[name] for row in rows] for name in rows[0]}
+
+
+def main() -> int:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    living = make_rows("생활비 지출", range(1, 7))
+    reserve = make_rows("저수지 지출", range(3, 7))
+
+    def upload(rows, account_type):
+        result = importer.import_transactions(db, [to_batch([dict(row) for row in rows])], account_type)
+        return result.new_records, result.duplicate_records
+
+    checks = [
+        ("생활비 계좌 첫 업로드", lambda: upload(living, AccountType.LIVING.value), (len(living), 0)),
+        ("생활비 계좌 재업로드", lambda: upload(living, AccountType.LIVING.value), (0, len(living))),
+        ("저수지 계좌 기간이 겹치는 첫 업로드", lambda: upload(reserve, AccountType.RESERVOIR.value), (len(reserve), 0)),
+        ("저수지 계좌 재업로드", lambda: upload(reserve, AccountType.RESERVOIR.value), (0, len(reserve))),
+    ]
+
+    failures = 0
+    for name, run, expected in checks:
+        actual = run()
+        status = "ok" if actual == expected else "FAIL"
+        failures += actual != expected
+        print(f"[{status:>4}] {name}: 신규 {actual[0]} / 중복 {actual[1]} (기대: 신규 {expected[0]} / 중복 {expected[1]})")
+
+    # 거래 삭제 후에는 적재 구간 없이 전체 중복 체크 (transactions.delete_transaction 과 같은 순서)
+    deleted = db.query(models.Transaction).filter(
+        models.Transaction.account_type == AccountType.LIVING.value
+    ).order_by(models.Transaction.transaction_date).first()
+    importer.forget_watermark(db, "transactions", deleted.account_number or "", deleted.account_type)
+    db.delete(deleted)
+    db.commit()
+    actual = upload(living, AccountType.LIVING.value)
+    expected = (1, len(living) - 1)
+    status = "ok" if actual == expected else "FAIL"
+    failures += actual != expected
+    print(f"[{status:>4}] 거래 삭제 후 생활비 계좌 재업로드: 신규 {actual[0]} / 중복 {actual[1]} "
+          f"(기대: 신규 {expected[0]} / 중복 {expected[1]})")
+
+    db.close()
+    print("-" * 60)
+    if failures:
+        print(f"❌ 적재 구간 점검 실패 {failures}개")
+        return 1
+    print("✅ 적재 구간 점검 통과")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+거래내역 조회 쿼리 실행 계획 점검
+
+transactions.py / card_transactions.py 엔드포인트, 업로드 중복 체크, 통계 집계/잔액 스냅샷 갱신, 통합 지출 집계, 적요 검색,
+가맹점별 재분류가 사용하는 쿼리를 빈 메모리 데이터베이스(models.py 스키마)에서 EXPLAIN QUERY PLAN 으로 확인하여,
+transactions / card_transactions 테이블을 SEARCH 가 아닌 SCAN 으로 읽는 쿼리가 있으면 실패(exit 1)합니다.
+인덱스 순서대로 전체를 읽는 SCAN ... USING [COVERING] INDEX 도 실패로 보며, ALLOWED_SCANS 의 쿼리별 예외만 허용합니다.
+
+사용법:
+    python check_query_plans.py
+"""
+
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+
+from app import ledger, models, recategorize, rollups, search
+from app.database import Base
+from app.enums import AccountType, TransactionCategory
+from app.importer import TRANSACTION_DEDUP_COLUMNS
+
+YEAR_MONTH = "2025-03"
+
+
+def endpoint_queries(db):
+    """(이름, 쿼리) 목록 - 각 엔드포인트와 같은 조건으로 구성"""
+    t = models.Transaction
+    c = models.CardTransaction
+    account_type = AccountType.LIVING.value
+    latest = lambda query: query.order_by(t.transaction_date.desc()).limit(100)
+    latest_card = lambda query: query.order_by(c.transaction_date.desc()).limit(100)
+
+    return [
+        # GET /api/transactions/
+        ("transactions: 전체 최신순", latest(db.query(t))),
+        ("transactions: 월 필터", latest(db.query(t).filter(t.year_month == YEAR_MONTH))),
+        ("transactions: 카테고리 필터", latest(db.query(t).filter(category_condition(t)))),
+        ("transactions: 미분류 필터", latest(db.query(t).filter(
+            models.category_condition(t, TransactionCategory.UNCATEGORIZED.value, TransactionCategory.UNCATEGORIZED.value)
+        ))),
+        ("transactions: 계좌 유형 필터", latest(db.query(t).filter(t.account_type == account_type))),
+        ("transactions: 월 + 계좌 유형 필터", latest(db.query(t).filter(
+            t.year_month == YEAR_MONTH, t.account_type == account_type
+        ))),
+        ("transactions: 년-월 목록", db.query(t.year_month).filter(t.year_month.isnot(None))
+            .distinct().order_by(t.year_month.desc())),
+        # GET /api/card-transactions/
+        ("card_transactions: 월 필터", latest_card(db.query(c).filter(c.year_month == YEAR_MONTH))),
+        ("card_transactions: 카테고리 필터", latest_card(db.query(c).filter(category_condition(c)))),
+        ("card_transactions: 카드 사용자 필터", latest_card(db.query(c).filter(c.card_holder == "홍길동"))),
+        # 업로드 중복 체크 (importer.load_existing_keys)
+        ("import: 중복 체크 키 조회", db.query(*(getattr(t, c) for c in TRANSACTION_DEDUP_COLUMNS))
+            .filter(t.year_month.in_([YEAR_MONTH, "2025-04"]))),
+        # 월별 통계 집계 갱신 (rollups.refresh)
+        ("rollups: 년월 집계 재계산", rollups.aggregate_query([YEAR_MONTH])),
+        ("rollups: 계좌별 월말 잔액 재계산", rollups.balance_query([YEAR_MONTH])),
+        # 통합 지출 내역 (은행 지출 + 카드 거래)
+        ("ledger: 월 범위 카테고리별 합계", ledger_category_totals(db)),
+        ("ledger: 카테고리 필터", ledger_category_entries(db)),
+        # 적요/메모 검색, 매핑 적용 대상 조회 (전문 검색 색인)
+        ("search: 적요/메모 검색", search.search_query("스타벅스", "2025-01", YEAR_MONTH)),
+        ("search: 카테고리 필터", search.search_query("스타벅스", condition=category_condition)),
+        ("categories: 매핑 적용 대상 조회", db.query(t.year_month, func.count()).filter(
+            t.merchant_id.in_(search.matching_merchants("스타벅스")), recategorize.follows_merchant(t.__table__)
+        ).group_by(t.year_month)),
+        # 가맹점 배치 재분류 (recategorize._process_batch)
+        ("recategorize: 가맹점 배치 거래 수", db.query(func.count()).select_from(t).filter(
+            t.merchant_id.between(1, 1000), recategorize.follows_merchant(t.__table__)
+        )),
+    ]
+
+
+def category_condition(model):
+    return models.category_condition(model, "식비", TransactionCategory.UNCATEGORIZED.value)
+
+
+def ledger_category_entries(db):
+    entries = ledger.ledger_query(condition=category_condition).subquery()
+    return db.query(entries).order_by(
+        entries.c.transaction_date.desc(), entries.c.source, entries.c.id.desc()
+    ).limit(100)
+
+
+def ledger_category_totals(db):
+    entries = ledger.ledger_query("2025-01", YEAR_MONTH).subquery()
+    return db.query(entries.c.category, func.sum(entries.c.amount)).group_by(entries.c.category)
+
+
+# SCAN 하면 안 되는 테이블 (조건이 있는 쿼리는 SEARCH 로 읽어야 함)
+CHECKED_TABLES = ("transactions", "card_transactions")
+
+# 쿼리별로 허용하는 SCAN 단계
+ALLOWED_SCANS = {
+    # 필터 없는 최신순 목록 - 거래 일시 인덱스를 순서대로 읽다가 LIMIT 건에서 멈춤
+    "transactions: 전체 최신순": "SCAN transactions USING INDEX ix_transactions_transaction_date",
+    # 년-월 목록 - 커버링 인덱스만 읽어 DISTINCT
+    "transactions: 년-월 목록": "SCAN transactions USING COVERING INDEX ix_transactions_year_month_date",
+}
+
+
+def full_scans(name, plan_details):
+    """거래내역 / 카드 거래내역을 SEARCH 하지 않고 SCAN 하는 단계 (인덱스 순서 스캔 포함, name 쿼리의 허용 단계 제외)"""
+    return [
+        detail for detail in plan_details
+        if detail.split()[:2] in (["SCAN", table] for table in CHECKED_TABLES)
+        and detail != ALLOWED_SCANS.get(name)
+    ]
+
+
+def main() -> int:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    failures = 0
+    for name, query in endpoint_queries(db):
+        statement = getattr(query, "statement", query)
+        sql = str(statement.compile(
+            dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+        ))
+        plan = [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+        scans = full_scans(name, plan)
+        status = "FAIL" if scans else "ok"
+        failures += bool(scans)
+        print(f"[{status:>4}] {name}")
+        for detail in plan:
+            print(f"         {detail}")
+
+    db.close()
+    print("-" * 60)
+    if failures:
+        print(f"❌ 거래내역을 SEARCH 하지 않고 SCAN 하는 쿼리 {failures}개")
+        return 1
+    print("✅ 모든 쿼리가 인덱스로 거래내역을 찾습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+데이터베이스 마이그레이션: category_source 컬럼 추가
+
+transactions / card_transactions 테이블에 카테고리 지정 방식(auto, manual) 컬럼을 추가합니다.
+기존 거래는 현재 매핑과 메모로 다시 분류한 결과가 저장된 카테고리와 같거나 미분류이면 auto,
+다르면 사용자가 직접 지정한 것으로 보고 manual 로 기록합니다. (manual 거래는 재분류하지 않음)
+"""
+
+import sqlite3
+import os
+import sys
+
+# 프로젝트 루트를 Python 경로에 추가
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from app.categorizer import CategoryMatcher
+
+# 데이터베이스 경로
+DATABASE_PATH = os.path.join(BASE_DIR, "data", "account_book.db")
+
+TABLES = ("transactions", "card_transactions")
+UNCATEGORIZED = (None, "", "미분류")
+
+
+def classify(cursor, table: str, matcher: CategoryMatcher) -> dict:
+    """기존 거래의 category_source 기록, 방식별 건수 반환"""
+    cursor.execute(f"SELECT id, description, memo, category FROM {table}")
+    sources = {"auto": [], "manual": []}
+    for row_id, description, memo, category in cursor.fetchall():
+        if category in UNCATEGORIZED or matcher.categorize(description, memo) == category:
+            sources["auto"].append((row_id,))
+        else:
+            sources["manual"].append((row_id,))
+
+    for source, ids in sources.items():
+        cursor.executemany(f"UPDATE {table} SET category_source = '{source}' WHERE id = ?", ids)
+    return {source: len(ids) for source, ids in sources.items()}
+
+
+def migrate():
+    """category_source 컬럼 추가 마이그레이션"""
+
+    # 데이터베이스 파일이 존재하는지 확인
+    if not os.path.exists(DATABASE_PATH):
+        print(f"❌ 데이터베이스 파일을 찾을 수 없습니다: {DATABASE_PATH}")
+        return
+
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT keyword, category FROM category_mappings ORDER BY id")
+        matcher = CategoryMatcher(cursor.fetchall())
+
+        for table in TABLES:
+            # 1. 기존 컬럼 확인
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = [column[1] for column in cursor.fetchall()]
+
+            if 'category_source' in columns:
+                print(f"✅ {table}: category_source 컬럼이 이미 존재합니다.")
+                continue
+
+            # 2. category_source 컬럼 추가
+            print(f"{table}: category_source 컬럼 추가 중...")
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN category_source TEXT")
+
+            # 3. 기존 거래 분류 방식 기록
+            counts = classify(cursor, table, matcher)
+            print(f"✅ {table}: 자동 분류 {counts['auto']:,}건, 직접 지정 {counts['manual']:,}건")
+
+        conn.commit()
+
+    except sqlite3.Error as e:
+        print(f"❌ 마이그레이션 실패: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("데이터베이스 마이그레이션 시작")
+    print("=" * 60)
+    migrate()
+    print("=" * 60)
+    print("마이그레이션 완료")
+    print("=" * 60)
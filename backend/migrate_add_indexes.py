@@ -0,0 +1,60 @@
+"""
+데이터베이스 마이그레이션: 거래내역 조회용 인덱스 추가
+
+models.py 에 정의된 인덱스 중 기존 데이터베이스에 없는 인덱스를 생성하고
+쿼리 플래너 통계(ANALYZE)를 갱신합니다. 여러 번 실행해도 안전합니다.
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, inspect, text
+from app.database import DATABASE_PATH, SQLALCHEMY_DATABASE_URL
+from app import models
+
+
+def migrate():
+    """누락된 인덱스 생성"""
+
+    # 데이터베이스 파일이 존재하는지 확인
+    if not os.path.exists(DATABASE_PATH):
+        print(f"❌ 데이터베이스 파일을 찾을 수 없습니다: {DATABASE_PATH}")
+        return
+
+    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    inspector = inspect(engine)
+
+    created = 0
+    for table in (models.Transaction.__table__, models.CardTransaction.__table__):
+        if not inspector.has_table(table.name):
+            print(f"⚠️  {table.name} 테이블이 없습니다. 건너뜁니다.")
+            continue
+
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name in existing:
+                print(f"✅ {index.name} 이미 존재")
+                continue
+            print(f"{index.name} 생성 중... ({', '.join(c.name for c in index.columns)})")
+            index.create(bind=engine)
+            created += 1
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    print(f"\n총 {created}개의 인덱스가 생성되었습니다.")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("데이터베이스 마이그레이션 시작")
+    print("=" * 60)
+    migrate()
+    print("=" * 60)
+    print("마이그레이션 완료")
+    print("=" * 60)
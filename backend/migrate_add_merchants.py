@@ -0,0 +1,178 @@
+"""
+데이터베이스 마이그레이션: 가맹점 사전(merchants) 추가
+
+1. merchants 테이블을 만들고 기존 거래의 적요를 가맹점으로 등록합니다.
+   (가맹점마다 현재 키워드 매핑으로 한 번 분류한 결과를 merchants.category 에 기록)
+2. transactions / card_transactions 에 merchant_id 컬럼을 추가하고 채웁니다.
+3. 자동 분류 거래(category_source=auto)에는 메모에 적힌 카테고리만 남깁니다.
+   (가맹점 분류 결과는 조회 시 정해지므로 직접 지정 / 메모에 적힌 카테고리만 저장, 그 외에는 NULL)
+   category_source 가 없는 거래가 있으면 migrate_add_category_source.py 를 먼저 실행해야 합니다.
+4. 업로드 중복 체크 인덱스를 적요 대신 merchant_id 로 다시 만들고 merchant_id / merchants.category 인덱스를
+   추가합니다. 카테고리 인덱스는 (category, merchant_id) 로 바꾸고 월별 카테고리 집계용 인덱스는 삭제합니다.
+5. 적요까지 거래마다 색인하던 전문 검색 색인을 메모만 색인하도록 다시 만듭니다.
+   (적요 검색은 가맹점 사전 색인 사용)
+6. VACUUM 으로 줄어든 공간을 반환합니다.
+여러 번 실행해도 안전합니다.
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+from app.categorizer import build_matcher, memo_category
+from app.database import DATABASE_PATH, SQLALCHEMY_DATABASE_URL
+from app import models, search
+
+TABLES = (models.Transaction.__table__, models.CardTransaction.__table__)
+# 카테고리를 조회 시 정하게 되어 더 이상 쓰지 않는 인덱스
+DROPPED_INDEXES = (
+    "ix_transactions_category_date",
+    "ix_transactions_year_month_category",
+    "ix_card_transactions_year_month_category",
+)
+
+
+def add_merchants(engine) -> None:
+    """merchants 테이블 생성, 기존 적요 등록 및 가맹점별 분류"""
+    if not inspect(engine).has_table("merchants"):
+        print("merchants 테이블 생성 중...")
+        models.Merchant.__table__.create(bind=engine)
+
+    with Session(engine) as db:
+        for table in TABLES:
+            db.execute(text(
+                f"INSERT OR IGNORE INTO merchants (name) SELECT DISTINCT description FROM {table.name}"
+            ))
+
+        matcher = build_matcher(db)
+        changes = []
+        for merchant_id, name, category in db.execute(text("SELECT id, name, category FROM merchants")).all():
+            matched = matcher.keyword_matcher.match(name)
+            if matched != category:
+                changes.append({"id": merchant_id, "category": matched})
+        if changes:
+            db.execute(text("UPDATE merchants SET category = :category WHERE id = :id"), changes)
+        db.commit()
+        count = db.execute(text("SELECT COUNT(*) FROM merchants")).scalar()
+    print(f"✅ 가맹점 {count:,}개 (분류 결과 갱신 {len(changes):,}개)")
+
+
+def add_merchant_ids(engine) -> None:
+    """merchant_id 컬럼 추가 후 적요로 채움"""
+    for table in TABLES:
+        columns = {column["name"] for column in inspect(engine).get_columns(table.name)}
+        with engine.begin() as conn:
+            if "merchant_id" not in columns:
+                print(f"{table.name}: merchant_id 컬럼 추가 중...")
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN merchant_id INTEGER REFERENCES merchants (id)"))
+            result = conn.execute(text(
+                f"UPDATE {table.name} SET merchant_id = "
+                f"(SELECT id FROM merchants WHERE merchants.name = {table.name}.description) "
+                f"WHERE merchant_id IS NULL"
+            ))
+        print(f"✅ {table.name}: merchant_id {result.rowcount:,}건 기록")
+
+
+def clear_auto_categories(engine) -> bool:
+    """자동 분류 거래에 메모에 적힌 카테고리만 남기기 (category_source 가 없는 거래가 있으면 False)"""
+    for table in TABLES:
+        columns = {column["name"] for column in inspect(engine).get_columns(table.name)}
+        with engine.connect() as conn:
+            unclassified = "category_source" not in columns or conn.execute(text(
+                f"SELECT COUNT(*) FROM {table.name} WHERE category_source IS NULL"
+            )).scalar()
+        if unclassified:
+            print(f"❌ {table.name}: category_source 가 없는 거래가 있습니다. "
+                  f"먼저 python migrate_add_category_source.py 를 실행하세요.")
+            return False
+
+    for table in TABLES:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                f"SELECT id, memo, category FROM {table.name} "
+                f"WHERE category_source != 'manual' AND (category IS NOT NULL OR memo IS NOT NULL)"
+            )).all()
+            changes = [
+                {"id": row_id, "category": memo_category(memo)}
+                for row_id, memo, category in rows
+                if memo_category(memo) != category
+            ]
+            if changes:
+                conn.execute(text(f"UPDATE {table.name} SET category = :category WHERE id = :id"), changes)
+        print(f"✅ {table.name}: 자동 분류 카테고리 {len(changes):,}건 정리 (메모에 적힌 카테고리만 저장)")
+    return True
+
+
+def rebuild_indexes(engine) -> None:
+    """컬럼이 바뀐 인덱스는 다시 만들고 누락된 인덱스 생성, 쓰지 않는 인덱스 삭제"""
+    with engine.begin() as conn:
+        for name in DROPPED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    for table in (models.Merchant.__table__, *TABLES):
+        existing = {index["name"]: index["column_names"] for index in inspect(engine).get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            columns = [column.name for column in index.columns]
+            if existing.get(index.name) == columns:
+                continue
+            if index.name in existing:
+                print(f"{index.name} 다시 생성 중... ({', '.join(columns)})")
+                index.drop(bind=engine)
+            else:
+                print(f"{index.name} 생성 중... ({', '.join(columns)})")
+            index.create(bind=engine)
+
+
+def rebuild_search_index(engine) -> None:
+    """색인 컬럼이 바뀐 전문 검색 색인 삭제 후 다시 생성"""
+    with Session(engine) as db:
+        for model, columns in search.INDEXED_COLUMNS.items():
+            fts = search.fts_table_name(model.__tablename__)
+            indexed = [row[1] for row in db.execute(text(f"PRAGMA table_info({fts})"))]
+            if indexed and tuple(indexed) != columns:
+                print(f"{fts} 다시 생성 중... ({', '.join(columns)})")
+                for trigger in ("ai", "ad", "au"):
+                    db.execute(text(f"DROP TRIGGER IF EXISTS {fts}_{trigger}"))
+                db.execute(text(f"DROP TABLE {fts}"))
+        db.commit()
+        search.ensure_index(db)
+
+
+def migrate():
+    """가맹점 사전 마이그레이션"""
+
+    # 데이터베이스 파일이 존재하는지 확인
+    if not os.path.exists(DATABASE_PATH):
+        print(f"❌ 데이터베이스 파일을 찾을 수 없습니다: {DATABASE_PATH}")
+        return
+
+    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    size = os.path.getsize(DATABASE_PATH)
+
+    add_merchants(engine)
+    add_merchant_ids(engine)
+    if not clear_auto_categories(engine):
+        return
+    rebuild_indexes(engine)
+    rebuild_search_index(engine)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+        conn.execute(text("VACUUM"))
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    print(f"\n데이터베이스 크기: {size / 1e6:,.1f}MB -> {os.path.getsize(DATABASE_PATH) / 1e6:,.1f}MB")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("데이터베이스 마이그레이션 시작")
+    print("=" * 60)
+    migrate()
+    print("=" * 60)
+    print("마이그레이션 완료")
+    print("=" * 60)
@@ -0,0 +1,69 @@
+"""
+월별 통계 집계(monthly_rollups) / 계좌 잔액 스냅샷(account_balances,
+account_latest_balances) / 카드 지출 집계(card_spending_cube) 재생성 / 점검 스크립트
+
+거래내역/카드 거래내역 전체로 집계 테이블을 다시 만들거나, --check 옵션으로
+저장된 집계와 전체 재계산 결과를 비교하여 불일치 내역을 출력합니다.
+
+사용법:
+    python rebuild_rollups.py           # 집계 재생성
+    python rebuild_rollups.py --check   # 일관성 점검만 (불일치 시 exit 1)
+"""
+
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from app import rollups
+from app.database import Base, SessionLocal, engine
+
+
+def check() -> int:
+    db = SessionLocal()
+    try:
+        problems = rollups.check_consistency(db)
+    finally:
+        db.close()
+
+    for problem in problems:
+        print(f"  {problem}")
+    if problems:
+        print(f"❌ 불일치 {len(problems)}건 - python rebuild_rollups.py 로 재생성하세요.")
+        return 1
+    print("✅ 집계가 거래내역과 일치합니다.")
+    return 0
+
+
+def rebuild() -> int:
+    db = SessionLocal()
+    try:
+        count = rollups.rebuild(db)
+        card_count = rollups.rebuild_card_cube(db)
+        db.commit()
+    except Exception as e:
+        print(f"❌ 재생성 실패: {e}")
+        db.rollback()
+        return 1
+    finally:
+        db.close()
+
+    print(f"✅ 월별 집계 {count}건, 카드 지출 집계 {card_count}건을 재생성했습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    print("=" * 60)
+    if "--check" in sys.argv[1:]:
+        print("월별 통계 집계 점검")
+        print("=" * 60)
+        exit_code = check()
+    else:
+        print("월별 통계 집계 재생성")
+        print("=" * 60)
+        exit_code = rebuild()
+    print("=" * 60)
+    sys.exit(exit_code)
@@ -67,9 +67,23 @@ api.interceptors.response.use(
   }
 );
 
+// 업로드 적재 작업이 끝날 때까지 상태를 조회하고 업로드 결과 반환
+export const waitForImportJob = async (job, intervalMs = 500) => {
+  let current = job;
+  while (current.status === 'queued' || current.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    const response = await api.get(`/jobs/${current.job_id}`);
+    current = response.data;
+  }
+  if (current.status === 'failed') {
+    throw new Error(current.error || '파일 처리 중 오류가 발생했습니다.');
+  }
+  return current.result;
+};
+
 // 거래내역 관련 API
 export const transactionAPI = {
-  // Excel 파일 업로드
+  // Excel 파일 업로드 (백그라운드 적재 작업 완료 후 결과 반환)
   uploadExcel: async (file, accountType = '생활비') => {
     const formData = new FormData();
     formData.append('file', file);
@@ -78,7 +92,7 @@ export const transactionAPI = {
         'Content-Type': 'multipart/form-data',
       },
     });
-    return response.data;
+    return waitForImportJob(response.data);
   },
 
   // 거래내역 조회
@@ -93,6 +107,12 @@ export const transactionAPI = {
     return response.data;
   },
 
+  // 거래내역 카테고리/메모 일괄 수정 ({ ids } 또는 { filters }, category, memo)
+  bulkUpdate: async (data) => {
+    const response = await api.put('/transactions/bulk', data);
+    return response.data;
+  },
+
   // 거래내역 삭제
   deleteTransaction: async (id) => {
     const response = await api.delete(`/transactions/${id}`);
@@ -137,6 +157,24 @@ export const categoryAPI = {
     const response = await api.delete(`/categories/${id}`);
     return response.data;
   },
+
+  // 매핑 미리보기 (생성 시 자동 분류될 기존 거래 건수 + 최신 거래 일부)
+  previewMapping: async (keyword, limit = 20) => {
+    const response = await api.get('/categories/preview', { params: { keyword, limit } });
+    return response.data;
+  },
+
+  // 기존 거래 재분류 작업 시작 (직접 지정한 카테고리는 유지)
+  startRecategorization: async () => {
+    const response = await api.post('/categories/recategorize');
+    return response.data;
+  },
+
+  // 재분류 작업 진행 상황 (processed_rows / total_rows)
+  getRecategorizationJob: async (jobId) => {
+    const response = await api.get(`/categories/recategorize/${jobId}`);
+    return response.data;
+  },
 };
 
 // 통계 관련 API
@@ -148,6 +186,14 @@ export const statisticsAPI = {
     return response.data;
   },
 
+  // 기간별 월별 통계 (fromMonth ~ toMonth, YYYY-MM)
+  getMonthlyStatsRange: async (fromMonth, toMonth, accountType = null) => {
+    const params = { from: fromMonth, to: toMonth };
+    if (accountType) params.account_type = accountType;
+    const response = await api.get('/statistics/monthly', { params });
+    return response.data;
+  },
+
   // 카테고리별 통계
   getCategoryStats: async (yearMonth, accountType = null) => {
     const params = accountType ? { account_type: accountType } : {};
@@ -169,6 +215,14 @@ export const statisticsAPI = {
     return response.data;
   },
 
+  // 잔액 시계열 (fromDate ~ toDate, YYYY-MM-DD / resolution: daily, weekly, monthly)
+  getBalanceSeries: async (fromDate, toDate, resolution = 'monthly', points = 200, accountType = null) => {
+    const params = { from: fromDate, to: toDate, resolution, points };
+    if (accountType) params.account_type = accountType;
+    const response = await api.get('/statistics/balance-series', { params });
+    return response.data;
+  },
+
   // 특정 월의 총자산 조회 (해당 월의 각 계좌별 마지막 잔액 합계)
   getTotalAssetsByMonth: async (yearMonth, accountType = null) => {
     const params = accountType ? { account_type: accountType } : {};
@@ -178,3 +232,65 @@ export const statisticsAPI = {
 };
 
 export default api;
+
+// 대시보드 API (월별/카테고리 통계, 추이, 총자산, 최근 거래를 한 번에 조회)
+export const dashboardAPI = {
+  getDashboard: async (yearMonth, recentLimit = 5) => {
+    const response = await api.get(`/dashboard/${yearMonth}`, {
+      params: { recent_limit: recentLimit },
+    });
+    return response.data;
+  },
+};
+
+// 통합 지출 API (은행 지출 + 카드 거래, 기본적으로 카드 대금 출금 제외)
+export const ledgerAPI = {
+  // 지출 내역 (최신순)
+  getEntries: async ({ fromMonth = null, toMonth = null, category = null, source = null, limit = 100, offset = 0 } = {}) => {
+    const params = { limit, offset };
+    if (fromMonth) params.from = fromMonth;
+    if (toMonth) params.to = toMonth;
+    if (category) params.category = category;
+    if (source) params.source = source;
+    const response = await api.get('/ledger/', { params });
+    return response.data;
+  },
+
+  // 카테고리별 지출
+  getCategoryStats: async (fromMonth = null, toMonth = null, excludeCardPayments = true) => {
+    const params = { exclude_card_payments: excludeCardPayments };
+    if (fromMonth) params.from = fromMonth;
+    if (toMonth) params.to = toMonth;
+    const response = await api.get('/ledger/categories', { params });
+    return response.data;
+  },
+
+  // 월별 지출 (fromMonth ~ toMonth, YYYY-MM)
+  getMonthlyStats: async (fromMonth, toMonth, excludeCardPayments = true) => {
+    const response = await api.get('/ledger/monthly', {
+      params: { from: fromMonth, to: toMonth, exclude_card_payments: excludeCardPayments },
+    });
+    return response.data;
+  },
+
+  // 카테고리별 지출 비교 (전월, 전년 동월, 직전 3/12개월 평균 / source: bank, card)
+  getComparison: async (yearMonth, source = null, excludeCardPayments = true) => {
+    const params = { exclude_card_payments: excludeCardPayments };
+    if (source) params.source = source;
+    const response = await api.get(`/ledger/comparison/${yearMonth}`, { params });
+    return response.data;
+  },
+};
+
+// 적요 / 메모 검색 API (은행 거래 + 카드 거래, 최신순)
+export const searchAPI = {
+  search: async (query, { fromMonth = null, toMonth = null, category = null, source = null, limit = 100, offset = 0 } = {}) => {
+    const params = { q: query, limit, offset };
+    if (fromMonth) params.from = fromMonth;
+    if (toMonth) params.to = toMonth;
+    if (category) params.category = category;
+    if (source) params.source = source;
+    const response = await api.get('/search/', { params });
+    return response.data;
+  },
+};
@@ -1,8 +1,8 @@
-import api from './accountService';
+import api, { waitForImportJob } from './accountService';
 
 // 카드 거래내역 관련 API
 export const cardTransactionAPI = {
-  // Samsung Card Excel 파일 업로드
+  // Samsung Card Excel 파일 업로드 (백그라운드 적재 작업 완료 후 결과 반환)
   uploadExcel: async (file, cardHolder) => {
     const formData = new FormData();
     formData.append('file', file);
@@ -12,7 +12,7 @@ export const cardTransactionAPI = {
         'Content-Type': 'multipart/form-data',
       },
     });
-    return response.data;
+    return waitForImportJob(response.data);
   },
 
   // 카드 거래내역 조회
@@ -39,6 +39,12 @@ export const cardTransactionAPI = {
     return response.data;
   },
 
+  // 카드 거래 카테고리/메모 일괄 수정 ({ ids } 또는 { filters }, category, memo)
+  bulkUpdate: async (data) => {
+    const response = await api.put('/card-transactions/bulk', data);
+    return response.data;
+  },
+
   // 카드 거래 삭제
   deleteTransaction: async (id) => {
     const response = await api.delete(`/card-transactions/${id}`);
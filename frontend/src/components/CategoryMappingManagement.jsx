@@ -76,8 +76,9 @@ function CategoryMappingManagement() {
       fetchMappings();
       
       // 업데이트된 거래 수 피드백
-      if (response.updated_transactions_count > 0) {
-        toast.success(`매핑이 추가되었고, ${response.updated_transactions_count}개의 기존 거래가 자동으로 분류되었습니다.`);
+      const updatedCount = response.updated_transactions_count + (response.updated_card_transactions_count || 0);
+      if (updatedCount > 0) {
+        toast.success(`매핑이 추가되었고, ${updatedCount}개의 기존 거래가 자동으로 분류되었습니다.`);
       } else {
         toast.success('매핑이 추가되었습니다.');
       }
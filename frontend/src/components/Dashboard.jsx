@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { statisticsAPI, transactionAPI } from '../api/accountService';
+import { dashboardAPI } from '../api/accountService';
 import { SEMANTIC_COLORS, GRADIENTS, getAmountColor } from '../constants/colors';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
 import LoadingSkeleton from './common/LoadingSkeleton';
@@ -15,7 +15,7 @@ const Dashboard = ({ refreshTrigger }) => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
-  // 현재 월과 이전 월 계산
+  // 현재 월 계산
   const getCurrentMonth = () => {
     const now = new Date();
     const year = now.getFullYear();
@@ -23,14 +23,6 @@ const Dashboard = ({ refreshTrigger }) => {
     return `${year}-${month}`;
   };
 
-  const getPreviousMonth = (yearMonth) => {
-    const [year, month] = yearMonth.split('-').map(Number);
-    const prevDate = new Date(year, month - 2, 1); // month-2 because month is 1-indexed
-    const prevYear = prevDate.getFullYear();
-    const prevMonth = String(prevDate.getMonth() + 1).padStart(2, '0');
-    return `${prevYear}-${prevMonth}`;
-  };
-
   // 데이터 로드
   useEffect(() => {
     const fetchDashboardData = async () => {
@@ -38,83 +30,26 @@ const Dashboard = ({ refreshTrigger }) => {
         setLoading(true);
         setError(null);
 
-        // 먼저 사용 가능한 월 목록 가져오기
-        const availableMonths = await statisticsAPI.getAvailableMonths().catch(() => []);
-        
-        // 현재 월 계산
-        let currentMonth = getCurrentMonth();
-        let previousMonth = getPreviousMonth(currentMonth);
-
-        // 현재 월에 데이터가 없으면 가장 최근 월 사용
-        if (availableMonths.length > 0 && !availableMonths.includes(currentMonth)) {
-          currentMonth = availableMonths[availableMonths.length - 1];
-          previousMonth = getPreviousMonth(currentMonth);
-        }
-
-        // 병렬로 데이터 가져오기
-        const [currentStats, prevStats, recentTxns, assets, prevAssets] = await Promise.all([
-          statisticsAPI.getMonthlyStats(currentMonth).catch(() => ({
-            year_month: currentMonth,
-            total_income: 0,
-            total_expense: 0,
-            net_change: 0,
-            start_balance: 0,
-            end_balance: 0,
-            transaction_count: 0,
-          })),
-          statisticsAPI.getMonthlyStats(previousMonth).catch(() => ({
-            year_month: previousMonth,
-            total_income: 0,
-            total_expense: 0,
-            net_change: 0,
-            start_balance: 0,
-            end_balance: 0,
-            transaction_count: 0,
-          })),
-          transactionAPI.getTransactions({ limit: 5, offset: 0 }).catch(() => []),
-          statisticsAPI.getTotalAssets().catch(() => ({
-            total_assets: 0,
-            account_count: 0,
-            accounts: []
-          })),
-          statisticsAPI.getTotalAssetsByMonth(previousMonth).catch(() => ({
-            year_month: previousMonth,
-            total_assets: 0,
-            account_count: 0,
-            accounts: []
-          })),
-        ]);
+        // 현재 월 기준 대시보드 데이터를 한 번에 가져오기
+        // (현재 월에 데이터가 없으면 서버가 가장 최근 월 기준으로 응답)
+        const dashboard = await dashboardAPI.getDashboard(getCurrentMonth());
 
-        setCurrentMonthStats(currentStats);
-        setPreviousMonthStats(prevStats);
-        setRecentTransactions(recentTxns);
-        setTotalAssets(assets);
-        setPreviousMonthAssets(prevAssets);
+        setCurrentMonthStats(dashboard.current);
+        setPreviousMonthStats(dashboard.previous);
+        setRecentTransactions(dashboard.recent_transactions);
+        setTotalAssets(dashboard.total_assets);
+        setPreviousMonthAssets(dashboard.previous_total_assets);
 
         // 최근 6개월 추이 데이터 생성
-        if (availableMonths.length > 0) {
-          const last6Months = availableMonths.slice(-6);
-          const trendData = await Promise.all(
-            last6Months.map(async (month) => {
-              try {
-                const stats = await statisticsAPI.getMonthlyStats(month);
-                return {
-                  month: month.substring(5), // "2024-01" -> "01"
-                  수입: stats.total_income,
-                  지출: stats.total_expense,
-                  잔액: stats.end_balance,
-                };
-              } catch {
-                return {
-                  month: month.substring(5),
-                  수입: 0,
-                  지출: 0,
-                  잔액: 0,
-                };
-              }
-            })
+        if (dashboard.months.length > 0) {
+          setMonthlyTrend(
+            dashboard.trend.map((stats) => ({
+              month: stats.year_month.substring(5), // "2024-01" -> "01"
+              수입: stats.total_income,
+              지출: stats.total_expense,
+              잔액: stats.end_balance,
+            }))
           );
-          setMonthlyTrend(trendData);
         }
       } catch (err) {
         console.error('대시보드 데이터 로드 실패:', err);